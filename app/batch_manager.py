@@ -48,7 +48,8 @@ def run_batch():
         print(f"📡 {user['username']}님 크롤링 요청 중...")
         try:
             response = requests.post(CRAWLER_URL, json=payload, timeout=60)
-            print(f"✅ 결과: {response.status_code}")
+            # 크롤링은 서버의 작업 큐에서 진행되고, 여기서는 접수된 jobId만 받음 (진행 상황: GET /jobs/{jobId})
+            print(f"✅ 결과: {response.status_code} (jobId: {response.json().get('jobId')})")
         except Exception as e:
             print(f"❌ 에러: {e}")
 
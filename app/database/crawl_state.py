@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timezone
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+LOG = logging.getLogger(__name__)
+
+# 증분 크롤링 사용 여부 (이벤트의 "incremental" 값이 우선)
+CRAWL_INCREMENTAL = os.getenv("CRAWL_INCREMENTAL", "false").lower() in ("1", "true", "yes")
+# 백엔드: sqlite(기본, 로컬/테스트) | supabase
+CRAWL_STATE_BACKEND = os.getenv("CRAWL_STATE_BACKEND", "sqlite").lower()
+CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", "/tmp/crawl_state.sqlite3")
+SUPABASE_TABLE = "crawl_state"
+# 게시판별로 기억하는 최근 글 id 개수
+MAX_SEEN_IDS = 500
+
+
+def article_id(link: str) -> str:
+    """게시글 식별자. 고려대처럼 articleNo 쿼리가 있으면 그것을, 없으면 URL 전체를 쓴다."""
+    query = parse_qs(urlsplit(link).query)
+    for key in ("articleNo", "article_no", "bbsidx", "pkId"):
+        if query.get(key):
+            return query[key][0]
+    return link
+
+
+class BoardWatermark:
+    """게시판 하나의 high-water mark: 마지막으로 본 글 id들 + 가장 최근 게시일."""
+
+    def __init__(self, seen_ids: list[str] | None = None, newest_date: date | None = None) -> None:
+        self.seen_ids = list(seen_ids or [])
+        self._seen = set(self.seen_ids)
+        self.newest_date = newest_date
+
+    @property
+    def empty(self) -> bool:
+        return not self.seen_ids and self.newest_date is None
+
+    def is_new(self, link: str, row_date: date | None = None) -> bool:
+        if article_id(link) in self._seen:
+            return False
+        # 워터마크보다 오래된 글(상단 고정 공지 등)은 이미 처리된 것으로 간주
+        if row_date is not None and self.newest_date is not None and row_date < self.newest_date:
+            return False
+        return True
+
+    def advance(self, links: list[str], dates: list[date] | None = None) -> None:
+        for link in links:
+            aid = article_id(link)
+            if aid not in self._seen:
+                self._seen.add(aid)
+                self.seen_ids.append(aid)
+        if len(self.seen_ids) > MAX_SEEN_IDS:
+            self.seen_ids = self.seen_ids[-MAX_SEEN_IDS:]
+            self._seen = set(self.seen_ids)
+        for row_date in dates or []:
+            if self.newest_date is None or row_date > self.newest_date:
+                self.newest_date = row_date
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "seen_ids": self.seen_ids,
+            "newest_date": self.newest_date.isoformat() if self.newest_date else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> "BoardWatermark":
+        data = data or {}
+        newest = data.get("newest_date")
+        return cls(data.get("seen_ids"), date.fromisoformat(newest) if newest else None)
+
+
+class SQLiteStateStore:
+    def __init__(self, path: str = CRAWL_STATE_PATH) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawl_state (board TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at TEXT)"
+        )
+        self._conn.commit()
+
+    def load(self, board: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM crawl_state WHERE board = ?", (board,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, board: str, state: dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_state (board, state, updated_at) VALUES (?, ?, ?)",
+                (board, json.dumps(state), datetime.now(timezone.utc).isoformat()),
+            )
+            self._conn.commit()
+
+
+class SupabaseStateStore:
+    """테이블 스키마: board text primary key, state jsonb, updated_at timestamptz"""
+
+    def __init__(self, client: Any = None) -> None:
+        if client is None:
+            from app.database.supabase_client import supabase as client
+        self.client = client
+
+    def load(self, board: str) -> dict[str, Any] | None:
+        res = self.client.table(SUPABASE_TABLE).select("state").eq("board", board).limit(1).execute()
+        return res.data[0]["state"] if res.data else None
+
+    def save(self, board: str, state: dict[str, Any]) -> None:
+        self.client.table(SUPABASE_TABLE).upsert({
+            "board": board,
+            "state": state,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }).execute()
+
+
+_store: Any = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Any:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SupabaseStateStore() if CRAWL_STATE_BACKEND == "supabase" else SQLiteStateStore()
+        return _store
+
+
+def set_store(store: Any) -> None:
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def load_watermark(board: str) -> BoardWatermark:
+    try:
+        return BoardWatermark.from_dict(get_store().load(board))
+    except Exception as exc:
+        # 상태를 못 읽으면 전체 크롤링으로 동작 (알림 누락보다 중복 처리가 낫다)
+        LOG.warning("크롤 상태 로드 실패 (%s): %r", board, exc)
+        return BoardWatermark()
+
+
+def save_watermark(board: str, watermark: BoardWatermark) -> None:
+    try:
+        get_store().save(board, watermark.to_dict())
+    except Exception as exc:
+        LOG.warning("크롤 상태 저장 실패 (%s): %r", board, exc)
+
+
+def is_incremental(event: dict[str, Any] | None = None) -> bool:
+    if event and event.get("incremental") is not None:
+        return bool(event["incremental"])
+    return CRAWL_INCREMENTAL
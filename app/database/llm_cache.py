@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+LOG = logging.getLogger(__name__)
+
+# 백엔드: sqlite(기본, 로컬/테스트) | supabase | off
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "sqlite").lower()
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "/tmp/llm_cache.sqlite3")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+# Supabase 백엔드의 만료/개수 초과 정리 주기(초). 쓰기마다 하지 않고 이 간격으로 한 번만
+LLM_CACHE_PRUNE_INTERVAL = float(os.getenv("LLM_CACHE_PRUNE_INTERVAL", "600"))
+SUPABASE_TABLE = "llm_cache"
+
+
+def _normalize(value: Any) -> Any:
+    # 공백 차이만 있는 입력은 같은 키가 되도록 정리
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(model: str, template_version: str, inputs: dict[str, Any]) -> str:
+    """(모델, 프롬프트 템플릿 버전, 정규화된 입력)의 해시 = 캐시 키."""
+    material = json.dumps(
+        {"model": model, "template": template_version, "inputs": _normalize(inputs)},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SQLiteBackend:
+    """로컬 파일 기반 백엔드. TTL 만료 + 마지막 접근 시각 기준 LRU 제거."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_lru ON llm_cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now),
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN"
+                    " (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+
+class SupabaseBackend:
+    """Cloud Run 인스턴스끼리 캐시를 공유할 때 사용 (llm_cache 테이블).
+
+    테이블 스키마: key text primary key, value jsonb, expires_at timestamptz, last_access timestamptz
+    """
+
+    def __init__(
+        self, client: Any = None, max_entries: int = LLM_CACHE_MAX_ENTRIES, prune_interval: float = LLM_CACHE_PRUNE_INTERVAL
+    ) -> None:
+        if client is None:
+            from app.database.supabase_client import supabase as client
+        self.client = client
+        self.max_entries = max_entries
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    @staticmethod
+    def _iso(ts: float) -> str:
+        return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+    def get(self, key: str) -> Any | None:
+        res = self.client.table(SUPABASE_TABLE).select("value, expires_at").eq("key", key).limit(1).execute()
+        if not res.data:
+            return None
+        row = res.data[0]
+        if datetime.fromisoformat(row["expires_at"]) < datetime.now(timezone.utc):
+            self.client.table(SUPABASE_TABLE).delete().eq("key", key).execute()
+            return None
+        self.client.table(SUPABASE_TABLE).update({"last_access": self._iso(time.time())}).eq("key", key).execute()
+        return row["value"]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        table = self.client.table(SUPABASE_TABLE)
+        table.upsert({
+            "key": key,
+            "value": value,
+            "expires_at": self._iso(now + ttl),
+            "last_access": self._iso(now),
+        }).execute()
+        # 정리는 count="exact" 조회가 들어가 비싸므로 prune_interval마다 한 번만 (get은 만료를 따로 확인함)
+        with self._prune_lock:
+            if now - self._last_prune < self.prune_interval:
+                return
+            self._last_prune = now
+        self.prune(now)
+
+    def prune(self, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        table = self.client.table(SUPABASE_TABLE)
+        table.delete().lt("expires_at", self._iso(now)).execute()
+        count = table.select("key", count="exact").limit(1).execute().count or 0
+        if count > self.max_entries:
+            stale = table.select("key").order("last_access").limit(count - self.max_entries).execute()
+            keys = [row["key"] for row in stale.data]
+            if keys:
+                table.delete().in_("key", keys).execute()
+
+
+class LLMCache:
+    """LLM 호출 결과 캐시. 결과가 None이거나 호출이 예외로 끝나면 저장하지 않는다."""
+
+    def __init__(self, backend: Any | None, ttl: float = LLM_CACHE_TTL) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def lookup(self, model: str, template_version: str, inputs: dict[str, Any]) -> Any | None:
+        if self.backend is None:
+            return None
+        try:
+            cached = self.backend.get(make_key(model, template_version, inputs))
+        except Exception as exc:
+            self.errors += 1
+            LOG.warning("LLM 캐시 조회 실패: %r", exc)
+            cached = None
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    def store(self, model: str, template_version: str, inputs: dict[str, Any], value: Any) -> None:
+        if self.backend is None or value is None:
+            return
+        try:
+            self.backend.set(make_key(model, template_version, inputs), value, self.ttl)
+        except Exception as exc:
+            self.errors += 1
+            LOG.warning("LLM 캐시 저장 실패: %r", exc)
+
+    def get_or_compute(
+        self,
+        model: str,
+        template_version: str,
+        inputs: dict[str, Any],
+        compute: Callable[[], Any],
+    ) -> Any:
+        cached = self.lookup(model, template_version, inputs)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.store(model, template_version, inputs, value)
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else "off",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def _make_backend() -> Any | None:
+    if LLM_CACHE_BACKEND == "off":
+        return None
+    if LLM_CACHE_BACKEND == "supabase":
+        return SupabaseBackend()
+    return SQLiteBackend()
+
+
+def get_cache() -> LLMCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                backend = _make_backend()
+            except Exception as exc:
+                LOG.error("LLM 캐시 백엔드 초기화 실패, 캐시 없이 동작합니다: %s", exc)
+                backend = None
+            _cache = LLMCache(backend)
+        return _cache
+
+
+def set_cache(cache: LLMCache) -> None:
+    """백엔드 교체용 (테스트에서 메모리 SQLite를 꽂는 등)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def cached_llm_call(model: str, template_version: str, inputs: dict[str, Any], compute: Callable[[], Any]) -> Any:
+    return get_cache().get_or_compute(model, template_version, inputs, compute)
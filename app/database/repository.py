@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Iterator
+
+LOG = logging.getLogger(__name__)
+
+# notifications의 중복 기준 (supabase/migrations의 유니크 제약과 같아야 함)
+NOTIFICATION_CONFLICT = "user_id,original_url"
+# PostgREST는 한 번에 최대 1000행까지만 돌려주므로 그 단위로 페이지를 넘긴다
+PAGE_SIZE = 1000
+# in_() 필터는 쿼리스트링으로 나가므로 id 목록을 이 크기로 나눠서 보낸다 (URL 길이 제한)
+IN_CHUNK = 200
+
+
+def chunked(values: list[Any], size: int = IN_CHUNK) -> Iterator[list[Any]]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+class Repository:
+    """스케줄러/디스패처/콜백 저장용 Supabase 접근. 유저 수·이력과 무관하게 테이블당 집합 단위 쿼리 몇 번으로 끝낸다."""
+
+    def __init__(self, client: Any = None) -> None:
+        if client is None:
+            from app.database.supabase_client import supabase as client
+        self.client = client
+        # 유니크 제약이 아직 없는 DB면 upsert가 실패하므로, 한 번 실패한 뒤로는 조회 방식으로 저장
+        self.upsert_supported = True
+
+    def _select_all(self, build: Any) -> list[dict[str, Any]]:
+        """build()로 만든 select 쿼리를 PAGE_SIZE씩 끝까지 읽는다."""
+        rows: list[dict[str, Any]] = []
+        while True:
+            page = build().range(len(rows), len(rows) + PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+
+    # --- 알림 발송 스케줄러 ---
+    def due_users(self, alarm_time: str) -> list[dict[str, Any]]:
+        return self._select_all(
+            lambda: self.client.table("users").select("*").eq("alarm_time", alarm_time).order("user_id")
+        )
+
+    def unsent_notifications(self, user_ids: list[Any]) -> dict[Any, list[dict[str, Any]]]:
+        """유저들의 미발송 공지를 한 번에 읽어 {user_id: [최신순 공지, ...]}로 묶는다."""
+        grouped: dict[Any, list[dict[str, Any]]] = {}
+        for ids in chunked(list(dict.fromkeys(user_ids))):
+            rows = self._select_all(
+                lambda: self.client.table("notifications")
+                .select("*")
+                .in_("user_id", ids)
+                .eq("is_sent", False)
+                .order("created_at", desc=True)
+                .order("id")
+            )
+            for row in rows:
+                grouped.setdefault(row["user_id"], []).append(row)
+        return grouped
+
+    def mark_sent(self, notification_ids: list[Any]) -> int:
+        """실제로 발송한 공지만 id로 골라 is_sent=True (그 사이에 새로 들어온 공지는 건드리지 않음)."""
+        ids = list(dict.fromkeys(notification_ids))
+        for chunk in chunked(ids):
+            self.client.table("notifications").update({"is_sent": True}).in_("id", chunk).execute()
+        return len(ids)
+
+    # --- 콜백 저장 ---
+    def insert_notifications(self, rows: list[dict[str, Any]]) -> int:
+        """(user_id, original_url)이 이미 있는 공지는 건너뛰고 저장한 뒤, 새로 저장된 건수를 반환한다.
+
+        중복 판단은 DB의 유니크 제약 + ON CONFLICT DO NOTHING으로 처리해 유저의 기존 공지 수와 무관하게
+        요청 한 번으로 끝난다. 제약이 없는 DB에서는 들어온 URL만 조회해 걸러낸다.
+        """
+        rows = list({(row["user_id"], row.get("original_url") or id(row)): row for row in rows}.values())
+        if not rows:
+            return 0
+        if self.upsert_supported:
+            try:
+                res = self.client.table("notifications").upsert(
+                    rows, on_conflict=NOTIFICATION_CONFLICT, ignore_duplicates=True
+                ).execute()
+                return len(res.data or [])
+            except Exception as exc:
+                # 42P10: ON CONFLICT 대상과 맞는 유니크 제약이 없음 (마이그레이션 전)
+                if "42P10" not in str(exc):
+                    raise
+                LOG.warning("notifications에 (user_id, original_url) 유니크 제약이 없어 조회 후 저장으로 대체합니다")
+                self.upsert_supported = False
+        return self._insert_new(rows)
+
+    def _insert_new(self, rows: list[dict[str, Any]]) -> int:
+        existing: set[tuple[Any, Any]] = set()
+        by_user: dict[Any, list[str]] = {}
+        for row in rows:
+            if row.get("original_url"):
+                by_user.setdefault(row["user_id"], []).append(row["original_url"])
+        for user_id, urls in by_user.items():
+            for chunk in chunked(urls):
+                res = (
+                    self.client.table("notifications")
+                    .select("original_url")
+                    .eq("user_id", user_id)
+                    .in_("original_url", chunk)
+                    .execute()
+                )
+                existing.update((user_id, item["original_url"]) for item in res.data or [])
+        new_rows = [row for row in rows if (row["user_id"], row.get("original_url")) not in existing]
+        if new_rows:
+            self.client.table("notifications").insert(new_rows).execute()
+        return len(new_rows)
+
+    # --- 크롤링 디스패처 ---
+    def subscribers(self) -> list[dict[str, Any]]:
+        """구독 URL이 있는 유저들. target_urls를 임베드해서 users와 한 번에 조인해 읽는다."""
+        users = self._select_all(
+            lambda: self.client.table("users").select("*, target_urls(target_url)").order("user_id")
+        )
+        return [user for user in users if user.get("target_urls")]
+
+
+_repository: Repository | None = None
+_repository_lock = threading.Lock()
+
+
+def get_repository() -> Repository:
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = Repository()
+        return _repository
+
+
+def set_repository(repository: Repository) -> None:
+    global _repository
+    with _repository_lock:
+        _repository = repository
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any
+
+import httpx
+
+from app.engine.resilience import CircuitOpenError, Provider, provider
+
+LOG = logging.getLogger(__name__)
+
+# NHN Cloud 알림톡 API (로컬 테스트 시 scripts/alimtalk_stub.py 주소로 바꿔서 사용)
+ALIMTALK_BASE_URL = os.getenv("ALIMTALK_BASE_URL", "https://api-alimtalk.cloud.toast.com").rstrip("/")
+# 요청 한 번에 담는 수신자 수 (API 상한 1000명)
+ALIMTALK_MAX_RECIPIENTS = 1000
+ALIMTALK_BATCH_SIZE = min(int(os.getenv("ALIMTALK_BATCH_SIZE", "1000")), ALIMTALK_MAX_RECIPIENTS)
+# 동시에 보내는 요청 수 (초당 요청 수는 resilience의 "alimtalk" 제공자 설정, ALIMTALK_RATE)
+ALIMTALK_CONCURRENCY = int(os.getenv("ALIMTALK_CONCURRENCY", "4"))
+ALIMTALK_TIMEOUT = float(os.getenv("ALIMTALK_TIMEOUT", "30"))
+
+
+class Recipient:
+    """발송 대상 한 명. key는 결과를 되돌려 받을 때 쓰는 식별자 (recipientGroupingKey로 전달)."""
+
+    __slots__ = ("key", "phone", "params")
+
+    def __init__(self, key: str, phone: str, params: dict[str, str]) -> None:
+        self.key = str(key)
+        self.phone = phone.replace("-", "")
+        self.params = params
+
+
+class SendResult:
+    __slots__ = ("key", "ok", "code", "message")
+
+    def __init__(self, key: str, ok: bool, code: Any = None, message: str | None = None) -> None:
+        self.key = key
+        self.ok = ok
+        self.code = code
+        self.message = message
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"ok": self.ok, "resultCode": self.code, "resultMessage": self.message}
+
+
+class AlimTalkDispatcher:
+    """수신자를 요청당 최대 batch_size명씩 묶어, 동시성·속도 제한 안에서 병렬로 보낸다.
+
+    수신자별 결과는 recipientGroupingKey(없으면 recipientSeq 순서)로 Recipient.key에 다시 매핑한다.
+    속도 제한·재시도·서킷 브레이커는 다른 알림톡 호출(send_kakao)과 같은 "alimtalk" 제공자를 공유한다.
+    """
+
+    def __init__(
+        self,
+        app_key: str | None = None,
+        secret_key: str | None = None,
+        sender_key: str | None = None,
+        base_url: str = ALIMTALK_BASE_URL,
+        batch_size: int = ALIMTALK_BATCH_SIZE,
+        concurrency: int = ALIMTALK_CONCURRENCY,
+        timeout: float = ALIMTALK_TIMEOUT,
+    ) -> None:
+        self.app_key = app_key or os.getenv("KAKAO_APP_KEY")
+        self.secret_key = secret_key or os.getenv("KAKAO_SECRET_KEY")
+        self.sender_key = sender_key or os.getenv("KAKAO_SENDER_KEY")
+        self.base_url = base_url
+        self.batch_size = max(1, min(batch_size, ALIMTALK_MAX_RECIPIENTS))
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.provider: Provider = provider("alimtalk")
+        # 메트릭
+        self.requests = 0
+        self.sent = 0
+        self.failed = 0
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/alimtalk/v2.2/appkeys/{self.app_key}/messages"
+
+    async def send(self, template_code: str, recipients: list[Recipient]) -> dict[str, SendResult]:
+        """{Recipient.key: SendResult}. 요청 단위 실패는 그 묶음의 수신자 모두 실패로 기록한다."""
+        if not recipients:
+            return {}
+        batches = [recipients[i : i + self.batch_size] for i in range(0, len(recipients), self.batch_size)]
+        slots = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        results: dict[str, SendResult] = {}
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+
+            async def send_batch(batch: list[Recipient]) -> None:
+                async with slots:
+                    for result in await self._post(client, template_code, batch):
+                        results[result.key] = result
+
+            await asyncio.gather(*(send_batch(batch) for batch in batches))
+        sent = sum(1 for r in results.values() if r.ok)
+        self.sent += sent
+        self.failed += len(results) - sent
+        LOG.info("📨 알림톡 발송: 수신자 %d명, 요청 %d건, 성공 %d명", len(recipients), len(batches), sent)
+        return results
+
+    async def _post(self, client: httpx.AsyncClient, template_code: str, batch: list[Recipient]) -> list[SendResult]:
+        payload = {
+            "senderKey": self.sender_key,
+            "templateCode": template_code,
+            "recipientList": [
+                {"recipientNo": r.phone, "templateParameter": r.params, "recipientGroupingKey": r.key} for r in batch
+            ],
+        }
+        headers = {"X-Secret-Key": self.secret_key or "", "Content-Type": "application/json;charset=UTF-8"}
+        self.requests += 1
+        try:
+            resp = await self.provider.request_async(client, "POST", self.url, json=payload, headers=headers)
+            body = resp.json() if resp.content else {}
+        except CircuitOpenError as exc:
+            LOG.error("알림톡 서킷 열림, 발송 보류 (수신자 %d명): %s", len(batch), exc)
+            return [SendResult(r.key, False, "CIRCUIT_OPEN", str(exc)) for r in batch]
+        except (httpx.HTTPError, ValueError) as exc:
+            LOG.error("알림톡 요청 실패 (수신자 %d명): %r", len(batch), exc)
+            return [SendResult(r.key, False, "CONNECTION_ERROR", str(exc)) for r in batch]
+        header = body.get("header") or {}
+        if resp.status_code != 200 or not header.get("isSuccessful", False):
+            message = header.get("resultMessage") or resp.text[:200]
+            LOG.error("알림톡 요청 거부 (%s, 수신자 %d명): %s", resp.status_code, len(batch), message)
+            return [SendResult(r.key, False, header.get("resultCode", resp.status_code), message) for r in batch]
+        return self._map_results(batch, (body.get("message") or {}).get("sendResults") or [])
+
+    @staticmethod
+    def _map_results(batch: list[Recipient], send_results: list[dict[str, Any]]) -> list[SendResult]:
+        by_key = {r.key: r for r in batch}
+        results: dict[str, SendResult] = {}
+        for index, item in enumerate(send_results):
+            key = item.get("recipientGroupingKey")
+            if key not in by_key:
+                # 그룹 키가 없으면 recipientSeq(1부터) → 요청 순서로 매핑
+                seq = item.get("recipientSeq") or index + 1
+                key = batch[seq - 1].key if 0 < seq <= len(batch) else None
+            if key is None:
+                continue
+            code = item.get("resultCode")
+            results[key] = SendResult(key, code == 0, code, item.get("resultMessage"))
+        # 응답에 빠진 수신자는 실패로 처리 (다음 실행 때 다시 보냄)
+        return [results.get(r.key) or SendResult(r.key, False, "NO_RESULT", "응답에 결과 없음") for r in batch]
+
+    def stats(self) -> dict[str, Any]:
+        return {"requests": self.requests, "sent": self.sent, "failed": self.failed, "batchSize": self.batch_size}
+
+
+_dispatcher: AlimTalkDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> AlimTalkDispatcher:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlimTalkDispatcher()
+        return _dispatcher
+
+
+def set_dispatcher(dispatcher: AlimTalkDispatcher) -> None:
+    global _dispatcher
+    with _dispatcher_lock:
+        _dispatcher = dispatcher
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import suppress
+from typing import Any
+
+from playwright.async_api import Browser, Playwright, Route, async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.engine.fetch_router import DYNAMIC, get_router
+from app.engine.site_profiles import BLOCKED_RESOURCE_TYPES, READY_TIMEOUT_MS, SiteProfile, is_third_party, profile_for
+
+LOG = logging.getLogger(__name__)
+
+# 풀 설정 (N개의 브라우저 x 브라우저당 M개의 동시 컨텍스트, K페이지마다 재시작)
+POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+CONTEXTS_PER_BROWSER = int(os.getenv("BROWSER_POOL_CONTEXTS", "4"))
+RECYCLE_AFTER_PAGES = int(os.getenv("BROWSER_POOL_RECYCLE_PAGES", "200"))
+ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_POOL_ACQUIRE_TIMEOUT", "60"))
+NAV_TIMEOUT_MS = 30000
+LAUNCH_ARGS = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"]
+# 앱 시작 시 미리 띄울지 여부: true | false | auto(기본)
+# auto는 브라우저가 필요하다고 학습된 호스트(fetch_router)가 있으면 미리 띄우고, 없으면 그런 호스트가
+# 처음 나올 때 띄움 (정적 수집만 하는 인스턴스가 Chromium 메모리를 쓰지 않도록)
+EAGER_START = os.getenv("BROWSER_POOL_EAGER", "auto").lower()
+# 이미지·미디어·폰트·외부 도메인 요청 차단 여부
+BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "true").lower() in ("1", "true", "yes")
+
+
+class _PooledBrowser:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.browser: Browser | None = None
+        self.lock: asyncio.Lock | None = None
+        self.active = 0
+        self.pages_served = 0
+        self.launches = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+
+class BrowserPool:
+    """앱 수명 동안 Chromium을 띄워두고 요청마다 격리된 BrowserContext를 빌려준다.
+
+    Playwright async API를 전용 스레드의 이벤트 루프에서 돌리기 때문에
+    동기 코드(fetch_dynamic)와 다른 이벤트 루프(FastAPI) 어디서든 호출할 수 있다.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        contexts_per_browser: int = CONTEXTS_PER_BROWSER,
+        recycle_after: int = RECYCLE_AFTER_PAGES,
+    ) -> None:
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.recycle_after = max(1, recycle_after)
+        self._browsers = [_PooledBrowser(i) for i in range(self.size)]
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._playwright: Playwright | None = None
+        self._slots: asyncio.Semaphore | None = None
+        # 메트릭
+        self._waiting = 0
+        self._acquired = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+        self._recycles = 0
+        self._crashes = 0
+        self._failures = 0
+        self._blocked = 0
+        self._ready_timeouts = 0
+
+    # --- 수명 관리 ---
+    def start(self) -> None:
+        if self._loop is not None:
+            return
+        loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        self._loop = loop
+        try:
+            asyncio.run_coroutine_threadsafe(self._start(), loop).result()
+        except Exception:
+            self.stop()
+            raise
+        LOG.info(
+            "🧭 브라우저 풀 시작: 브라우저 %s개 x 컨텍스트 %s개 (재시작 주기 %s페이지)",
+            self.size, self.contexts_per_browser, self.recycle_after,
+        )
+
+    def stop(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        with suppress(Exception):
+            asyncio.run_coroutine_threadsafe(self._stop(), loop).result(timeout=30)
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+        LOG.info("🧭 브라우저 풀 종료")
+
+    async def _start(self) -> None:
+        self._playwright = await async_playwright().start()
+        self._slots = asyncio.Semaphore(self.size * self.contexts_per_browser)
+        for pb in self._browsers:
+            pb.lock = asyncio.Lock()
+            try:
+                await self._ensure_browser(pb)
+            except Exception as exc:
+                # 기동 시 실패해도 첫 요청에서 다시 띄운다
+                LOG.error("브라우저 #%s 기동 실패: %s", pb.index, exc)
+
+    async def _stop(self) -> None:
+        for pb in self._browsers:
+            await self._close_browser(pb)
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    # --- 브라우저 관리 ---
+    async def _ensure_browser(self, pb: _PooledBrowser) -> Browser:
+        async with pb.lock:
+            if pb.healthy:
+                return pb.browser
+            if pb.browser is not None:
+                self._crashes += 1
+                LOG.warning("💥 브라우저 #%s 연결 끊김 감지, 재기동합니다.", pb.index)
+                await self._close_browser(pb)
+            pb.browser = await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            pb.pages_served = 0
+            pb.launches += 1
+            return pb.browser
+
+    async def _close_browser(self, pb: _PooledBrowser) -> None:
+        browser, pb.browser = pb.browser, None
+        if browser is not None:
+            with suppress(Exception):
+                await browser.close()
+
+    async def _recycle(self, pb: _PooledBrowser) -> None:
+        async with pb.lock:
+            # 락을 기다리는 사이 다른 작업이 들어왔으면 다음 반납 때 처리
+            if pb.active or pb.pages_served < self.recycle_after:
+                return
+            self._recycles += 1
+            LOG.info("♻️ 브라우저 #%s 재시작 (%s페이지 처리)", pb.index, pb.pages_served)
+            await self._close_browser(pb)
+            pb.pages_served = 0
+
+    def _pick(self) -> _PooledBrowser:
+        # 재시작 대기(draining) 중이 아닌 브라우저 중 가장 한가한 것을 우선 사용
+        open_slots = [pb for pb in self._browsers if pb.active < self.contexts_per_browser]
+        fresh = [pb for pb in open_slots if pb.pages_served < self.recycle_after]
+        return min(fresh or open_slots or self._browsers, key=lambda pb: pb.active)
+
+    # --- 수집 ---
+    async def _fetch_html(self, url: str) -> str:
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), ACQUIRE_TIMEOUT)
+        finally:
+            self._waiting -= 1
+        waited = time.monotonic() - started
+        self._acquired += 1
+        self._wait_total += waited
+        self._wait_last = waited
+        self._wait_max = max(self._wait_max, waited)
+
+        profile = profile_for(url)
+        pb = self._pick()
+        pb.active += 1
+        try:
+            browser = await self._ensure_browser(pb)
+            context = await browser.new_context()
+            try:
+                if BLOCK_RESOURCES:
+                    await context.route("**/*", lambda route: self._route(route, url, profile))
+                page = await context.new_page()
+                # networkidle 대신 사이트별 준비 셀렉터가 DOM에 붙는 시점까지만 기다림
+                await page.goto(url, wait_until=profile.wait_until, timeout=NAV_TIMEOUT_MS)
+                if profile.ready_selector:
+                    try:
+                        await page.wait_for_selector(profile.ready_selector, state="attached", timeout=READY_TIMEOUT_MS)
+                    except PlaywrightTimeoutError:
+                        self._ready_timeouts += 1
+                        LOG.warning("⏱️ 준비 셀렉터 대기 초과 (%s: %s), 현재 DOM 사용: %s", profile.name, profile.ready_selector, url)
+                return await page.content()
+            finally:
+                with suppress(Exception):
+                    await context.close()
+        except Exception:
+            self._failures += 1
+            raise
+        finally:
+            pb.active -= 1
+            pb.pages_served += 1
+            self._slots.release()
+            if pb.pages_served >= self.recycle_after and pb.active == 0:
+                await self._recycle(pb)
+
+    async def _route(self, route: Route, page_url: str, profile: SiteProfile) -> None:
+        request = route.request
+        blocked = request.resource_type in BLOCKED_RESOURCE_TYPES or (
+            profile.block_third_party
+            and request.resource_type != "document"
+            and is_third_party(request.url, page_url)
+        )
+        if blocked:
+            self._blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def fetch_html(self, url: str, timeout: float | None = None) -> str:
+        """동기 코드용: 풀 스레드에서 페이지를 렌더링하고 HTML을 돌려준다."""
+        if self._loop is None:
+            raise RuntimeError("browser pool is not started")
+        future = asyncio.run_coroutine_threadsafe(self._fetch_html(url), self._loop)
+        return future.result(timeout)
+
+    async def fetch_html_async(self, url: str) -> str:
+        """다른 이벤트 루프(FastAPI 등)에서 await 할 수 있는 버전."""
+        if self._loop is None:
+            raise RuntimeError("browser pool is not started")
+        future = asyncio.run_coroutine_threadsafe(self._fetch_html(url), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "started": self._loop is not None,
+            "poolSize": self.size,
+            "contextsPerBrowser": self.contexts_per_browser,
+            "capacity": self.size * self.contexts_per_browser,
+            "healthyBrowsers": sum(1 for pb in self._browsers if pb.healthy),
+            "activeContexts": sum(pb.active for pb in self._browsers),
+            "queueDepth": self._waiting,
+            "acquired": self._acquired,
+            "waitSecondsAvg": round(self._wait_total / self._acquired, 4) if self._acquired else 0.0,
+            "waitSecondsMax": round(self._wait_max, 4),
+            "waitSecondsLast": round(self._wait_last, 4),
+            "recycles": self._recycles,
+            "crashes": self._crashes,
+            "failures": self._failures,
+            "blockedRequests": self._blocked,
+            "readyTimeouts": self._ready_timeouts,
+            "browsers": [
+                {"index": pb.index, "active": pb.active, "pagesServed": pb.pages_served, "launches": pb.launches}
+                for pb in self._browsers
+            ],
+        }
+
+
+_pool: BrowserPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BrowserPool:
+    """프로세스 전역 풀. FastAPI startup에서 미리 띄우지 않았다면 첫 호출 때 시작한다."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pool = BrowserPool()
+            pool.start()
+            _pool = pool
+        return _pool
+
+
+def _start_eagerly() -> bool:
+    if EAGER_START != "auto":
+        return EAGER_START in ("1", "true", "yes")
+    try:
+        return get_router().stats()["hosts"].get(DYNAMIC, 0) > 0
+    except Exception as exc:
+        LOG.warning("수집 경로를 확인할 수 없어 브라우저 풀은 필요할 때 시작: %r", exc)
+        return False
+
+
+def start_pool() -> None:
+    if not _start_eagerly():
+        return
+    try:
+        get_pool()
+    except Exception as exc:
+        LOG.error("브라우저 풀 시작 실패 (첫 요청 때 재시도): %s", exc)
+
+
+def stop_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.stop()
+            _pool = None
+
+
+def pool_stats() -> dict[str, Any]:
+    return _pool.stats() if _pool is not None else {"started": False}
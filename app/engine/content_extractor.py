@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+
+import markdownify
+from bs4 import BeautifulSoup, Comment, Doctype, NavigableString, Tag
+
+LOG = logging.getLogger(__name__)
+
+# AI 파서에 넘기는 본문 예산(토큰). 한국어가 섞인 페이지 기준 1토큰 ≈ 2.5자로 어림한다
+CONTENT_TOKEN_BUDGET = int(os.getenv("CONTENT_TOKEN_BUDGET", "6000"))
+CHARS_PER_TOKEN = 2.5
+CONTENT_MAX_CHARS = int(CONTENT_TOKEN_BUDGET * CHARS_PER_TOKEN)
+
+# 본문과 무관한 태그 / 역할 / id·class (메뉴, 푸터, 스크립트 등)
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "iframe", "svg", "canvas", "nav", "footer", "aside", "head"]
+BOILERPLATE_ROLES = ["navigation", "banner", "contentinfo", "search", "complementary"]
+BOILERPLATE_ATTR = re.compile(r"(^|[-_\s])(gnb|lnb|snb|footer|breadcrumbs?|sitemap|skip(nav)?|quick(menu)?|top-?menu)([-_\s]|$)", re.I)
+# 본문 영역 후보 (앞쪽이 우선). 충분한 텍스트가 있는 첫 번째 후보를 쓴다
+MAIN_SELECTORS = ["main", "[role=main]", "article", "#content", "#contents", ".content", ".contents", "#container", "#wrap"]
+MIN_MAIN_TEXT = 200
+# 예산을 넘는 큰 블록(표 등)은 이 깊이까지 자식 단위로 쪼개서 변환
+MAX_SPLIT_DEPTH = 4
+
+
+def strip_boilerplate(soup: BeautifulSoup | Tag) -> None:
+    for tag in soup.find_all(BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(attrs={"role": BOILERPLATE_ROLES}):
+        tag.decompose()
+    for tag in soup.find_all(lambda t: _is_boilerplate_block(t)):
+        tag.decompose()
+    for comment in soup.find_all(string=lambda s: isinstance(s, Comment)):
+        comment.extract()
+
+
+def _is_boilerplate_block(tag: Tag) -> bool:
+    if tag.attrs is None:  # 앞에서 이미 제거된 부모의 자식
+        return False
+    names = [tag.get("id") or "", *tag.get("class", [])]
+    return any(BOILERPLATE_ATTR.search(name) for name in names)
+
+
+def select_main(soup: BeautifulSoup) -> Tag:
+    for selector in MAIN_SELECTORS:
+        node = soup.select_one(selector)
+        if node is not None and len(node.get_text(" ", strip=True)) >= MIN_MAIN_TEXT:
+            return node
+    return soup.body or soup
+
+
+class _BudgetedWriter:
+    """본문 영역을 블록 단위로 마크다운 변환하면서, 예산이 차면 즉시 멈춘다."""
+
+    def __init__(self, max_chars: int) -> None:
+        self.converter = markdownify.MarkdownConverter(heading_style="ATX")
+        self.remaining = max_chars
+        self.parts: list[str] = []
+
+    @property
+    def full(self) -> bool:
+        return self.remaining <= 0
+
+    def write(self, node: Tag, depth: int = 0) -> None:
+        for child in node.children:
+            if self.full:
+                return
+            if isinstance(child, (Comment, Doctype)):
+                continue
+            if isinstance(child, NavigableString):
+                self._append(self.converter.process_text(child))
+                continue
+            # 예산보다 큰 블록은 통째로 변환하지 않고 자식 단위로 내려가서 필요한 만큼만 변환
+            if depth < MAX_SPLIT_DEPTH and child.find(True) is not None and len(child.get_text()) > self.remaining:
+                self.write(child, depth + 1)
+            else:
+                self._append(self.converter.process_tag(child, convert_as_inline=False))
+
+    def _append(self, text: str) -> None:
+        if not text.strip():
+            return
+        text = text[: self.remaining]
+        self.parts.append(text)
+        self.remaining -= len(text)
+
+    def result(self) -> str:
+        return re.sub(r"\n{3,}", "\n\n", "".join(self.parts)).strip()
+
+
+def extract_main_content(html: str, max_chars: int = CONTENT_MAX_CHARS) -> str:
+    """HTML에서 메뉴·푸터·스크립트를 걷어내고 본문 영역만 마크다운으로 변환한다 (max_chars에서 중단)."""
+    soup = BeautifulSoup(html, "html.parser")
+    strip_boilerplate(soup)
+    writer = _BudgetedWriter(max_chars)
+    writer.write(select_main(soup))
+    markdown = writer.result()
+    LOG.debug("본문 추출: HTML %d자 → 마크다운 %d자", len(html), len(markdown))
+    return markdown
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+from urllib.parse import urlsplit
+
+from app.engine.content_extractor import extract_main_content
+from app.engine.dynamic_fetcher import fetch_dynamic_async
+from app.engine.fetch_cache import FetchCache
+from app.engine.fetch_router import DYNAMIC, STATIC, FetchRouter, get_router, looks_like_js_shell
+from app.engine.static_fetcher import fetch_static
+from app.engine.validators import NOT_MODIFIED, commit_validators
+from app.parser.ai_parser import parse_with_ai
+from app.parser.registry import ListParser, find_parser
+
+LOG = logging.getLogger(__name__)
+
+# 전역 동시성 / 호스트별 동시성 / 단계별 타임아웃(초)
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+CRAWL_PER_HOST = int(os.getenv("CRAWL_PER_HOST", "2"))
+FETCH_TIMEOUT = float(os.getenv("CRAWL_FETCH_TIMEOUT", "45"))
+PARSE_TIMEOUT = float(os.getenv("CRAWL_PARSE_TIMEOUT", "60"))
+MIN_CONTENT_LENGTH = 100
+
+
+class CrawlEngine:
+    """여러 URL의 수집 → AI 파싱을 asyncio로 동시에 처리한다.
+
+    전체 처리량은 CRAWL_CONCURRENCY로, 같은 호스트에 동시에 나가는 요청은
+    CRAWL_PER_HOST로 제한한다. 각 단계는 개별 타임아웃을 가진다.
+    fetch_cache를 넘기면 같은 URL은 캐시 수명 동안 한 번만 수집한다.
+    validator_scope를 넘기면 먼저 조건부 GET(ETag/Last-Modified/본문 해시)으로 변경 여부를
+    확인하고, 변경이 없는 URL은 브라우저·AI 파싱 없이 바로 건너뛴다. 새 검증자는 호출자가
+    채점까지 마친 뒤 commit_validators()를 불러야 저장된다.
+    수집은 정적(requests) 우선이며, 정적 HTML이 JS 껍데기였던 호스트만 브라우저를 쓰고
+    그 결과를 호스트별로 기억한다(fetch_router).
+    파싱은 파서 레지스트리에 등록된 사이트면 전용 파서로, 아니면 AI 파서로 한다.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = CRAWL_CONCURRENCY,
+        per_host: int = CRAWL_PER_HOST,
+        fetch_timeout: float = FETCH_TIMEOUT,
+        parse_timeout: float = PARSE_TIMEOUT,
+        fetch_cache: FetchCache | None = None,
+        validator_scope: str | None = None,
+        router: FetchRouter | None = None,
+    ) -> None:
+        self.per_host = max(1, per_host)
+        self.fetch_timeout = fetch_timeout
+        self.parse_timeout = parse_timeout
+        self.fetch_cache = fetch_cache
+        self.validator_scope = validator_scope
+        self.router = router or get_router()
+        self._global = asyncio.Semaphore(max(1, concurrency))
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        # 파싱까지 성공한 URL → 실제로 수집한 주소 (검증자 저장 키)
+        self._parsed: dict[str, str] = {}
+        # 예외로 끝난 URL (LLM 사용 불가 등). 빈 게시판과 구분해 호출자가 실패로 처리
+        self.failed: set[str] = set()
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def _fetch_static(self, url: str, scope: str | None = None) -> Any:
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(fetch_static, url, scope), self.fetch_timeout)
+        except asyncio.TimeoutError:
+            LOG.warning("⏱️ 정적 수집 타임아웃(%ss): %s", self.fetch_timeout, url)
+            return None
+
+    async def fetch(self, url: str) -> Any:
+        """원본 HTML(또는 API 응답 본문)을 돌려준다. 마크다운 변환은 AI 파서로 갈 때만 한다."""
+        host = urlsplit(url).netloc.lower()
+        async with self._host_slot(url):
+            strategy = self.router.strategy(host)
+            html = None
+            # 0. 정적 수집 우선. 증분 모드면 조건부 요청으로 변경 여부도 함께 확인
+            #    (브라우저가 필요한 호스트라도 조건부 요청은 싸므로 먼저 보냄)
+            if strategy == STATIC or self.validator_scope is not None:
+                html = await self._fetch_static(url, self.validator_scope)
+                if html is NOT_MODIFIED:
+                    return html
+            if strategy == STATIC and html:
+                if not looks_like_js_shell(html):
+                    self.router.record(host, STATIC)
+                    return html
+                LOG.info("🧩 JS로 그려지는 페이지로 판단, 브라우저로 전환: %s", url)
+
+            # 1. 동적 수집 (Playwright 풀) — 학습된 호스트이거나 정적 결과가 빈 껍데기일 때만
+            try:
+                rendered = await asyncio.wait_for(fetch_dynamic_async(url), self.fetch_timeout)
+            except asyncio.TimeoutError:
+                LOG.warning("⏱️ 동적 수집 타임아웃(%ss): %s", self.fetch_timeout, url)
+                rendered = None
+            if rendered and len(rendered) >= MIN_CONTENT_LENGTH:
+                if strategy == STATIC and html:
+                    self.router.record(host, DYNAMIC)
+                return rendered
+
+            # 2. 브라우저도 실패하면 정적 결과라도 사용
+            LOG.warning("⚠️ 동적 수집 실패, 정적 결과 사용: %s", url)
+            return html or await self._fetch_static(url)
+
+    async def parse(self, content: str, url: str, user_profile: dict[str, Any]) -> list[dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(parse_with_ai, content, url, user_profile), self.parse_timeout
+            )
+        except asyncio.TimeoutError:
+            LOG.warning("⏱️ AI 파싱 타임아웃(%ss): %s", self.parse_timeout, url)
+            return []
+
+    async def parse_known(self, parser: ListParser, html: str, url: str) -> list[dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(parser.parse, html, url), self.parse_timeout)
+        except Exception as exc:
+            LOG.warning("⚠️ %s 전용 파서 실패 (%r): %s", parser.name, exc, url)
+            return []
+
+    async def crawl_url(self, url: str, user_profile: dict[str, Any]) -> list[dict[str, Any]]:
+        posts = await self._crawl_url(url, user_profile)
+        if posts:
+            parser = find_parser(url)
+            self._parsed[url] = parser.source_url(url) if parser else url
+        return posts
+
+    def commit_validators(self, urls: list[str]) -> int:
+        """처리가 끝난 URL들의 조건부 요청 검증자를 저장한다 (파싱 결과가 없던 URL은 다음에 다시 받음)."""
+        if self.validator_scope is None:
+            return 0
+        return sum(
+            commit_validators(self._parsed[url], self.validator_scope) for url in dict.fromkeys(urls) if url in self._parsed
+        )
+
+    async def _crawl_url(self, url: str, user_profile: dict[str, Any]) -> list[dict[str, Any]]:
+        async with self._global:
+            parser = find_parser(url)
+            source = parser.source_url(url) if parser else url
+            if self.fetch_cache is not None:
+                html = await self.fetch_cache.get_or_fetch(source, self.fetch)
+            else:
+                html = await self.fetch(source)
+            if html is NOT_MODIFIED:
+                LOG.info("🟰 변경 없음, 파싱 생략: %s", url)
+                return []
+            if not html:
+                LOG.error("❌ 모든 수집 수단 실패: %s", url)
+                return []
+
+            # 3-1. 구조를 아는 사이트는 전용 파서로 (LLM 호출 없음)
+            if parser is not None:
+                posts = await self.parse_known(parser, html, url)
+                if posts:
+                    LOG.info("🧾 %s 전용 파서: %d건 (%s)", parser.name, len(posts), url)
+                    return posts
+                LOG.warning("⚠️ %s 전용 파서 결과 없음, AI 파서로 대체: %s", parser.name, url)
+
+            # 3-2. 모르는 사이트: 본문만 추출해 AI 범용 파싱 (Gemini 2.0)
+            content = await asyncio.to_thread(extract_main_content, html)
+            if not content:
+                return []
+            return await self.parse(content, url, user_profile)
+
+    async def crawl(self, urls: list[str], user_profile: dict[str, Any]) -> list[list[dict[str, Any]]]:
+        """URL 순서대로 파싱 결과 목록을 돌려준다. 한 URL의 예외가 나머지를 막지 않는다."""
+        results = await asyncio.gather(
+            *(self.crawl_url(url, user_profile) for url in urls), return_exceptions=True
+        )
+        notices_per_url: list[list[dict[str, Any]]] = []
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                LOG.error("❌ %s 처리 중 오류: %r", url, result)
+                self.failed.add(url)
+                notices_per_url.append([])
+            else:
+                notices_per_url.append(result)
+        return notices_per_url
@@ -1,19 +1,21 @@
-from playwright.sync_api import sync_playwright
-import markdownify
+import asyncio
+
+from app.engine.browser_pool import get_pool
 
 def fetch_dynamic(url):
+    """렌더링된 HTML을 돌려줍니다. 마크다운 변환은 AI 파서로 넘길 때만 합니다 (content_extractor)."""
+    try:
+        # 매번 Chromium을 띄우지 않고 상주 브라우저 풀에서 격리된 컨텍스트를 빌려 씀
+        return get_pool().fetch_html(url)
+    except Exception as e:
+        print(f"Playwright 에러: {e}")
+        return None
+
+async def fetch_dynamic_async(url):
+    """fetch_dynamic의 비동기 버전 (크롤 엔진용)."""
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url, wait_until="networkidle", timeout=30000)
-            
-            # 자바스크립트 실행 후 전체 HTML 획득
-            html_content = page.content()
-            browser.close()
-            
-            # AI가 읽기 좋게 마크다운으로 변환
-            return markdownify.markdownify(html_content, heading_style="ATX")
+        pool = await asyncio.to_thread(get_pool)  # 아직 안 떠 있으면 루프를 막지 않고 기동
+        return await pool.fetch_html_async(url)
     except Exception as e:
         print(f"Playwright 에러: {e}")
-        return None
\ No newline at end of file
+        return None
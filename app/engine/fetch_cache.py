@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.engine.static_fetcher import response_validators, session
+
+LOG = logging.getLogger(__name__)
+
+FETCH_CACHE_TTL = float(os.getenv("FETCH_CACHE_TTL", "600"))
+REVALIDATE_TIMEOUT = 10
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """캐시 키용 URL 정규화: 스킴/호스트 소문자, 기본 포트·fragment 제거, 쿼리 정렬."""
+    parts = urlsplit(url.strip().replace("&amp;", "&"))
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+class _Entry:
+    __slots__ = ("content", "fetched_at", "etag", "last_modified")
+
+    def __init__(self, content: Any) -> None:
+        self.content = content
+        self.fetched_at = time.monotonic()
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+
+
+class FetchCache:
+    """디스패치 1회 동안 URL별 수집 결과를 공유하는 캐시.
+
+    항목은 받은 원본 HTML(증분 모드에서 변경이 없으면 NOT_MODIFIED)과, 그 GET 응답의
+    ETag/Last-Modified다. 실패(None)·빈 응답은 저장하지 않는다.
+    같은 게시판을 구독한 유저가 여러 명이어도 실제 수집은 한 번만 일어난다.
+    동시에 같은 URL을 요청하면 먼저 시작한 수집 결과를 함께 기다린다.
+    TTL이 지난 항목은 ETag/Last-Modified가 있으면 조건부 요청으로 재검증한다.
+    """
+
+    def __init__(self, ttl: float = FETCH_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._entries: dict[str, _Entry] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    async def get_or_fetch(self, url: str, fetch: Callable[[str], Awaitable[Any]]) -> Any:
+        key = normalize_url(url)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.monotonic() - entry.fetched_at < self.ttl:
+                self.hits += 1
+                return entry.content
+            if await asyncio.to_thread(self._revalidate, url, entry):
+                self.revalidated += 1
+                self.hits += 1
+                return entry.content
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            content = await fetch(url)
+            # 실패(None)·빈 응답은 저장하지 않는다. 일시적 실패가 TTL 동안 다른 구독자까지 가리지 않도록
+            if content:
+                entry = _Entry(content)
+                if isinstance(content, str):
+                    entry.etag, entry.last_modified = response_validators(url)
+                self._entries[key] = entry
+            future.set_result(content)
+            return content
+        except BaseException as exc:
+            future.set_exception(exc)
+            # 기다리는 쪽이 없으면 "exception was never retrieved" 경고가 나므로 소비해 둔다
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _revalidate(self, url: str, entry: _Entry) -> bool:
+        if not isinstance(entry.content, str) or not (entry.etag or entry.last_modified):
+            return False
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        try:
+            resp = session.get(url, headers=headers, timeout=REVALIDATE_TIMEOUT, stream=True)
+            resp.close()
+        except Exception as exc:
+            LOG.debug("재검증 실패 %s: %s", url, exc)
+            return False
+        if resp.status_code != 304:
+            return False
+        entry.fetched_at = time.monotonic()
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any
+
+LOG = logging.getLogger(__name__)
+
+FETCH_ROUTE_PATH = os.getenv("FETCH_ROUTE_PATH", "/tmp/fetch_routes.sqlite3")
+# '브라우저 필요'로 학습된 호스트도 이 기간이 지나면 정적 수집을 다시 시도해 본다 (사이트 개편 대비)
+FETCH_ROUTE_TTL = float(os.getenv("FETCH_ROUTE_TTL", str(7 * 24 * 3600)))
+STATIC = "static"
+DYNAMIC = "dynamic"
+# 보이는 텍스트가 이보다 짧으면 JS가 그려야 하는 빈 껍데기로 본다
+MIN_SHELL_TEXT = 200
+
+# SPA 마운트 지점이 비어 있거나, JS를 켜라는 안내만 있는 페이지
+_EMPTY_MOUNT = re.compile(r"<div[^>]+id=[\"'](root|app|__next|__nuxt)[\"'][^>]*>\s*</div>", re.I)
+_NOSCRIPT_HINT = re.compile(r"<noscript[^>]*>[^<]*(enable javascript|자바스크립트|javascript (is )?required)", re.I)
+_SCRIPT_BLOCK = re.compile(r"<script\b[^>]*>.*?</script>", re.I | re.S)
+_STYLE_BLOCK = re.compile(r"<style\b[^>]*>.*?</style>", re.I | re.S)
+_TAG = re.compile(r"<[^>]+>")
+
+
+def visible_text_length(html: str) -> int:
+    """파서 없이 정규식으로 어림한 보이는 텍스트 길이 (스크립트·스타일·태그 제외)."""
+    text = _TAG.sub(" ", _STYLE_BLOCK.sub(" ", _SCRIPT_BLOCK.sub(" ", html)))
+    return len(" ".join(text.split()))
+
+
+def looks_like_js_shell(html: str) -> bool:
+    """정적 HTML만으로는 내용이 없는 (브라우저에서 JS가 그려야 하는) 페이지인지 추정한다."""
+    if not html.lstrip().startswith("<"):
+        return False  # JSON 등 API 응답
+    text_length = visible_text_length(html)
+    if text_length >= MIN_SHELL_TEXT * 5:
+        return False
+    if _EMPTY_MOUNT.search(html) or _NOSCRIPT_HINT.search(html):
+        return True
+    if text_length < MIN_SHELL_TEXT:
+        return True
+    # 본문은 조금 있지만 HTML 대부분이 스크립트인 경우
+    script_bytes = sum(len(m) for m in _SCRIPT_BLOCK.findall(html))
+    return script_bytes > len(html) * 0.6
+
+
+class RouteStore:
+    """호스트별로 어떤 수집 방식이 통했는지 기억한다 (static | dynamic)."""
+
+    def __init__(self, path: str = FETCH_ROUTE_PATH) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fetch_routes ("
+            " host TEXT PRIMARY KEY, strategy TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, host: str) -> tuple[str, float] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT strategy, updated_at FROM fetch_routes WHERE host = ?", (host,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, host: str, strategy: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fetch_routes (host, strategy, updated_at) VALUES (?, ?, ?)",
+                (host, strategy, time.time()),
+            )
+            self._conn.commit()
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT strategy, COUNT(*) FROM fetch_routes GROUP BY strategy").fetchall()
+        return dict(rows)
+
+
+class FetchRouter:
+    """정적 수집 우선. 정적 결과가 JS 껍데기였던 호스트만 브라우저로 보낸다."""
+
+    def __init__(self, store: RouteStore | None = None, ttl: float = FETCH_ROUTE_TTL) -> None:
+        self.store = store
+        self.ttl = ttl
+        self.static_first = 0
+        self.dynamic_first = 0
+        self.learned = 0
+
+    def strategy(self, host: str) -> str:
+        known = None
+        if self.store is not None:
+            try:
+                known = self.store.get(host)
+            except Exception as exc:
+                LOG.warning("수집 경로 조회 실패 (%s): %r", host, exc)
+        if known and known[0] == DYNAMIC and time.time() - known[1] < self.ttl:
+            self.dynamic_first += 1
+            return DYNAMIC
+        self.static_first += 1
+        return STATIC
+
+    def record(self, host: str, strategy: str) -> None:
+        """정적 수집을 먼저 시도해 본 결과를 기록한다.
+
+        dynamic은 (처음 또는 TTL 만료 후) 재확인할 때마다 시각을 갱신해 TTL을 새로 시작하고,
+        static은 바뀐 경우에만 쓴다 (정적 수집이 성공할 때마다 쓰기가 일어나지 않도록).
+        """
+        if self.store is None:
+            return
+        try:
+            known = self.store.get(host)
+            if strategy == STATIC and known is not None and known[0] == STATIC:
+                return
+            if known is None or known[0] != strategy:
+                self.learned += 1
+                LOG.info("🧭 수집 경로 학습: %s → %s", host, strategy)
+            self.store.put(host, strategy)
+        except Exception as exc:
+            LOG.warning("수집 경로 저장 실패 (%s): %r", host, exc)
+
+    def stats(self) -> dict[str, Any]:
+        hosts: dict[str, int] = {}
+        if self.store is not None:
+            try:
+                hosts = self.store.counts()
+            except Exception:
+                pass
+        return {
+            "staticFirst": self.static_first,
+            "dynamicFirst": self.dynamic_first,
+            "learned": self.learned,
+            "hosts": hosts,
+        }
+
+
+_router: FetchRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> FetchRouter:
+    global _router
+    with _router_lock:
+        if _router is None:
+            try:
+                store = RouteStore()
+            except Exception as exc:
+                LOG.warning("수집 경로 저장소를 열 수 없어 매번 정적 수집부터 시도: %r", exc)
+                store = None
+            _router = FetchRouter(store)
+        return _router
+
+
+def set_router(router: FetchRouter) -> None:
+    global _router
+    with _router_lock:
+        _router = router
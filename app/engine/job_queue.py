@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from app.engine.offload import run_blocking
+
+LOG = logging.getLogger(__name__)
+
+# 동시에 처리하는 작업 수 (크롤링 + LLM + 콜백 한 사이클이 작업 하나)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# 백엔드: memory(기본, 테스트/단일 인스턴스) | sqlite (재시작 시 대기 중이던 작업을 다시 넣음)
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "memory").lower()
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "/tmp/jobs.sqlite3")
+# 끝난 작업을 조회용으로 보관하는 시간(초)
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", str(24 * 3600)))
+# 보관 기간이 지난 작업을 지우는 주기(초). 작업을 넣을 때마다 DELETE를 돌리지 않도록
+JOB_PRUNE_INTERVAL = float(os.getenv("JOB_PRUNE_INTERVAL", "600"))
+
+# 디스크에 남기지 않는 페이로드 필드 (콜백 인증 토큰 등). 어느 깊이에 있든 값을 None으로 바꿔 저장
+SECRET_FIELDS = frozenset({"authToken"})
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class Job:
+    """큐에 들어간 작업 하나. 시각은 epoch 초, 결과/에러는 끝난 뒤에만 채워진다."""
+
+    __slots__ = ("id", "kind", "payload", "status", "result", "error", "created_at", "started_at", "finished_at")
+
+    def __init__(self, kind: str, payload: dict[str, Any], job_id: str | None = None) -> None:
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """/jobs/{id} 응답 (페이로드는 민감 정보가 있을 수 있어 제외)."""
+        now = time.time()
+        started = self.started_at or (None if self.status == QUEUED else now)
+        return {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "queuedMs": round(((started or now) - self.created_at) * 1000),
+            "runMs": round(((self.finished_at or now) - started) * 1000) if started else None,
+        }
+
+    def to_row(self) -> dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "Job":
+        job = cls(row["kind"], row["payload"], row["id"])
+        for slot in ("status", "result", "error", "created_at", "started_at", "finished_at"):
+            setattr(job, slot, row[slot])
+        return job
+
+
+def redact(value: Any) -> Any:
+    """SECRET_FIELDS 값을 None으로 바꾼 사본."""
+    if isinstance(value, dict):
+        return {key: None if key in SECRET_FIELDS else redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+class MemoryJobStore:
+    """프로세스 메모리 저장소. 재시작하면 작업 기록이 사라진다."""
+
+    def __init__(self, retention: float = JOB_RETENTION) -> None:
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+
+    def put(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def update(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def pending(self) -> list[Job]:
+        return []  # 메모리 저장소는 재시작 후 되살릴 작업이 없음
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            counts: dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        expired = [jid for jid, job in self._jobs.items() if job.status in FINISHED and (job.finished_at or 0) < cutoff]
+        for jid in expired:
+            del self._jobs[jid]
+
+
+class SQLiteJobStore:
+    """작업을 SQLite에 기록한다. 재시작 시 queued/running 작업을 pending()으로 돌려준다.
+
+    메서드는 모두 블로킹이므로 JobQueue는 run_blocking으로 호출한다.
+
+    페이로드의 비밀 값(SECRET_FIELDS)은 평문으로 남기지 않으므로, 복구한 작업에는 그 값이 None이다
+    (핸들러가 확인해서 실패 처리해야 함).
+    """
+
+    def __init__(
+        self, path: str = JOB_STORE_PATH, retention: float = JOB_RETENTION, prune_interval: float = JOB_PRUNE_INTERVAL
+    ) -> None:
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL,"
+            " finished_at REAL, data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+        self._conn.commit()
+
+    def put(self, job: Job) -> None:
+        self.update(job)
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < self.prune_interval:
+                return
+            self._last_prune = now
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (now - self.retention,)
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(json.loads(row[0])) if row else None
+
+    def update(self, job: Job) -> None:
+        row = job.to_row()
+        row["payload"] = redact(job.payload)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, created_at, finished_at, data) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status, job.created_at, job.finished_at, json.dumps(row, default=str)),
+            )
+            self._conn.commit()
+
+    def pending(self) -> list[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [Job.from_row(json.loads(row[0])) for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+Handler = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class JobQueue:
+    """앱 이벤트 루프 안에서 도는 작업 큐. 워커 N개가 동시에 최대 N개의 작업을 처리한다.
+
+    핸들러는 kind별로 등록하는 async 함수이며, 반환값이 작업 결과(result)가 되고
+    예외가 나면 작업은 failed로 끝난다.
+    재시작 시 대기 중이던 작업만 다시 처리하고, 실행 중이던 작업은 (콜백을 이미 보냈을 수 있어)
+    다시 돌리지 않고 failed("interrupted")로 끝낸다.
+    저장소 호출은 블로킹 I/O라 이벤트 루프가 아니라 run_blocking 스레드에서 한다.
+    """
+
+    def __init__(self, store: Any = None, workers: int = JOB_WORKERS) -> None:
+        self.store = store if store is not None else MemoryJobStore()
+        self.workers = max(1, workers)
+        self._handlers: dict[str, Handler] = {}
+        self._queue: asyncio.Queue[str] | None = None
+        self._tasks: list[asyncio.Task] = []
+        # 이 프로세스에서 접수한 작업 원본 (저장소에는 비밀 값이 빠진 사본만 있을 수 있음)
+        self._live: dict[str, Job] = {}
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        # 이전 프로세스에서 대기 중이던 작업은 다시 넣고, 실행 중이던 작업은 실패로 끝냄
+        # (중간에 콜백을 이미 보냈을 수 있으므로 처음부터 다시 돌리면 중복 전송이 됨)
+        recovered = await run_blocking(self.store.pending)
+        interrupted = 0
+        for job in recovered:
+            if job.status == RUNNING:
+                job.status = FAILED
+                job.error = "interrupted"
+                job.finished_at = time.time()
+                interrupted += 1
+            else:
+                self._queue.put_nowait(job.id)
+            await run_blocking(self.store.update, job)
+        if recovered:
+            LOG.info(
+                "📋 이전에 끝나지 못한 작업: %d건 다시 대기, %d건 중단(실패) 처리", len(recovered) - interrupted, interrupted
+            )
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, kind: str, payload: dict[str, Any]) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"등록되지 않은 작업 종류: {kind}")
+        if self._queue is None:
+            await self.start()
+        job = Job(kind, payload)
+        self._live[job.id] = job
+        await run_blocking(self.store.put, job)
+        self._queue.put_nowait(job.id)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.store.get(job_id)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self._live.get(job_id) or await run_blocking(self.store.get, job_id)
+                if job is not None and job.status == QUEUED:
+                    await self._run(job)
+            except Exception:
+                LOG.exception("작업 워커 %d 오류 (job=%s)", index, job_id)
+            finally:
+                self._live.pop(job_id, None)
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        await run_blocking(self.store.update, job)
+        self.running += 1
+        try:
+            job.result = await self._handlers[job.kind](job.payload)
+            job.status = SUCCEEDED
+            self.succeeded += 1
+        except Exception as exc:
+            LOG.exception("❌ 작업 실패 (%s %s): %r", job.kind, job.id, exc)
+            job.status = FAILED
+            job.error = str(exc)
+            self.failed += 1
+        finally:
+            self.running -= 1
+            job.finished_at = time.time()
+            await run_blocking(self.store.update, job)
+
+    def stats(self) -> dict[str, Any]:
+        try:
+            stored = self.store.counts()
+        except Exception:
+            stored = {}
+        return {
+            "workers": self.workers,
+            "started": bool(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "stored": stored,
+        }
+
+
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(SQLiteJobStore() if JOB_STORE_BACKEND == "sqlite" else MemoryJobStore())
+        return _queue
+
+
+def set_queue(queue: JobQueue) -> None:
+    global _queue
+    with _queue_lock:
+        _queue = queue
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+LOG = logging.getLogger(__name__)
+
+# 엔드포인트의 동기 I/O(Supabase, 콜백 POST, 알림톡)를 돌릴 스레드 수.
+# 크롤링이 쓰는 asyncio 기본 실행기와 분리해 두어, 디스패치가 길어져도 /callback/save 등이 밀리지 않게 한다
+API_IO_WORKERS = int(os.getenv("API_IO_WORKERS", "16"))
+
+
+class BlockingExecutor:
+    """이벤트 루프를 막는 동기 호출을 전용 스레드 풀로 넘기고, 대기/실행 시간을 집계한다."""
+
+    def __init__(self, workers: int = API_IO_WORKERS) -> None:
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api-io")
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.queue_wait_max = 0.0
+        self.run_max = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        submitted = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            result = await loop.run_in_executor(self._executor, functools.partial(self._timed, fn, submitted, *args, **kwargs))
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def _timed(self, fn: Callable[..., Any], submitted: float, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.queue_wait_max = max(self.queue_wait_max, started - submitted)
+                self.run_max = max(self.run_max, elapsed)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "inFlight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "queueWaitMaxMs": round(self.queue_wait_max * 1000, 1),
+                "runMaxMs": round(self.run_max * 1000, 1),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: BlockingExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> BlockingExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = BlockingExecutor()
+        return _executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """async 엔드포인트에서 동기 함수를 호출할 때 사용 (await run_blocking(fn, ...))."""
+    return await get_executor().run(fn, *args, **kwargs)
+
+
+def offload_stats() -> dict[str, Any]:
+    return _executor.stats() if _executor is not None else {"started": False}
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
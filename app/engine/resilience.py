@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable
+
+import httpx
+import requests
+
+LOG = logging.getLogger(__name__)
+
+# 재시도: 최대 시도 횟수, 지수 백오프 기준/상한(초). 대기 시간은 [0, min(상한, 기준 * 2^n)] 구간에서 무작위 (full jitter)
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+# 서킷 브레이커: 연속 실패가 이만큼 쌓이면 cooldown 동안 호출하지 않고 바로 실패시킴
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# 제공자별 초당 호출 수 기본값 (<NAME>_RATE 환경변수로 변경, 예: GEMINI_RATE=20)
+DEFAULT_RATES = {"gemini": 10.0, "openai": 5.0, "alimtalk": 5.0}
+# 같은 요청을 두 번 보내면 안 되는 제공자 (알림톡은 5xx에 재전송하면 중복 발송될 수 있음)
+NON_IDEMPOTENT = frozenset({"alimtalk"})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """제공자가 장애 상태로 판단되어 호출하지 않고 바로 실패시킴."""
+
+    def __init__(self, provider: str, retry_in: float) -> None:
+        super().__init__(f"{provider} circuit open (retry in {retry_in:.1f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class RetryableStatus(Exception):
+    """응답 상태코드가 재시도 대상 (429/5xx). 재시도가 끝나면 원래 응답을 그대로 돌려준다."""
+
+    def __init__(self, response: Any) -> None:
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+def retry_after_seconds(response: Any) -> float | None:
+    """Retry-After 헤더 (초 또는 HTTP 날짜)."""
+    headers = getattr(response, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def status_of(exc: BaseException) -> int | None:
+    """예외에서 HTTP 상태코드를 꺼낸다 (requests/httpx HTTP 에러, google-genai APIError.code 등)."""
+    if isinstance(exc, RetryableStatus):
+        return exc.response.status_code
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+class TokenBucket:
+    """초당 rate개, 최대 burst개까지 쌓이는 토큰 버킷. 스레드와 asyncio 양쪽에서 쓴다.
+
+    토큰을 미리 예약(음수 허용)하고 부족분만큼 기다리므로, 대기자가 여럿이어도 순서대로 rate에 맞춰 풀린다.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        self.rate = max(rate, 0.001)
+        self.burst = max(1, burst or int(rate) or 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def reserve(self) -> float:
+        """토큰 하나를 예약하고 기다려야 하는 시간(초)을 돌려준다."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            self.waited += wait
+            return wait
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """연속 failures번 실패하면 열림(open) → cooldown 뒤 한 번만 시험 호출(half-open) → 성공하면 닫힘."""
+
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN) -> None:
+        self.name = name
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def before_call(self) -> bool:
+        """호출해도 되면 반환, 아니면 CircuitOpenError. half-open 시험 호출이면 True를 돌려준다."""
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self.state = HALF_OPEN
+                self._trial = False
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True  # 시험 호출은 한 번에 하나만
+                return True
+            raise CircuitOpenError(self.name, max(0.0, remaining))
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                LOG.info("🔌 %s 서킷 닫힘 (복구)", self.name)
+            self.state = CLOSED
+            self._consecutive = 0
+            self._trial = False
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            if self.state == HALF_OPEN or self._consecutive >= self.failures:
+                if self.state != OPEN:
+                    self.opened += 1
+                    LOG.warning("🔌 %s 서킷 열림: 연속 실패 %d회, %.0f초간 호출 차단", self.name, self._consecutive, self.cooldown)
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def trial_failed(self) -> None:
+        """시험 호출이 성공으로 끝나지 않았으면(429·4xx·취소 포함) 다시 열어서 cooldown 뒤에 재시험."""
+        with self._lock:
+            if self.state == CLOSED and not self._trial:
+                return
+            if self.state != OPEN:
+                LOG.warning("🔌 %s 서킷 시험 호출 실패, %.0f초간 다시 차단", self.name, self.cooldown)
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._trial = False
+
+
+class Provider:
+    """외부 API 하나(gemini, openai, alimtalk)에 대한 속도 제한 + 서킷 브레이커 + 재시도 + 지표.
+
+    idempotent=False인 제공자(알림톡 발송)는 요청이 서버에 닿지 않았다고 확실한 경우
+    (429, 연결 실패)에만 재시도해서 중복 발송을 막는다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        attempts: int = RETRY_ATTEMPTS,
+        idempotent: bool = True,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        self.name = name
+        self.bucket = TokenBucket(rate)
+        self.breaker = breaker or CircuitBreaker(name)
+        self.attempts = max(1, attempts)
+        self.idempotent = idempotent
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.last_error: str | None = None
+
+    # --- 판정 ---
+    def fault(self, exc: BaseException) -> bool:
+        """제공자 쪽 장애(5xx, 연결·타임아웃)인지. 서킷 브레이커는 이것만 센다.
+
+        429는 장애가 아니라 속도 초과라서 백오프로만 대응하고 브레이커에는 반영하지 않는다.
+        """
+        status = status_of(exc)
+        if status is not None:
+            return status in RETRY_STATUSES and status != 429
+        return isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError, TimeoutError, ConnectionError))
+
+    def throttled(self, exc: BaseException) -> bool:
+        return status_of(exc) == 429
+
+    def unavailable(self, exc: BaseException) -> bool:
+        """재시도를 다 쓰고도 실패했거나 서킷이 열려 있어, 결과를 "없음"으로 취급하면 안 되는 실패인지."""
+        return isinstance(exc, CircuitOpenError) or self.throttled(exc) or self.fault(exc)
+
+    def retryable(self, exc: BaseException) -> bool:
+        if self.throttled(exc):
+            return True
+        if self.idempotent:
+            return self.fault(exc)
+        if status_of(exc) is not None:
+            return False
+        return isinstance(exc, (requests.ConnectTimeout, httpx.ConnectError, httpx.ConnectTimeout))
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        retry_after = retry_after_seconds(getattr(exc, "response", None))
+        if retry_after is not None:
+            return min(retry_after, RETRY_MAX_DELAY)
+        return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+    # --- 호출 ---
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """fn을 동기로 호출한다. 재시도 대상 실패면 백오프 후 다시, 그 외 예외는 그대로 올린다."""
+        for attempt in range(self.attempts):
+            trial = self._before()
+            ok = False
+            try:
+                self.bucket.acquire()
+                started = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as exc:
+                    delay = self._after_failure(exc, attempt, started, trial)
+                    if delay is None:
+                        raise
+                else:
+                    self._after_success(started)
+                    ok = True
+                    return result
+            finally:
+                if trial and not ok:
+                    self.breaker.trial_failed()
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def call_async(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        for attempt in range(self.attempts):
+            trial = self._before()
+            ok = False
+            try:
+                await self.bucket.acquire_async()
+                started = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception as exc:
+                    delay = self._after_failure(exc, attempt, started, trial)
+                    if delay is None:
+                        raise
+                else:
+                    self._after_success(started)
+                    ok = True
+                    return result
+            finally:
+                # 시험 호출이 성공하지 못했으면(취소 등 BaseException 포함) 반드시 다시 열어서 half-open에 갇히지 않게 함
+                if trial and not ok:
+                    self.breaker.trial_failed()
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def request(self, session: requests.Session, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """requests 세션 호출. 429/5xx(비멱등 제공자는 429만)는 재시도하고, 재시도가 끝나면 마지막 응답을 그대로 돌려준다."""
+        try:
+            return self.call(self._checked, session.request, method, url, **kwargs)
+        except RetryableStatus as exc:
+            return exc.response
+
+    async def request_async(self, client: httpx.AsyncClient, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        async def send() -> httpx.Response:
+            return self._raise_retryable(await client.request(method, url, **kwargs))
+
+        try:
+            return await self.call_async(send)
+        except RetryableStatus as exc:
+            return exc.response
+
+    def _checked(self, send: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return self._raise_retryable(send(*args, **kwargs))
+
+    @staticmethod
+    def _raise_retryable(response: Any) -> Any:
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableStatus(response)
+        return response
+
+    # --- 상태/지표 기록 ---
+    def _before(self) -> bool:
+        try:
+            return self.breaker.before_call()
+        except CircuitOpenError:
+            with self._lock:
+                self.short_circuited += 1
+            raise
+
+    def _after_success(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.breaker.on_success()
+        with self._lock:
+            self.calls += 1
+            self.successes += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+
+    def _after_failure(self, exc: Exception, attempt: int, started: float, trial: bool = False) -> float | None:
+        """실패를 기록하고, 재시도할 거면 대기 시간을, 아니면 None을 돌려준다."""
+        elapsed = time.perf_counter() - started
+        retryable = self.retryable(exc)
+        if trial:
+            pass  # 시험 호출 실패는 호출부의 finally에서 trial_failed()로 처리
+        elif self.fault(exc):
+            self.breaker.on_failure()
+        elif not self.throttled(exc):
+            # 요청 자체가 잘못된 경우(4xx 등)는 제공자가 응답한 것이므로 장애로 세지 않음
+            self.breaker.on_success()
+        with self._lock:
+            self.calls += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            self.last_error = repr(exc)[:200]
+            # 시험 호출은 재시도하지 않음 (실패하면 어차피 서킷이 다시 열림)
+            if not retryable or trial or attempt + 1 >= self.attempts:
+                self.failures += 1
+                return None
+            self.retries += 1
+        delay = self.backoff(attempt, exc)
+        LOG.warning("🔁 %s 재시도 %d/%d (%.1fs 후): %r", self.name, attempt + 1, self.attempts - 1, delay, exc)
+        return delay
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "retries": self.retries,
+                "shortCircuited": self.short_circuited,
+                "circuit": self.breaker.state,
+                "circuitOpened": self.breaker.opened,
+                "avgLatencyMs": round(self.latency_total / self.calls * 1000, 1) if self.calls else 0.0,
+                "maxLatencyMs": round(self.latency_max * 1000, 1),
+                "rateWaitMs": round(self.bucket.waited * 1000, 1),
+                "lastError": self.last_error,
+            }
+
+
+_providers: dict[str, Provider] = {}
+_providers_lock = threading.Lock()
+
+
+def provider(name: str) -> Provider:
+    """이름별 Provider (처음 부를 때 만들어 프로세스 안에서 공유)."""
+    with _providers_lock:
+        found = _providers.get(name)
+        if found is None:
+            rate = float(os.getenv(f"{name.upper()}_RATE", str(DEFAULT_RATES.get(name, 10.0))))
+            found = _providers[name] = Provider(name, rate, idempotent=name not in NON_IDEMPOTENT)
+        return found
+
+
+def set_provider(p: Provider) -> None:
+    with _providers_lock:
+        _providers[p.name] = p
+
+
+def resilience_stats() -> dict[str, Any]:
+    with _providers_lock:
+        providers = list(_providers.values())
+    return {p.name: p.stats() for p in providers}
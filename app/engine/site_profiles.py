@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import re
+from urllib.parse import urlsplit
+
+# 모든 사이트에서 막는 리소스 종류 (본문 HTML만 필요하므로 렌더링용 자원은 받지 않음)
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+# 준비 셀렉터를 기다리는 최대 시간(ms). 넘으면 그 시점의 DOM을 그대로 사용
+READY_TIMEOUT_MS = int(os.getenv("BROWSER_READY_TIMEOUT_MS", "10000"))
+# 2단계 국가 도메인 (korea.ac.kr → 사이트 단위는 마지막 세 라벨)
+_SECOND_LEVEL = {"ac", "co", "go", "or", "ne", "re", "pe", "ms"}
+
+
+class SiteProfile:
+    """사이트별 Playwright 수집 방식: 어떤 이벤트까지 기다릴지, 어떤 요소가 보이면 준비된 것으로 볼지."""
+
+    __slots__ = ("name", "pattern", "wait_until", "ready_selector", "block_third_party")
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str,
+        wait_until: str = "domcontentloaded",
+        ready_selector: str | None = None,
+        block_third_party: bool = True,
+    ) -> None:
+        self.name = name
+        self.pattern = re.compile(pattern, re.I)
+        self.wait_until = wait_until
+        self.ready_selector = ready_selector
+        self.block_third_party = block_third_party
+
+    def __repr__(self) -> str:
+        return f"SiteProfile({self.name!r})"
+
+
+# URL 패턴 순서대로 첫 번째로 맞는 프로필을 쓴다
+SITE_PROFILES = [
+    # 고려대 정보대: 게시판 목록의 제목 링크 또는 상세 본문 영역
+    SiteProfile("korea_univ", r"^https?://([^/]+\.)?korea\.ac\.kr/", ready_selector="tr a.article-title, .view-con, .fr-view"),
+    SiteProfile("ewha", r"^https?://([^/]+\.)?ewha\.ac\.kr/", ready_selector="tbody tr a"),
+    # 서강대는 API 응답으로 목록을 그리는 SPA라 글 링크가 붙을 때까지 기다림
+    SiteProfile("sogang", r"^https?://([^/]+\.)?sogang\.ac\.kr/", ready_selector="a[href*='/notices/']"),
+]
+# 모르는 사이트: 준비 셀렉터를 알 수 없으니 (리소스를 막은 상태에서) 네트워크가 잠잠해질 때까지 기다림
+DEFAULT_PROFILE = SiteProfile("default", r".*", wait_until="networkidle")
+
+
+def profile_for(url: str) -> SiteProfile:
+    for profile in SITE_PROFILES:
+        if profile.pattern.match(url):
+            return profile
+    return DEFAULT_PROFILE
+
+
+def site_of(host: str) -> str:
+    """호스트의 사이트 단위 도메인 (info.korea.ac.kr → korea.ac.kr, cdn.example.com → example.com)."""
+    labels = host.lower().split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def is_third_party(request_url: str, page_url: str) -> bool:
+    host = urlsplit(request_url).hostname or ""
+    if not host:  # data:, blob: 등
+        return False
+    return site_of(host) != site_of(urlsplit(page_url).hostname or "")
@@ -1,5 +1,9 @@
 import requests
 import logging
+import threading
+from collections import OrderedDict
+
+from app.engine.validators import conditional_get
 
 LOG = logging.getLogger(__name__)
 session = requests.Session()
@@ -7,12 +11,44 @@ session.headers.update({
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36..."
 })
 
-def fetch_static(url):
+# 최근 200 응답의 ETag/Last-Modified (URL별). fetch_cache가 따로 HEAD 요청 없이 재검증에 쓴다.
+RESPONSE_VALIDATORS_MAX = 2048
+_response_validators = OrderedDict()
+_response_validators_lock = threading.Lock()
+
+
+def _remember_validators(resp, *args, **kwargs):
+    if resp.status_code != 200:
+        return
+    with _response_validators_lock:
+        _response_validators[resp.request.url] = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        _response_validators.move_to_end(resp.request.url)
+        while len(_response_validators) > RESPONSE_VALIDATORS_MAX:
+            _response_validators.popitem(last=False)
+
+
+session.hooks["response"].append(_remember_validators)
+
+
+def response_validators(url):
+    """이 세션으로 마지막에 받은 url의 200 응답 (ETag, Last-Modified). 없으면 (None, None)."""
+    try:
+        # 세션이 보낸 URL(퍼센트 인코딩 등)과 같은 형태로 맞춰서 찾는다
+        url = requests.Request("GET", url).prepare().url
+    except Exception:
+        pass
+    with _response_validators_lock:
+        return _response_validators.get(url, (None, None))
+
+def fetch_static(url, scope=None):
+    """scope를 주면 ETag/Last-Modified 조건부 요청을 보내고, 변경이 없으면 NOT_MODIFIED를 반환합니다."""
     try:
+        if scope is not None:
+            return conditional_get(session, url, timeout=15, scope=scope, encoding='utf-8')
         resp = session.get(url, timeout=15)
         resp.encoding = 'utf-8'
         resp.raise_for_status()
         return resp.text
     except Exception as e:
         LOG.error(f"정적 수집 중 에러: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import requests
+
+LOG = logging.getLogger(__name__)
+
+VALIDATOR_STORE_PATH = os.getenv("VALIDATOR_STORE_PATH", "/tmp/http_validators.sqlite3")
+# /tmp는 Cloud Run에서 메모리이므로 오래된 항목은 지우고 전체 개수도 제한 (상세 페이지 본문이 쌓이지 않게)
+VALIDATOR_TTL = float(os.getenv("VALIDATOR_TTL", str(14 * 24 * 3600)))
+VALIDATOR_MAX_ENTRIES = int(os.getenv("VALIDATOR_MAX_ENTRIES", "5000"))
+# 정리(만료/개수 초과 삭제)는 쓰기 이만큼마다 한 번
+VALIDATOR_PRUNE_EVERY = 100
+
+
+class _NotModified:
+    """조건부 요청 결과 '변경 없음'. 파이프라인에서는 할 일 없는 no-op으로 취급한다."""
+
+    _instance = None
+
+    def __new__(cls) -> "_NotModified":
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __repr__(self) -> str:
+        return "NOT_MODIFIED"
+
+
+NOT_MODIFIED = _NotModified()
+
+
+class ValidatorStore:
+    """URL별 ETag / Last-Modified / 본문 해시(+선택적으로 본문)를 기억한다.
+
+    목록 페이지의 검증자는 바로 저장하지 않고 stage()로 메모리에 올려 두었다가, 호출자가 파싱·채점까지
+    마친 뒤 commit()해야 저장된다. 중간에 실패하면 다음 실행에서 다시 '변경됨'으로 처리된다.
+    """
+
+    def __init__(
+        self, path: str = VALIDATOR_STORE_PATH, ttl: float = VALIDATOR_TTL, max_entries: int = VALIDATOR_MAX_ENTRIES
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_validators"
+            " (key TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(http_validators)")}
+        if "updated" not in columns:
+            # 이전 버전에서 만든 파일
+            self._conn.execute("ALTER TABLE http_validators ADD COLUMN updated REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS http_validators_updated ON http_validators(updated)")
+        self._conn.commit()
+
+    def get(self, key: str) -> dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM http_validators WHERE key = ? AND updated >= ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def put(self, key: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_validators (key, data, updated) VALUES (?, ?, ?)",
+                (key, json.dumps(data, ensure_ascii=False), time.time()),
+            )
+            self._writes += 1
+            if self._writes % VALIDATOR_PRUNE_EVERY == 0:
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self) -> None:
+        self._conn.execute("DELETE FROM http_validators WHERE updated < ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM http_validators WHERE key IN"
+            " (SELECT key FROM http_validators ORDER BY updated DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stage(self, key: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._pending[key] = data
+
+    def commit(self, key: str) -> bool:
+        """stage()해 둔 검증자를 저장한다. 올려 둔 게 없으면 False."""
+        with self._lock:
+            data = self._pending.pop(key, None)
+        if data is None:
+            return False
+        self.put(key, data)
+        return True
+
+
+_store: ValidatorStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ValidatorStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ValidatorStore()
+        return _store
+
+
+def set_store(store: ValidatorStore) -> None:
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def commit_validators(url: str, scope: str = "") -> bool:
+    """conditional_get으로 받은 목록 페이지를 끝까지 처리했을 때 호출. 그 뒤로는 변경이 없으면 NOT_MODIFIED가 된다."""
+    try:
+        return get_store().commit(f"{scope}|{url}")
+    except Exception as exc:
+        LOG.warning("검증자 저장 실패: %r", exc)
+        return False
+
+
+def conditional_get(
+    session: requests.Session,
+    url: str,
+    *,
+    timeout: float,
+    scope: str = "",
+    encoding: str | None = None,
+    keep_body: bool = False,
+) -> str | _NotModified:
+    """If-None-Match / If-Modified-Since를 붙여 GET 한다.
+
+    304 이거나, (서버가 검증자를 주지 않아) 200을 받았더라도 본문 해시가 지난번과 같으면
+    NOT_MODIFIED를 돌려준다.
+    keep_body=True면 마지막 본문을 저장해 두었다가 '변경 없음'일 때 그 본문을 대신 돌려준다
+    (상세 페이지처럼 내용 자체가 필요한 경우).
+    keep_body=False면 새 검증자는 stage만 되고, 호출자가 후속 처리(파싱·채점)를 마친 뒤
+    commit_validators(url, scope)를 불러야 저장된다.
+    scope는 같은 URL을 서로 다른 소비자(유저 등)가 따로 추적할 때 키를 나누는 용도다.
+    """
+    store = get_store()
+    key = f"{scope}|{url}"
+    try:
+        known = store.get(key)
+    except Exception as exc:
+        LOG.warning("검증자 저장소 조회 실패: %r", exc)
+        known = {}
+
+    # 본문을 돌려줘야 하는데 저장된 본문이 없으면 조건부 헤더 없이 새로 받음
+    if keep_body and known.get("body") is None:
+        known = {}
+
+    headers = {}
+    if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+
+    resp = session.get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304:
+        LOG.info("🟰 304 Not Modified: %s", url)
+        return known["body"] if keep_body else NOT_MODIFIED
+    resp.raise_for_status()
+    if encoding:
+        resp.encoding = encoding
+
+    body_hash = hashlib.sha256(resp.content).hexdigest()
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    # 검증자가 없거나 서버가 조건부 헤더를 무시하고 200을 주는 경우에도 본문이 같으면 변경 없음
+    unchanged = known.get("hash") == body_hash
+
+    data = {"etag": etag, "last_modified": last_modified, "hash": body_hash}
+    if keep_body:
+        data["body"] = resp.text
+    try:
+        # 본문을 돌려주는 경우와 이미 처리한 본문과 같은 경우는 실패해도 다시 건너뛸 일이 없으므로 바로 저장
+        if keep_body or unchanged:
+            store.put(key, data)
+        else:
+            store.stage(key, data)
+    except Exception as exc:
+        LOG.warning("검증자 저장 실패: %r", exc)
+
+    if unchanged and not keep_body:
+        LOG.info("🟰 본문 해시 동일 (변경 없음): %s", url)
+        return NOT_MODIFIED
+    return resp.text
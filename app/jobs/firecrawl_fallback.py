@@ -12,6 +12,7 @@ from bs4 import BeautifulSoup
 from zoneinfo import ZoneInfo
 from google import genai  # 신형 라이브러리
 from dotenv import load_dotenv
+from app.engine.resilience import provider
 
 load_dotenv() # .env 파일을 읽어서 os.getenv가 값을 찾을 수 있게 해줌
 # 로깅 설정
@@ -96,7 +97,8 @@ def score_notice(profile_text: str, title: str, link: str) -> tuple[bool, str]:
     
     try:
         # 신형 SDK 호출 방식: client.models.generate_content
-        response = client.models.generate_content(
+        response = provider("gemini").call(
+            client.models.generate_content,
             model='gemini-1.5-flash',
             contents=user_prompt,
             config=config
@@ -114,6 +116,9 @@ def score_notice(profile_text: str, title: str, link: str) -> tuple[bool, str]:
         return False, "ambiguous"
 
     except Exception as exc:
+        # 재시도 소진·서킷 열림은 NO로 덮지 않고 게시판 오류로 올림
+        if provider("gemini").unavailable(exc):
+            raise
         LOG.error(f"Gemini 호출 에러 (제목: {title}): {exc}")
         return False, "gemini-error"
 def send_kakao(contact: str, template_code: str, template_param: dict[str, str]) -> dict[str, Any]:
@@ -126,7 +131,7 @@ def send_kakao(contact: str, template_code: str, template_param: dict[str, str])
     url = f"https://api-alimtalk.cloud.toast.com/alimtalk/v2.2/appkeys/{APP_KEY}/messages"
     
     try:
-        resp = session.post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+        resp = provider("alimtalk").request(session, "POST", url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
         if resp.status_code != 200:
             LOG.error(f"카카오 전송 실패: {resp.status_code} {resp.text}")
             return {"status": resp.status_code, "error": resp.text}
@@ -1,9 +1,6 @@
 from __future__ import annotations
 import re
 
-import pytesseract
-from PIL import Image
-from io import BytesIO
 import json
 import logging
 import sys
@@ -14,10 +11,16 @@ from urllib.parse import urljoin
 import requests
 from bs4 import BeautifulSoup
 from zoneinfo import ZoneInfo
-import numpy as np
-import cv2
 from google import genai  # 신형 라이브러리
 from dotenv import load_dotenv
+from app.database.llm_cache import cached_llm_call, get_cache
+from app.database.crawl_state import BoardWatermark, is_incremental, load_watermark, save_watermark
+from app.engine.fetch_cache import normalize_url
+from app.engine.resilience import provider
+from app.engine.validators import NOT_MODIFIED, commit_validators, conditional_get
+from app.parser.custom.korea_univ import parse_korea_univ
+from app.parser.ocr import OCRRun
+from app.structured_log import BoardTrace, RunSummary
 RECIPIENTS_DEFAULT = [
     {"name": "관리자", "contact": "01026570090"} 
 ]
@@ -38,7 +41,6 @@ session.headers.update({
 load_dotenv() # .env 파일을 읽어서 os.getenv가 값을 찾을 수 있게 해줌
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
-pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'
 BASE_URL_DEFAULT = "https://info.korea.ac.kr/info/board/"
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
 SENDER_KEY = os.getenv("KAKAO_SENDER_KEY")
@@ -57,6 +59,28 @@ LOOKBACK_DAYS = int(os.getenv("LOOKBACK_DAYS", "70"))
 TIMEZONE = ZoneInfo("Asia/Seoul")
 # [추가] AI 제공자를 환경변수에서 선택 (기본값: gemini)
 AI_PROVIDER = os.getenv("AI_PROVIDER", "gemini").lower() 
+# 적합 판정 기준 점수 (0.0~1.0)
+RELEVANCE_THRESHOLD = float(os.getenv("RELEVANCE_THRESHOLD", "0.6"))
+# 한 번의 AI 호출로 채점할 공지 수 (1이면 기존처럼 건별 채점)
+SCORE_BATCH_SIZE = int(os.getenv("SCORE_BATCH_SIZE", "20"))
+# LLM 캐시 키에 들어가는 프롬프트 템플릿 버전 (프롬프트를 고치면 올려서 이전 캐시를 무효화)
+SCORE_MODEL = "gemini-2.0-flash"
+ASK_AI_PROMPT_VERSION = "ask_ai-v1"
+BATCH_SCORE_PROMPT_VERSION = "score-batch-v1"
+SUMMARY_PROMPT_VERSION = "summary-v1"
+# 배치 채점 응답 스키마 (id별 점수/사유)
+BATCH_SCORE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "STRING"},
+            "score": {"type": "NUMBER"},
+            "reason": {"type": "STRING"},
+        },
+        "required": ["id", "score", "reason"],
+    },
+}
 # OpenAI 키도 필요하면 여기서 불러오기 (나중을 위해)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
@@ -73,11 +97,12 @@ def run(event: dict[str, Any], context: Any | None = None) -> dict[str, Any]:
     
     # 1. 인풋 데이터 파싱
     user_profile = event.get("userProfile", {})
-    major = user_profile.get("major", "")
-    interests = ", ".join(user_profile.get("interestFields", []))
-    combined_profile = f"전공: {major}, 관심분야: {interests}"
+    combined_profile = build_profile_text(user_profile)
     interval = user_profile.get("intervalDays", 3)
     callback_url = event.get("callbackUrl", "")
+    # 증분 모드: 이전 실행에서 본 글(워터마크) 이후의 글만 처리
+    incremental = is_incremental(event)
+    user_id = event.get("userId")
 
     # [수정] targetUrls 리스트 추출 (없으면 단일 targetUrl이라도 리스트로 변환)
     raw_urls = event.get("targetUrls") or [event.get("targetUrl")]
@@ -88,6 +113,10 @@ def run(event: dict[str, Any], context: Any | None = None) -> dict[str, Any]:
 
     aligned_total = []
     total_scanned_count = 0 
+    # 실행 단위 OCR: 이미지는 프로세스 풀에서 병렬로 돌리고, 같은 이미지는 한 번만 OCR
+    ocr = OCRRun()
+    # 행 단위 로그 대신 게시판별 집계를 모아 끝에 요약 한 줄로 남김 (event.debug로 특정 게시판만 추적 가능)
+    run_log = RunSummary(LOG, "korea_university", debug=event.get("debug"), userId=user_id, incremental=incremental)
 
     # 2. [핵심] 전달받은 모든 URL을 순회
     for current_url in target_urls:
@@ -102,31 +131,55 @@ def run(event: dict[str, Any], context: Any | None = None) -> dict[str, Any]:
         
         # 카테고리를 못 찾으면 기본값(정보대소식 등) 설정하거나 스킵
         if not current_board:
-            LOG.warning(f"⚠️ 카테고리를 알 수 없는 URL 스킵: {current_url}")
+            LOG.warning("⚠️ 카테고리를 알 수 없는 URL 스킵: %s", current_url)
             continue
 
+        trace = run_log.board(current_url, current_board["name"], current_board["category"])
         try:
-            LOG.info(f"🔎 {current_board['name']} 게시판 분석 시작... ({current_url})")
+            watermark_key = f"{user_id}:{normalize_url(current_url)}"
             # fetch_board 대신 직접 current_url 사용 (파라미터 유지 때문)
-            resp = session.get(current_url, timeout=HTTP_TIMEOUT)
-            resp.raise_for_status()
-            html = resp.text
+            # 증분 모드에서는 조건부 요청: 304/본문 동일이면 파싱도 하지 않고 건너뜀
+            validator_scope = f"user:{user_id}" if incremental else None
+            html = fetch_page(current_url, scope=validator_scope)
+            if html is NOT_MODIFIED:
+                trace.count("notModified")
+                continue
             
-            posts = parse_posts(html, current_url, interval) 
+            watermark = load_watermark(watermark_key) if incremental else None
+
+            posts = parse_posts(html, current_url, interval, watermark, trace)
             total_scanned_count += len(posts)
+
+            # 새 글이 없으면 AI 평가·본문 수집 없이 바로 다음 게시판으로
+            if incremental and not posts:
+                commit_validators(current_url, validator_scope)
+                continue
             
             # AI 평가
-            aligned, _ = evaluate_posts(combined_profile, current_board["name"], posts)
+            aligned, _ = evaluate_posts(combined_profile, current_board["name"], posts, ocr, trace)
             aligned_total.extend(aligned)
+
+            if watermark is not None:
+                watermark.advance(
+                    [p["link"] for p in posts],
+                    [datetime.strptime(p["date"], "%Y-%m-%d").date() for p in posts],
+                )
+                save_watermark(watermark_key, watermark)
+            # 평가까지 끝난 게시판만 검증자 저장 (중간에 실패하면 다음 실행에서 다시 받음)
+            if validator_scope is not None:
+                commit_validators(current_url, validator_scope)
             
         except Exception as exc:
-            LOG.error(f"❌ {current_url} 처리 중 오류: {exc}")
+            trace.count("errors")
+            LOG.error("❌ %s 처리 중 오류: %r", current_url, exc)
             continue
 
     # 3. 결과 처리
     if total_scanned_count == 0:
+        run_log.emit(status="NO_NEW_POSTS")
         return {"status": "NO_NEW_POSTS", "data": [], "message": "새로운 공지가 없습니다."}
     if not aligned_total:
+        run_log.emit(status="NO_MATCHING_POSTS")
         return {"status": "NO_MATCHING_POSTS", "data": [], "message": "일치하는 항목이 없습니다."}
 
     # 4. 요약 생성 (중복 제거 및 정렬)
@@ -134,7 +187,6 @@ def run(event: dict[str, Any], context: Any | None = None) -> dict[str, Any]:
     
     final_data_list = []
     for post in aligned_total:
-        LOG.info(f"📝 요약 생성 중: {post['title']}")
         summary = summarize_content(user_profile, post["title"], post.get("full_content", ""))
 
         final_data_list.append({
@@ -148,11 +200,17 @@ def run(event: dict[str, Any], context: Any | None = None) -> dict[str, Any]:
             "timestamp": datetime.now(TIMEZONE).isoformat()
         })
 
+    run_log.emit(status="SUCCESS", summarized=len(final_data_list))
     return {
         "status": "SUCCESS",
         "count": len(final_data_list),
         "data": final_data_list
     }
+# AI 평가용 프로필 문자열 (전공 + 관심분야)
+def build_profile_text(user_profile: dict[str, Any]) -> str:
+    major = user_profile.get("major") or ""
+    interests = ", ".join(user_profile.get("interestFields") or [])
+    return f"전공: {major}, 관심분야: {interests}"
 def normalize_base(url: str | None) -> str: 
     if not url:
         return BASE_URL_DEFAULT
@@ -161,74 +219,53 @@ def normalize_base(url: str | None) -> str:
         trimmed = trimmed[: trimmed.rfind("/") + 1]
     return f"{trimmed.rstrip('/')}/"
 
+# 페이지 HTML을 가져옵니다. scope를 주면 ETag/Last-Modified 조건부 요청을 보내고, 변경이 없으면 NOT_MODIFIED를 반환합니다.
+def fetch_page(url: str, scope: str | None = None) -> Any:
+    if scope is not None:
+        return conditional_get(session, url, timeout=HTTP_TIMEOUT, scope=scope)
+    resp = session.get(url, timeout=HTTP_TIMEOUT)
+    resp.raise_for_status()
+    return resp.text
 # fetch_board(base_url, board): 특정 게시판 카테고리의 URL을 생성하고 해당 페이지의 HTML 소스를 가져옵니다.
-def fetch_board(base_url: str, board: dict[str, str]) -> tuple[str, str]:
+def fetch_board(base_url: str, board: dict[str, str], scope: str | None = None) -> tuple[str, Any]:
     page_url = f"{base_url}{board['category']}.do"
-    resp = session.get(page_url, timeout=HTTP_TIMEOUT)
-    resp.raise_for_status()
-    return page_url, resp.text
+    return page_url, fetch_page(page_url, scope)
 # HTML에서 공지사항 목록을 추출합니다. interval_days를 기준으로 이전 날짜의 글이 나오면 즉시 중단(break)하여 불필요한 탐색을 방지합니다. 
-def parse_posts(html: str, page_url: str, interval_days: int) -> list[dict[str, str]]:
-    soup = BeautifulSoup(html, "html.parser")
+# watermark가 주어지면(증분 모드) 이전 실행에서 이미 본 글과 워터마크보다 오래된 글은 제외합니다.
+# trace가 주어지면 행 수를 집계하고, 추적이 켜진 게시판만 행 단위 로그를 남깁니다.
+def parse_posts(html: str, page_url: str, interval_days: int, watermark: BoardWatermark | None = None, trace: BoardTrace | None = None) -> list[dict[str, str]]:
     today = datetime.now(TIMEZONE).date()
     cutoff = today - timedelta(days=interval_days - 1)
+    LOG.debug("📅 날짜 범위: %s ~ %s (interval: %d일)", cutoff, today, interval_days)
     
-    # ✅ [디버깅] 날짜 범위 로그
-    LOG.info(f"📅 날짜 범위: {cutoff} ~ {today} (interval: {interval_days}일)")
-    
+    # 목록 파싱은 파서 레지스트리와 같은 전용 파서 사용 (HTML_BACKEND: selectolax/lxml/bs4)
+    rows = parse_korea_univ(html, page_url)
     posts: list[dict[str, str]] = []
-    all_rows = soup.select("tr")
-    
-    # ✅ [디버깅] 전체 행 개수 로그
-    LOG.info(f"🔍 HTML에서 발견된 전체 <tr> 개수: {len(all_rows)}")
-    
-    row_count = 0
-    for row in all_rows:
-        cells = row.find_all("td")
-        if not cells:
-            continue
-        
-        row_count += 1
-        
-        # 날짜 파싱 (고려대 형식: YYYY.MM.DD)
-        date_text = cells[-1].get_text(strip=True)
-        
-        # ✅ [디버깅] 날짜 파싱 시도 로그
-        LOG.info(f"  [{row_count}] 날짜 텍스트: '{date_text}'")
-        
-        try:
-            row_date = datetime.strptime(date_text, "%Y.%m.%d").date()
-            LOG.info(f"  └ 파싱된 날짜: {row_date}")
-        except ValueError as e:
-            LOG.warning(f"  └ ❌ 날짜 파싱 실패: {e}")
-            continue
-            
+    for post in rows:
+        row_date = datetime.strptime(post["date"], "%Y-%m-%d").date()
         if row_date < cutoff:
-            LOG.info(f"  └ ⏭️ 범위 밖 날짜 (cutoff: {cutoff})")
-            continue
-            
-        link_tag = row.select_one("a.article-title")
-        if not link_tag:
-            LOG.warning(f"  └ ⚠️ 제목 링크를 찾을 수 없음")
-            continue
-            
-        href = (link_tag.get("href") or "").replace("amp;", "")
-        title = link_tag.get_text(strip=True)
-        
-        LOG.info(f"  └ ✅ 수집: {title}")
-        posts.append({"title": title, "link": urljoin(page_url, href)})
+            skipped = "tooOld"
+        elif watermark is not None and not watermark.is_new(post["link"], row_date):
+            skipped = "seen"
+        else:
+            skipped = None
+            posts.append(post)
+        if trace is not None:
+            trace.row("%s %s → %s", post["date"], post["title"], skipped or "kept")
     
-    LOG.info(f"📊 최종 수집된 게시물: {len(posts)}개")
+    if trace is not None:
+        trace.count("rows", len(rows))
+        trace.count("kept", len(posts))
     return posts
-# 수집된 목록을 순회하며 AI 점수를 매기고, 기준치(THRESHOLD) 이상인 게시물만 상세 내용을 추출합니다.
-def evaluate_posts(profile_text: str, board_name: str, posts: list[dict[str, str]]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
-    LOG.info(f"Evaluating posts for board: {board_name} with {len(posts)} posts")
+# 수집된 목록을 순회하며 AI 점수를 매기고, 기준치(RELEVANCE_THRESHOLD) 이상인 게시물만 상세 내용을 추출합니다.
+def evaluate_posts(profile_text: str, board_name: str, posts: list[dict[str, str]], ocr: OCRRun | None = None, trace: BoardTrace | None = None) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    ocr = ocr or OCRRun()
+    LOG.debug("Evaluating posts for board: %s with %d posts", board_name, len(posts))
     aligned: list[dict[str, Any]] = []
     evaluated: list[dict[str, Any]] = []
-    THRESHOLD = 0.6
-    for post in posts:
+    scores = score_posts(profile_text, posts)
+    for post, (score, rationale) in zip(posts, scores):
         post_copy = dict(post)
-        score, rationale = score_notice(profile_text, post_copy["title"], post_copy["link"])
         post_copy["reason"] = rationale
         post_copy["relevance_score"] = score # 실제 점수 저장
         
@@ -236,14 +273,12 @@ def evaluate_posts(profile_text: str, board_name: str, posts: list[dict[str, str
         post_copy["full_content"] = ""
         post_copy["images"] = []
 
-        if score >= THRESHOLD:
-            LOG.info(f"✅ 적합 판정({score}점): {post_copy['title']}")            
-            full_text, img_urls = fetch_post_content(post_copy["link"])
+        if score >= RELEVANCE_THRESHOLD:
+            full_text, img_urls = fetch_post_content(post_copy["link"], ocr)
             
             ocr_combined_text = ""
-            for idx, url in enumerate(img_urls):
-                # 이미지별로 순번과 링크를 로그에 남김
-                ocr_result = extract_text_from_image(url)
+            # fetch_post_content에서 이미 OCR 한 이미지라 결과만 가져옴 (순서 유지)
+            for idx, ocr_result in enumerate(ocr.texts(img_urls)):
                 if ocr_result:
                     ocr_combined_text += f"\n\n--- [이미지 #{idx+1} 텍스트 시작] ---\n{ocr_result}\n--- [이미지 #{idx+1} 텍스트 끝] ---\n"
             
@@ -251,15 +286,20 @@ def evaluate_posts(profile_text: str, board_name: str, posts: list[dict[str, str
             post_copy["full_content"] = (full_text + ocr_combined_text).strip()
             post_copy["images"] = img_urls
 
-            # 로그로 결합 결과 확인
-            LOG.info(f"📊 [결합 완료] {post_copy['title']}")
-            LOG.info(f"   └ 본문 텍스트 길이: {len(full_text)}")
-            LOG.info(f"   └ 이미지 OCR 텍스트 길이: {len(ocr_combined_text)}")
-            LOG.info(f"   └ 최종 full_content 길이: {len(post_copy['full_content'])}")
+            if trace is not None:
+                trace.count("images", len(img_urls))
+                trace.count("ocrChars", len(ocr_combined_text))
             aligned.append(post_copy)
             
         evaluated.append(post_copy)
-        print('eeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee', post_copy)
+        if trace is not None:
+            trace.row(
+                "%.2f점 %s (본문 %d자, 이미지 %d개)",
+                score, post_copy["title"], len(post_copy["full_content"]), len(post_copy["images"]),
+            )
+    if trace is not None:
+        trace.count("scored", len(evaluated))
+        trace.count("aligned", len(aligned))
     return aligned, evaluated
 # 유저의 전공(major)과 관심 분야(interestFields)를 반영한 프롬프트를 생성하여 AI에게 관련성 점수를 요청합니다.
 def score_notice(profile_text: str, title: str, link: str) -> tuple[float, str]:
@@ -286,6 +326,91 @@ def score_notice(profile_text: str, title: str, link: str) -> tuple[float, str]:
         return float(res_json.get("score", 0.0)), res_json.get("reason", "분석 완료")
     except:
         return 0.0, "AI 분석 실패"
+# 게시물 목록 전체를 채점합니다. SCORE_BATCH_SIZE > 1이면 배치 채점, 아니면 건별 채점.
+def score_posts(profile_text: str, posts: list[dict[str, Any]]) -> list[tuple[float, str]]:
+    if SCORE_BATCH_SIZE > 1 and len(posts) > 1:
+        return score_notices_batch(profile_text, posts)
+    return [score_notice(profile_text, post.get("title"), post.get("link")) for post in posts]
+# 여러 공지 제목을 한 번의 구조화 출력(JSON 스키마) 요청으로 채점합니다.
+# 응답에서 빠진 id는 한 번 더 배치로 재시도하고, 그래도 없으면 건별 score_notice로 대체합니다.
+def score_notices_batch(profile_text: str, posts: list[dict[str, Any]], batch_size: int | None = None) -> list[tuple[float, str]]:
+    if not profile_text:
+        return [(0.0, "no-profile")] * len(posts)
+    size = max(1, batch_size or SCORE_BATCH_SIZE)
+    results: dict[str, tuple[float, str]] = {}
+    items = [(str(idx), post) for idx, post in enumerate(posts)]
+
+    # 이미 채점한 (프로필, 제목) 조합은 LLM 캐시에서 바로 꺼냄
+    llm_cache = get_cache()
+    for pid, post in items:
+        cached = llm_cache.lookup(SCORE_MODEL, BATCH_SCORE_PROMPT_VERSION, _batch_cache_inputs(profile_text, post))
+        if cached is not None:
+            results[pid] = (float(cached[0]), cached[1])
+
+    for attempt in range(2):
+        pending = [(pid, post) for pid, post in items if pid not in results]
+        for start in range(0, len(pending), size):
+            chunk = pending[start:start + size]
+            scored = _ask_ai_batch(profile_text, chunk)
+            for pid, post in chunk:
+                if pid in scored:
+                    llm_cache.store(
+                        SCORE_MODEL, BATCH_SCORE_PROMPT_VERSION, _batch_cache_inputs(profile_text, post), list(scored[pid])
+                    )
+            results.update(scored)
+        if len(results) == len(items):
+            break
+        LOG.warning("배치 채점 누락 %s건 (시도 %s)", len(items) - len(results), attempt + 1)
+
+    for pid, post in items:
+        if pid not in results:
+            results[pid] = score_notice(profile_text, post.get("title"), post.get("link"))
+    return [results[pid] for pid, _ in items]
+def _batch_cache_inputs(profile_text: str, post: dict[str, Any]) -> dict[str, Any]:
+    return {"profile": profile_text, "title": post.get("title")}
+def _ask_ai_batch(profile_text: str, batch: list[tuple[str, dict[str, Any]]]) -> dict[str, tuple[float, str]]:
+    if not client or not batch:
+        return {}
+    notices = "\n".join(json.dumps({"id": pid, "title": post.get("title")}, ensure_ascii=False) for pid, post in batch)
+    prompt = f"""
+    Profile: {profile_text}
+    Notices (one JSON object per line):
+    {notices}
+    For EVERY notice, analyze how relevant it is to the profile.
+    Return a JSON array with one object per notice: {{"id": same id, "score": float between 0.0 and 1.0, "reason": "short explanation in Korean"}}
+    """
+    try:
+        response = provider("gemini").call(
+            client.models.generate_content,
+            model=SCORE_MODEL,
+            contents=prompt,
+            config={
+                "response_mime_type": "application/json",
+                "response_schema": BATCH_SCORE_SCHEMA,
+                "tools": [],
+                "automatic_function_calling": {"disable": True},
+            },
+        )
+        rows = json.loads(response.text or "[]")
+    except Exception as e:
+        # Gemini 장애(재시도 소진·서킷 열림)는 0점으로 덮지 않고 호출자에게 올림 (아래 ask_ai 참고)
+        if provider("gemini").unavailable(e):
+            raise
+        LOG.error("💥 배치 채점 실패 (%s건): %r", len(batch), e)
+        return {}
+
+    wanted = {pid for pid, _ in batch}
+    scored: dict[str, tuple[float, str]] = {}
+    for row in rows if isinstance(rows, list) else []:
+        pid = str(row.get("id")) if isinstance(row, dict) else None
+        if pid not in wanted:
+            continue
+        try:
+            score = min(1.0, max(0.0, float(row.get("score", 0.0))))
+        except (TypeError, ValueError):
+            continue
+        scored[pid] = (score, row.get("reason") or "분석 완료")
+    return scored
 def summarize_content(user_profile: dict, title: str, full_content: str) -> str:
     """
     [2차 분석] 수집된 본문 전체와 OCR 텍스트를 바탕으로 사용자 맞춤 요약을 생성합니다.
@@ -306,17 +431,27 @@ def summarize_content(user_profile: dict, title: str, full_content: str) -> str:
     """
     # ask_ai 함수를 호출하되, 요약문만 받도록 간단히 처리 (또는 전용 호출 로직 작성)
     # 여기서는 기존 ask_ai가 JSON을 기대하므로 요약용은 별도 response.text 추출이 필요할 수 있습니다.
-    response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=summary_prompt
-    )
-    return response.text.strip()
+    def call_model() -> str:
+        response = provider("gemini").call(
+            client.models.generate_content,
+            model="gemini-2.0-flash",
+            contents=summary_prompt
+        )
+        # 빈 요약은 None으로 돌려서 캐시에 남기지 않음
+        return (response.text or "").strip() or None
+
+    # 같은 공지를 같은 관심분야로 다시 요약하는 경우 LLM을 부르지 않음
+    return cached_llm_call(
+        "gemini-2.0-flash", SUMMARY_PROMPT_VERSION,
+        {"interests": interests, "title": title, "full_content": full_content},
+        call_model,
+    ) or ""
 
 
 # genai 클라이언트를 사용하여 Gemini API를 호출하고 결과를 JSON 형태로 파싱하여 반환합니다.
 def ask_ai(prompt: str) -> tuple[float, str]:
     try:
-        LOG.info("=== [AI CALL START] ===")
+        LOG.debug("=== [AI CALL START] ===")
         
         # 1. 프롬프트 유니코드 안전화 (UTF-8 강제)
         # 만약 prompt가 유니코드가 아니라면 강제로 utf-8로 변환합니다.
@@ -329,61 +464,67 @@ def ask_ai(prompt: str) -> tuple[float, str]:
             LOG.error("❌ 에러: Gemini Client가 설정되지 않았습니다.")
             return 0.0, "no-client"
 
-        # 2. Gemini 모델 호출 (168라인 부근)
-        LOG.info(f"🤖 Calling model: gemini-2.0-flash... (Prompt size: {len(safe_prompt)})")
-        # [핵심] 런타임에서 인코딩 에러를 방지하기 위해 
-        # 시스템 환경이d 깨져있어도 라이브러리가 UTF-8을 사용하도록 유도합니다.
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=safe_prompt, 
-            config={
-                'tools': [],
-                'automatic_function_calling': {'disable': True}
-            }
-        )
-        print(4)
-        # 3. 응답 처리 및 로그 출력 시 인코딩 방어
-        # response.text가 한글일 때 LOG.info에서 터지는 것을 repr()로 방어합니다.
-        raw_text = response.text if response.text else ""
-        LOG.info(f"📥 Raw Response Received: {repr(raw_text)}")
-
-        if not raw_text.strip():
-            LOG.warning("⚠️ AI 응답이 비어있습니다.")
+        # 2. 캐시 확인 후 Gemini 모델 호출 (같은 프롬프트는 LLM을 다시 부르지 않음)
+        result = cached_llm_call(SCORE_MODEL, ASK_AI_PROMPT_VERSION, {"prompt": safe_prompt}, lambda: _call_score_model(safe_prompt))
+        if result is None:
             return 0.0, "empty-response"
-
-        # 4. JSON 파싱
-        LOG.info("🧩 Parsing JSON from response...")
-        json_match = re.search(r"\{.*\}", raw_text, re.DOTALL)
-        
-        if json_match:
-            clean_json = json_match.group(0)
-            data = json.loads(clean_json)
-            score = float(data.get("score", 0.0))
-            reason = data.get("reason", "분석 완료")
-            
-            # 사유(reason) 출력 시에도 repr() 사용
-            LOG.info(f"🎯 Analysis Result - Score: {score}, Reason: {repr(reason)}")
-            LOG.info("=== [AI CALL SUCCESS] ===")
-            return score, reason
-        else:
-            LOG.error(f"❌ JSON 패턴을 찾을 수 없습니다. 원문: {repr(raw_text)}")
-            raise ValueError("JSON format not found in response")
+        score, reason = float(result[0]), result[1]
+        LOG.debug("=== [AI CALL SUCCESS] ===")
+        return score, reason
 
     except Exception as e:
+        # 429/5xx 재시도 소진·서킷 열림은 "관련 없음(0점)"이 아니므로 호출자에게 올림.
+        # 디스패치(orchestrator.run_dispatch_async)는 그 유저가 구독한 게시판의 워터마크를 유지해 다음 실행에 다시 채점하고,
+        # /crawl/request 작업은 FAILED로 남는다.
+        if provider("gemini").unavailable(e):
+            LOG.error("💥 Gemini 사용 불가: %r", e)
+            raise
         # 에러 메시지 자체(예: '본인의_키')를 출력하다 터지지 않게 repr(e) 처리
-        LOG.error(f"💥 Critical Error in ask_ai: {repr(e)}")
-        import traceback
-        LOG.error(traceback.format_exc())
+        LOG.exception("💥 Critical Error in ask_ai: %r", e)
         return 0.0, f"failure: {repr(str(e))}"
+# 실제 Gemini 호출. 성공 시 [score, reason], 빈 응답이면 None (None은 캐시에 저장되지 않음)
+def _call_score_model(safe_prompt: str) -> list[Any] | None:
+    LOG.debug("🤖 Calling model: %s... (Prompt size: %d)", SCORE_MODEL, len(safe_prompt))
+    # [핵심] 런타임에서 인코딩 에러를 방지하기 위해 
+    # 시스템 환경이 깨져있어도 라이브러리가 UTF-8을 사용하도록 유도합니다.
+    response = provider("gemini").call(
+        client.models.generate_content,
+        model=SCORE_MODEL,
+        contents=safe_prompt, 
+        config={
+            'tools': [],
+            'automatic_function_calling': {'disable': True}
+        }
+    )
+    # 3. 응답 처리 및 로그 출력 시 인코딩 방어
+    # response.text가 한글일 때 LOG.info에서 터지는 것을 repr()로 방어합니다.
+    raw_text = response.text if response.text else ""
+    LOG.debug("📥 Raw Response Received: %r", raw_text)
+
+    if not raw_text.strip():
+        LOG.warning("⚠️ AI 응답이 비어있습니다.")
+        return None
+
+    # 4. JSON 파싱
+    json_match = re.search(r"\{.*\}", raw_text, re.DOTALL)
+    if not json_match:
+        LOG.error("❌ JSON 패턴을 찾을 수 없습니다. 원문: %r", raw_text)
+        raise ValueError("JSON format not found in response")
+
+    data = json.loads(json_match.group(0))
+    score = float(data.get("score", 0.0))
+    reason = data.get("reason", "분석 완료")
+    # 사유(reason) 출력 시에도 repr() 사용
+    LOG.debug("🎯 Analysis Result - Score: %s, Reason: %r", score, reason)
+    return [score, reason]
 # 점수가 높은 게시물의 상세 페이지에 접속하여 본문 텍스트와 이미지 URL 목록을 추출합니다.
-def fetch_post_content(link: str) -> tuple[str, list[str]]:
+def fetch_post_content(link: str, ocr: OCRRun | None = None) -> tuple[str, list[str]]:
     """본문 텍스트와 이미지 OCR 텍스트를 합쳐서 반환"""
+    ocr = ocr or OCRRun()
     try:
-        # 1. 페이지 요청 (에러 나던 session.get을 requests.get으로 수정)
-        resp = session.get(link, timeout=15)
-        resp.encoding = 'utf-8'
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        # 1. 페이지 요청 (조건부 요청: 304면 저장해 둔 지난 본문을 재사용해 다운로드 생략)
+        html = conditional_get(session, link, timeout=15, scope="post", encoding='utf-8', keep_body=True)
+        soup = BeautifulSoup(html, "html.parser")
         
         # 2. 본문 영역 탐색
         content_area = soup.select_one(".view-con") or soup.select_one(".fr-view")
@@ -404,11 +545,11 @@ def fetch_post_content(link: str) -> tuple[str, list[str]]:
             if src and not any(x in src for x in ["/icon/", "emoji"]):
                 full_url = urljoin(link, src)
                 img_urls.append(full_url)
-                
-                # 이미지에서 글자 읽어오기 (OCR 실행)
-                ocr_result = extract_text_from_image(full_url)
-                if ocr_result:
-                    ocr_combined_text += f"\n[이미지 포함 내용]: {ocr_result}"
+
+        # 이미지에서 글자 읽어오기 (OCR 풀에 한꺼번에 넣고 원래 순서대로 결과 수집)
+        for ocr_result in ocr.texts(img_urls):
+            if ocr_result:
+                ocr_combined_text += f"\n[이미지 포함 내용]: {ocr_result}"
 
         # 5. 일반 텍스트 + OCR 텍스트 합체
         final_full_content = (basic_text + ocr_combined_text).strip()
@@ -416,28 +557,8 @@ def fetch_post_content(link: str) -> tuple[str, list[str]]:
         return final_full_content, img_urls
         
     except Exception as e:
-        LOG.error(f"❌ 2차 크롤링(OCR 포함) 에러: {e}")
+        LOG.error("❌ 2차 크롤링(OCR 포함) 에러: %r", e)
         return "콘텐츠 로드 실패", []    
-def extract_text_from_image(img_url: str) -> str:
-    """이미지 URL에서 텍스트를 추출하는 OCR 함수"""
-    try:
-        # session 대신 requests.get 사용 (에러 방지)
-        resp = session.get(img_url, timeout=15)
-        if "image" not in resp.headers.get("Content-Type", "").lower():
-            return ""
-
-        img = Image.open(BytesIO(resp.content))
-        # 과거 코드에 있던 OCR 처리 로직
-        text = pytesseract.image_to_string(img, lang="kor+eng", config="--oem 3 --psm 6")
-        return text.strip()
-    except Exception as e:
-        LOG.error(f"❌ OCR 실패: {e}")
-        return ""
-def preprocess_for_ocr(pil_img: Image.Image) -> Image.Image:
-    img = np.array(pil_img)
-    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    _, thresh = cv2.thresholdthreshold(gray, 180, 255, cv2.THRESH_BINARY)
-    return Image.fromarray(thresh)
 def send_kakao(contact: str, template_code: str, template_param: dict[str, str]) -> dict[str, Any]:
     payload = {
         "senderKey": SENDER_KEY,
@@ -449,10 +570,10 @@ def send_kakao(contact: str, template_code: str, template_param: dict[str, str])
     
     try:
         # [수정] POST 요청이 먼저 와야 합니다.
-        resp = session.post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+        resp = provider("alimtalk").request(session, "POST", url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
         # [수정] 그 후에 로그를 찍어야 NameError가 발생하지 않습니다.
-        LOG.info(f"Kakao API 응답 상태: {resp.status_code}")
-        LOG.info(f"Kakao API 응답 본문: {resp.text}")
+        LOG.info("Kakao API 응답 상태: %s", resp.status_code)
+        LOG.debug("Kakao API 응답 본문: %s", resp.text)
         if resp.status_code != 200:
             LOG.error("Kakao send failed (%s) %s", resp.status_code, resp.text)
             return {"error": "API_STATUS_ERROR", "status": resp.status_code}
@@ -505,9 +626,7 @@ def send_kakao(contact: str, template_code: str, template_param: dict[str, str])
         page_url, html = fetch_board(base_url, board)
         posts = parse_posts(html, page_url)
         aligned, evaluated = evaluate_posts(profile_text, board["name"], posts)
-
-        print(profile_text,"ddddddddddddddddddddddddddddddddd", board["name"], posts)
-        LOG.info(f"📝 {board['name']} 평가 완료: 총 {len(posts)}건 중 {len(aligned)}건 적합")
+        LOG.info("📝 %s 평가 완료: 총 %d건 중 %d건 적합", board["name"], len(posts), len(aligned))
     except Exception as exc:
         LOG.info("Board fetch error for %s: %s", board["name"], exc)
 
@@ -516,7 +635,7 @@ def send_kakao(contact: str, template_code: str, template_param: dict[str, str])
     # [설정] 카카오 전송을 잠시 막고 싶을 때 아래를 주석 처리합니다.
     # sent = notify(board, aligned, recipients) TODO 
     sent = [] 
-    LOG.info(f"📢 [전송 스킵] {board['name']} 적합 공지 {len(aligned)}건 수집 완료")
+    LOG.info("📢 [전송 스킵] %s 적합 공지 %d건 수집 완료", board["name"], len(aligned))
     
     return {"board": board["name"], "posts": aligned, "sent": sent, "evaluated": evaluated}
 
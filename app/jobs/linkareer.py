@@ -14,6 +14,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from app.engine.resilience import provider
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO))
 LOG = logging.getLogger("linkareer")
@@ -144,7 +145,9 @@ Posting link: {link}
 Does this posting strongly align with the candidate’s interests? Reply with exactly YES or NO.
 """
     try:
-        resp = session.post(
+        resp = provider("openai").request(
+            session,
+            "POST",
             OPENAI_API_URL,
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -162,12 +165,17 @@ Does this posting strongly align with the candidate’s interests? Reply with ex
         resp.raise_for_status()
         data = resp.json()
     except requests.HTTPError as exc:
+        # 429/5xx는 재시도를 다 쓴 경우라 NO로 덮지 않고 올림 (연결 실패·서킷 열림도 마찬가지)
+        if provider("openai").unavailable(exc):
+            raise
         response = getattr(exc, "response", None)
         body = response.text if response is not None else ""
         status = response.status_code if response is not None else "no-status"
         LOG.error("OpenAI scoring failed (%s): %s | %r", status, body[:300], exc)
         return False, "openai-error"
     except requests.RequestException as exc:
+        if provider("openai").unavailable(exc):
+            raise
         LOG.error("OpenAI scoring failed: %s", exc)
         return False, "openai-error"
     except ValueError:
@@ -212,7 +220,7 @@ def send_kakao(contact: str, template_code: str, params: dict[str, str]) -> dict
     }
     headers = {"X-Secret-Key": SECRET_KEY, "Content-Type": "application/json;charset=UTF-8"}
     url = f"https://api-alimtalk.cloud.toast.com/alimtalk/v2.2/appkeys/{APP_KEY}/messages"
-    resp = session.post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+    resp = provider("alimtalk").request(session, "POST", url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
     if resp.status_code != 200:
         LOG.error("Kakao send failed (%s) %s", resp.status_code, resp.text)
         resp.raise_for_status()
@@ -1,56 +1,228 @@
+import asyncio
 import logging
-from datetime import datetime
+import os
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
-from app.engine.dynamic_fetcher import fetch_dynamic
-from app.engine.static_fetcher import fetch_static
-from app.parser.ai_parser import parse_with_ai
-from app.database.supabase_client import save_notifications
+from app.engine.crawl_engine import CrawlEngine
+from app.engine.fetch_cache import normalize_url
+from app.database.crawl_state import is_incremental, load_watermark, save_watermark
+from app.jobs.korea_university import build_profile_text, score_posts
+from app.structured_log import RunSummary
 
 LOG = logging.getLogger(__name__)
 TIMEZONE = ZoneInfo("Asia/Seoul")
+# 디스패치 fan-out 시 동시에 점수를 매기는 유저 수
+SCORING_CONCURRENCY = int(os.getenv("SCORING_CONCURRENCY", "4"))
 
-def run(event):
+async def run_async(event, fetch_cache=None):
     LOG.info("🚀 지능형 하이브리드 크롤링 프로세스 시작")
-    
-    target_urls = event.get("targetUrls") or [event.get("targetUrl")]
+
+    target_urls = [url for url in (event.get("targetUrls") or [event.get("targetUrl")]) if url]
     user_profile = event.get("userProfile", {})
     user_id = event.get("userId")
-    
-    all_notices = []
 
-    for url in target_urls:
-        if not url: continue
-        
-        # 1. 동적 수집 시도 (Playwright)
-        content = fetch_dynamic(url)
-        
-        # 2. 실패 시 정적 수집 시도 (Requests)
-        if not content or len(content) < 100:
-            LOG.warning(f"⚠️ 동적 수집 실패, 정적으로 전환: {url}")
-            content = fetch_static(url)
-
-        if not content:
-            LOG.error(f"❌ 모든 수집 수단 실패: {url}")
-            continue
+    # 1~3. 모든 URL을 동시에 수집 + AI 파싱 (전역/호스트별 동시성 제한 적용)
+    # 전체 소요 시간은 URL 합계가 아니라 가장 느린 URL 수준이 됩니다.
+    # fetch_cache가 주어지면 (디스패치 단위) 같은 게시판은 유저가 여러 명이어도 한 번만 수집합니다.
+    # 증분 모드에서는 유저별로 조건부 요청 상태를 따로 추적 (다른 유저의 304에 영향받지 않도록)
+    validator_scope = f"user:{user_id}" if is_incremental(event) else None
+    # 게시판별 집계를 모아 끝에 요약 한 줄로 남김 (event.debug로 특정 게시판만 행 단위 추적)
+    run_log = RunSummary(LOG, "crawl_request", debug=event.get("debug"), userId=user_id, incremental=validator_scope is not None)
+    traces = {url: run_log.board(url) for url in dict.fromkeys(target_urls)}
+    engine = CrawlEngine(fetch_cache=fetch_cache, validator_scope=validator_scope)
+    notices_per_url = await engine.crawl(target_urls, user_profile)
+    notices, origins = [], []
+    for url, per_url in zip(target_urls, notices_per_url):
+        recent = recent_notices(user_profile, per_url)
+        traces[url].count("notices", len(per_url))
+        traces[url].count("recent", len(recent))
+        if url in engine.failed:
+            traces[url].count("errors")
+        notices.extend(recent)
+        origins.extend([traces[url]] * len(recent))
 
-        # 3. AI 범용 파싱 (Gemini 2.0)
-        # 학교 구분 없이 AI가 문맥으로 공지사항을 추출합니다.
-        notices = parse_with_ai(content, url, user_profile)
-        
-        for n in notices:
-            all_notices.append({
-                "user_id": user_id,
-                "title": n.get("title"),
-                "summary": n.get("summary"),
-                "original_url": n.get("link"),
-                "source_name": "지능형 크롤러",
-                "relevance_score": n.get("score", 0.0),
-                "timestamp": datetime.now(TIMEZONE).isoformat()
-            })
+    # 전용 파서로 뽑은 공지는 점수가 없으므로 유저 프로필로 채점 (AI 파서 결과는 이미 점수 포함)
+    unscored = [n for n in notices if "score" not in n]
+    if unscored:
+        scores = iter(await asyncio.to_thread(score_posts, build_profile_text(user_profile), unscored))
+        for trace, n in zip(origins, notices):
+            if "score" not in n:
+                trace.count("scored")
+        notices = [n if "score" in n else with_score(n, *next(scores)) for n in notices]
+    for trace, n in zip(origins, notices):
+        trace.row("%s %s → %s", n.get("date") or "-", n.get("title"), n.get("score", 0.0))
+    # 채점까지 끝났으니 이번에 받은 게시판의 검증자 저장 (중간에 실패하면 다음에 다시 받음)
+    await asyncio.to_thread(engine.commit_validators, target_urls)
+
+    all_notices = []
+    for n in notices:
+        all_notices.append({
+            "user_id": user_id,
+            "title": n.get("title"),
+            "summary": n.get("summary"),
+            "original_url": n.get("link"),
+            "source_name": "지능형 크롤러",
+            "relevance_score": n.get("score", 0.0),
+            "timestamp": datetime.now(TIMEZONE).isoformat()
+        })
 
+    run_log.emit(status="SUCCESS", count=len(all_notices))
     # 4. 결과 저장 (Optional: orchestrator에서 직접 저장하거나 main에 반환)
     return {
         "status": "SUCCESS",
         "count": len(all_notices),
         "data": all_notices
-    }
\ No newline at end of file
+    }
+
+def run(event):
+    """동기 진입점 (CLI/배치용). FastAPI 안에서는 run_async를 await 하세요."""
+    return asyncio.run(run_async(event))
+
+async def crawl_boards(urls, fetch_cache=None, validator_scope=None, engine=None):
+    """유저와 무관하게 게시판마다 한 번씩 수집 + 목록 파싱. {정규화 URL: 공지 목록}을 반환."""
+    boards = list(dict.fromkeys(normalize_url(url) for url in urls))
+    engine = engine or CrawlEngine(fetch_cache=fetch_cache, validator_scope=validator_scope)
+    notices_per_board = await engine.crawl(boards, {})
+    return dict(zip(boards, notices_per_board))
+
+def with_score(notice, score, reason):
+    # 전용 파서 결과에는 요약이 없으므로 채점 사유를 요약 대신 사용
+    return {**notice, "score": score, "summary": notice.get("summary") or reason}
+
+def notice_date(notice):
+    """전용 파서가 붙인 게시일(ISO). AI 파서 결과처럼 날짜가 없으면 None."""
+    try:
+        return date.fromisoformat(notice["date"]) if notice.get("date") else None
+    except ValueError:
+        return None
+
+def recent_notices(user_profile, notices):
+    """유저의 intervalDays 안에 올라온 공지만 남긴다 (게시일을 모르는 공지는 그대로 둠)."""
+    interval_days = user_profile.get("intervalDays")
+    if not interval_days:
+        return notices
+    cutoff = datetime.now(TIMEZONE).date() - timedelta(days=int(interval_days) - 1)
+    return [n for n in notices if (notice_date(n) or cutoff) >= cutoff]
+
+def score_for_user(user_profile, notices):
+    """게시판에서 뽑아둔 공지들을 한 유저의 프로필로 채점해 콜백 포맷으로 돌려준다."""
+    profile_text = build_profile_text(user_profile)
+    # 게시판은 유저와 무관하게 한 번만 파싱하므로 기간 필터는 여기서 유저별로 적용
+    notices = recent_notices(user_profile, notices)
+    if not notices:
+        return []
+    aligned = []
+    # 공지 여러 건을 한 번의 AI 호출로 채점 (SCORE_BATCH_SIZE 단위)
+    scores = score_posts(profile_text, notices)
+    for n, (score, reason) in zip(notices, scores):
+        aligned.append({
+            "category": "공지사항",
+            "title": n.get("title"),
+            "sourceName": "지능형 크롤러",
+            "summary": n.get("summary") or reason,
+            "originalUrl": n.get("link"),
+            "relevanceScore": score,
+            "timestamp": datetime.now(TIMEZONE).isoformat()
+        })
+    aligned.sort(key=lambda x: x["relevanceScore"], reverse=True)
+    return aligned
+
+async def run_dispatch_async(subscribers, fetch_cache=None, incremental=None, debug=None):
+    """게시판 중심(board-major) 디스패치.
+
+    subscribers: [{"userId", "userProfile", "targetUrls"}, ...]
+    수집/목록 파싱 횟수는 유저 수와 무관하게 '서로 다른 게시판 수'에 비례하고,
+    유저별로는 구독한 게시판의 공지에 대한 적합도 채점만 수행합니다.
+    증분 모드에서는 게시판별 워터마크 이후의 새 공지만 분배하고, 새 공지가 없는 게시판은
+    채점 단계까지 가지 않습니다.
+    debug: {"boards": [...], "sampleRate": 0.1} — 지정한 게시판만 공지 단위로 추적 (structured_log.RunSummary)
+    반환값: [(subscriber, {"status", "count", "data"}), ...]
+    """
+    incremental = is_incremental({"incremental": incremental})
+    all_urls = [url for sub in subscribers for url in sub["targetUrls"] if url]
+    # 증분 모드에서는 조건부 요청(304/본문 해시)으로 바뀌지 않은 게시판을 통째로 건너뜀
+    engine = CrawlEngine(fetch_cache=fetch_cache, validator_scope="dispatch" if incremental else None)
+    notices_by_board = await crawl_boards(all_urls, engine=engine)
+    LOG.info(f"📚 게시판 {len(notices_by_board)}개 수집 완료 → 유저 {len(subscribers)}명에게 분배")
+
+    # 게시판별 집계는 끝에 요약 한 줄로 (추적 대상은 구독 시 입력한 원래 URL로도 지정 가능: 정규화해서 비교)
+    run_log = RunSummary(LOG, "dispatch", debug=debug, subscribers=len(subscribers), incremental=incremental)
+    traces = {board: run_log.board(board) for board in notices_by_board}
+    for board, notices in notices_by_board.items():
+        traces[board].count("notices", len(notices))
+        if board in engine.failed:
+            traces[board].count("errors")
+
+    watermarks = {}
+    if incremental:
+        for board, notices in notices_by_board.items():
+            watermark = await asyncio.to_thread(load_watermark, board)
+            fresh = [n for n in notices if n.get("link") and watermark.is_new(n["link"], notice_date(n))]
+            if len(fresh) != len(notices):
+                LOG.info(f"⏭️ {board}: 새 공지 {len(fresh)}/{len(notices)}건")
+            notices_by_board[board] = fresh
+            watermarks[board] = (watermark, fresh)
+            traces[board].count("fresh", len(fresh))
+    # 공지 링크 → 게시판 (유저별 채점 결과를 게시판 단위로 다시 집계)
+    board_of = {}
+    for board, notices in notices_by_board.items():
+        for n in notices:
+            if n.get("link"):
+                board_of.setdefault(n["link"], board)
+                traces[board].row("%s %s", n.get("date") or "-", n.get("title"))
+
+    slots = asyncio.Semaphore(SCORING_CONCURRENCY)
+
+    async def fan_out(sub):
+        # 유저가 구독한 게시판들의 공지를 링크 기준으로 합침
+        notices = {}
+        for url in sub["targetUrls"]:
+            for n in notices_by_board.get(normalize_url(url), []) if url else []:
+                if n.get("link"):
+                    notices.setdefault(n["link"], n)
+        if not notices:
+            return {"status": "SUCCESS", "count": 0, "data": []}
+        async with slots:
+            data = await asyncio.to_thread(score_for_user, sub["userProfile"], list(notices.values()))
+        return {"status": "SUCCESS", "count": len(data), "data": data}
+
+    results = await asyncio.gather(*(fan_out(sub) for sub in subscribers), return_exceptions=True)
+
+    # 수집·파싱이 실패한 게시판(LLM 사용 불가 등)과, 채점에 실패한 유저가 구독한 게시판은
+    # 워터마크를 그대로 둬서 다음 실행에 다시 분배
+    failed_boards = set(engine.failed) | {
+        normalize_url(url)
+        for sub, result in zip(subscribers, results)
+        if isinstance(result, BaseException)
+        for url in sub["targetUrls"]
+        if url
+    }
+    # 구독자 전원이 채점을 마친 게시판만 워터마크 전진
+    for board, (watermark, fresh) in watermarks.items():
+        if board in failed_boards:
+            LOG.warning(f"⏸️ {board}: 수집 또는 구독자 채점이 실패해 워터마크 유지")
+            traces[board].count("watermarkHeld")
+            continue
+        if fresh:
+            watermark.advance([n["link"] for n in fresh], [d for d in map(notice_date, fresh) if d])
+            await asyncio.to_thread(save_watermark, board, watermark)
+    # 조건부 요청 검증자도 워터마크와 같은 기준으로 저장 (실패한 게시판은 다음에 304로 건너뛰지 않게)
+    await asyncio.to_thread(engine.commit_validators, [b for b in notices_by_board if b not in failed_boards])
+    paired = []
+    for sub, result in zip(subscribers, results):
+        boards = {normalize_url(url) for url in sub["targetUrls"] if url}
+        for board in boards & traces.keys():
+            traces[board].count("subscribers")
+        if isinstance(result, BaseException):
+            LOG.error(f"❌ {sub['userId']}번 유저 채점 실패: {result!r}")
+            for board in boards & traces.keys():
+                traces[board].count("errors")
+            result = {"status": "ERROR", "count": 0, "data": [], "message": str(result)}
+        for item in result["data"]:
+            board = board_of.get(item.get("originalUrl"))
+            if board is not None:
+                traces[board].count("delivered")
+                traces[board].row("→ %s번 유저 %s (%.2f)", sub["userId"], item.get("title"), item.get("relevanceScore", 0.0))
+        paired.append((sub, result))
+    run_log.emit(failedUsers=sum(isinstance(r, BaseException) for r in results))
+    return paired
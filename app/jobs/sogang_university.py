@@ -2,18 +2,21 @@ from __future__ import annotations
 
 import logging
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any
 
 import requests
 from zoneinfo import ZoneInfo
 
+from app.engine.resilience import provider
+from app.parser.custom.sogang_univ import SOGANG_API_URL, SOGANG_POST_URL, parse_sogang_list
+
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO))
 LOG = logging.getLogger("sogang_university")
 
-API_URL = "https://www.sogang.ac.kr/api/api/v1/mainKo/BbsData/boardList?pageNum=1&pageSize=200&bbsConfigFk=2"
-POST_URL = "https://www.sogang.ac.kr/ko/academic-support/notices"
+API_URL = SOGANG_API_URL
+POST_URL = SOGANG_POST_URL
 TIMEZONE = ZoneInfo("Asia/Seoul")
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
 LOOKBACK_DAYS = int(os.getenv("LOOKBACK_DAYS", "7"))
@@ -52,7 +55,9 @@ Notice link: {link}
 Does this notice strongly align with the candidate’s interests and background? Reply with exactly YES or NO.
 """
     try:
-        resp = session.post(
+        resp = provider("openai").request(
+            session,
+            "POST",
             OPENAI_API_URL,
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -70,11 +75,16 @@ Does this notice strongly align with the candidate’s interests and background?
         resp.raise_for_status()
         data = resp.json()
     except requests.HTTPError as exc:
+        # 429/5xx는 재시도를 다 쓴 경우라 NO로 덮지 않고 올림 (연결 실패·서킷 열림도 마찬가지)
+        if provider("openai").unavailable(exc):
+            raise
         body = exc.response.text if getattr(exc, "response", None) else ""
         code = exc.response.status_code if getattr(exc, "response", None) else "no-status"
         LOG.error("OpenAI scoring failed (%s): %s", code, body[:300])
         return False, "openai-error"
     except requests.RequestException as exc:
+        if provider("openai").unavailable(exc):
+            raise
         LOG.error("OpenAI scoring failed: %s", exc)
         return False, "openai-error"
     except ValueError:
@@ -105,7 +115,7 @@ def send_kakao(contact: str, template_code: str, params: dict[str, str]) -> dict
     }
     headers = {"X-Secret-Key": SECRET_KEY, "Content-Type": "application/json;charset=UTF-8"}
     url = f"https://api-alimtalk.cloud.toast.com/alimtalk/v2.2/appkeys/{APP_KEY}/messages"
-    resp = session.post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+    resp = provider("alimtalk").request(session, "POST", url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
     if resp.status_code != 200:
         LOG.error("Kakao send failed (%s) %s", resp.status_code, resp.text)
         resp.raise_for_status()
@@ -115,31 +125,14 @@ def send_kakao(contact: str, template_code: str, params: dict[str, str]) -> dict
 def fetch_posts() -> list[dict[str, str]]:
     resp = session.get(API_URL, timeout=HTTP_TIMEOUT)
     resp.raise_for_status()
-    data = resp.json()
-    entries: list[dict[str, Any]] = []
-    if isinstance(data, dict):
-        if isinstance(data.get("data"), dict):
-            entries = data["data"].get("list") or []
-        elif isinstance(data.get("list"), list):
-            entries = data["list"]
     today = datetime.now(TIMEZONE).date()
     cutoff = today - timedelta(days=LOOKBACK_DAYS - 1)
-    posts: list[dict[str, str]] = []
-    for row in entries:
-        date_raw = str(row.get("regDate") or "")
-        if not date_raw:
-            continue
-        try:
-            row_date = datetime.strptime(date_raw[:8], "%Y%m%d").date()
-        except ValueError:
-            continue
-        if row_date < cutoff:
-            continue
-        pk = row.get("pkId")
-        link = f"{POST_URL}/{pk}" if pk else POST_URL
-        title = row.get("title") or "제목 없음"
-        posts.append({"title": title, "link": link})
-    return posts
+    # 목록 파싱은 파서 레지스트리와 같은 전용 파서를 사용
+    return [
+        {"title": post["title"], "link": post["link"]}
+        for post in parse_sogang_list(resp.json(), API_URL)
+        if date.fromisoformat(post["date"]) >= cutoff
+    ]
 
 
 def evaluate_posts(profile_text: str, posts: list[dict[str, str]]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
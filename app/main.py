@@ -1,4 +1,5 @@
 import os
+import gzip
 #from fastapi import BackgroundTasks # 👈 상단에 추가
 import requests
 import uvicorn
@@ -8,17 +9,33 @@ import logging
 import traceback
 from datetime import datetime, timedelta
 from typing import Any # 상단에 추가되어 있는지 확인
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # 크롤링 로직 임포트
 from supabase import create_client, Client
 from app.jobs.korea_university import TIMEZONE
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from app.jobs.orchestrator import run  # 이렇게 경로만 바꿔줍니다.
-# 로깅 설정 (없다면 추가)
+from app.jobs.orchestrator import run_async, run_dispatch_async  # 이렇게 경로만 바꿔줍니다.
+from app.engine.alimtalk import Recipient, get_dispatcher
+from app.engine.browser_pool import start_pool, stop_pool, pool_stats
+from app.engine.fetch_cache import FetchCache
+from app.engine.fetch_router import get_router
+from app.engine.job_queue import get_queue
+from app.engine.offload import API_IO_WORKERS, offload_stats, run_blocking, shutdown_executor
+from app.engine.resilience import resilience_stats
+from app.middleware import GzipRequestMiddleware
+from app.database.llm_cache import get_cache as get_llm_cache
+from app.database.repository import Repository, get_repository, set_repository
+from app.parser.ocr import ocr_stats, shutdown_pool as shutdown_ocr_pool
+from app.structured_log import configure_logging, lazy_json
+# 로깅 설정 (LOG_FORMAT=json이면 Cloud Run 구조화 로그)
+configure_logging()
 LOG = logging.getLogger(__name__)
 # 세션 설정 (없다면 추가, 성능을 위해 세션을 재사용하는 게 좋아)
 session = requests.Session()
@@ -26,6 +43,31 @@ session = requests.Session()
 # 타임아웃 설정 (초 단위)
 HTTP_TIMEOUT = 10
 
+# 콜백 전송 설정: 대상이 이 서버(BASE_URL)의 /callback/save면 HTTP 없이 바로 저장하고,
+# 외부 서버면 커넥션 풀 + 재시도 + gzip 본문으로 한 번만 보냄
+BASE_URL = os.getenv("BASE_URL", "")
+CALLBACK_PATH = "/callback/save"
+CALLBACK_TIMEOUT = float(os.getenv("CALLBACK_TIMEOUT", "30"))
+CALLBACK_RETRIES = int(os.getenv("CALLBACK_RETRIES", "3"))
+CALLBACK_GZIP = os.getenv("CALLBACK_GZIP", "true").lower() in ("1", "true", "yes")
+callback_session = requests.Session()
+# 이 어댑터는 외부 수신 서버 전용이라 중복 처리 여부를 알 수 없음 → 요청이 처리되지 않은 게
+# 확실한 경우(연결 실패, 429/503)만 재시도. 읽기 타임아웃·5xx는 이미 저장됐을 수 있으므로 재시도하지 않음
+callback_session.mount("https://", HTTPAdapter(
+    pool_maxsize=API_IO_WORKERS,
+    max_retries=Retry(
+        total=CALLBACK_RETRIES,
+        read=0,
+        other=0,
+        backoff_factor=0.5,
+        status_forcelist=(429, 503),
+        allowed_methods=frozenset({"POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    ),
+))
+callback_session.mount("http://", callback_session.get_adapter("https://"))
+
 # [필수] Supabase 설정 (환경변수에서 읽기)
 SENDER_KEY = os.getenv("KAKAO_SENDER_KEY")
 SECRET_KEY = os.getenv("KAKAO_SECRET_KEY")
@@ -33,15 +75,59 @@ APP_KEY = os.getenv("KAKAO_APP_KEY")
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# 스케줄러/디스패처 조회는 같은 클라이언트로 집합 단위 쿼리 (app/database/repository.py)
+set_repository(Repository(supabase))
 
 # 라우터 임포트 (batch_manager.py에 router = APIRouter()가 있어야 함)
 #from app.batch_manager import router as batch_router
 
 app = FastAPI()
+# Content-Encoding: gzip 콜백 본문 해제
+app.add_middleware(GzipRequestMiddleware)
 
 #if batch_router:
 #    app.include_router(batch_router)
 
+# 브라우저 풀은 앱 수명과 함께 관리한다 (BROWSER_POOL_EAGER: true/auto면 시작 시 미리 띄움, 아니면 필요할 때)
+@app.on_event("startup")
+def start_browser_pool():
+    start_pool()
+
+# /crawl/request 작업 큐: 요청은 바로 202로 응답하고, 워커(JOB_WORKERS개)가 크롤링 + 콜백을 처리
+@app.on_event("startup")
+async def start_job_queue():
+    queue = get_queue()
+    queue.register("crawl", process_crawl_request)
+    await queue.start()
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await get_queue().stop()
+
+@app.on_event("shutdown")
+def stop_browser_pool():
+    stop_pool()
+    shutdown_ocr_pool()
+    shutdown_executor()
+
+# 이벤트 루프가 살아 있는지만 보는 가벼운 헬스 체크 (크롤링 중에도 바로 응답해야 함)
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "browserPool": pool_stats(),
+        "llmCache": get_llm_cache().stats(),
+        "ocr": ocr_stats(),
+        "fetchRoutes": get_router().stats(),
+        "offload": offload_stats(),
+        "jobs": get_queue().stats(),
+        "alimtalk": get_dispatcher().stats(),
+        "providers": resilience_stats(),
+    }
+
 # --- 모델 정의 (생략 없이 유지) ---
 class CallbackData(BaseModel):
     userId: Any
@@ -59,110 +145,120 @@ class BatchRequest(BaseModel):
     userProfile: UserProfile
     summary: str
     callback: CallbackConfig
+    # 특정 게시판만 공지 단위로 추적: {"boards": [...], "sampleRate": 0.1} (structured_log.RunSummary)
+    debug: Optional[dict[str, Any]] = None
 
 # --- 엔드포인트 1: 크롤링 요청 --- 지금은 안씀 그냥 남겨둚.
-@app.post("/crawl/request")
+# 크롤링 + LLM + 콜백은 몇 분씩 걸리므로 작업으로 넣고 바로 202 + jobId를 돌려줌 (진행 상황은 /jobs/{id})
+# ⚠️ 작업은 응답을 보낸 뒤에 돌기 때문에 Cloud Run은 CPU 상시 할당(--no-cpu-throttling)이어야 함 (README 참고)
+@app.post("/crawl/request", status_code=202)
 async def handle_crawl(request_data: BatchRequest):
-    try:
-        # Pydantic 모델을 딕셔너리로 변환
-        data_dict = request_data.model_dump()
-        
-        # 🔴 [주의] 여기서 data_dict["callback"]은 CallbackConfig의 내용을 담은 dict임
-        event = {
-            "userId": data_dict["userId"],
-            "targetUrls": data_dict["targetUrls"],
-            "userProfile": data_dict["userProfile"],
-            "callbackUrl": data_dict["callback"]["callbackUrl"] 
-        }
-
-        # [수정 2] 로그 찍을 때도 리스트 전체를 보여주거나 첫 번째 걸 찍어야 함
-        print(f"DEBUG: 크롤링 시작 (URLs: {data_dict['targetUrls']})")
-        print(f"📡 DEBUG: 크롤링 프로세스 시작 (UserId: {event['userId']})")
-
-        # 이제 run(event) 내부에서 targetUrls 리스트를 돌며 크롤링함
-        # ⚠️ 중요: run 함수가 동기 함수라면 스레드 풀에서 실행하는게 좋지만 우선 유지
-        result = run(event)
-
-        if not result or result.get("status") != "SUCCESS":
-            msg = result.get("message") if result else "결과 없음"
-            print(f"⚠️ 건너뜀: {msg}")
-            return {"status": "SKIPPED", "message": msg}
-
-        # [데이터 전송] 
-        if data_dict["callback"].get("enabled"): 
-            actual_notices = result.get("data", [])            
-            if actual_notices:
-                # 여기서 은서님 서버로 데이터 쏨
-                send_to_callback_list(
-                    data_dict["callback"]["callbackUrl"],
-                    actual_notices,
-                    data_dict["callback"]["authToken"],
-                    data_dict["userId"] # userId 추가 전달
-                )
-            else:
-                print("⚠️ 적합한 공지가 없어 콜백을 생략합니다.")
-            
-        
-        return {"status": "SUCCESS", "count": len(result.get("data", []))}
+    # Pydantic 모델을 딕셔너리로 변환
+    job = await get_queue().submit("crawl", request_data.model_dump())
+    LOG.info("📋 크롤링 작업 접수: %s (UserId: %s)", job.id, request_data.userId)
+    return {"status": "ACCEPTED", "jobId": job.id, "statusUrl": f"/jobs/{job.id}"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = get_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job.to_dict()
+
+# 작업 큐 워커가 실행하는 /crawl/request 본체. 반환값은 작업 결과(result)로 남고, 예외는 작업 실패로 기록됨
+async def process_crawl_request(data_dict: dict[str, Any]) -> dict[str, Any]:
+    # 🔴 [주의] 여기서 data_dict["callback"]은 CallbackConfig의 내용을 담은 dict임
+    event = {
+        "userId": data_dict["userId"],
+        "targetUrls": data_dict["targetUrls"],
+        "userProfile": data_dict["userProfile"],
+        "callbackUrl": data_dict["callback"]["callbackUrl"],
+        "debug": data_dict.get("debug"),
+    }
 
-    except Exception as e:
-        print(f"💥 서버 에러: {str(e)}")
-        import traceback
-        print(traceback.format_exc()) # 에러 위치 정확히 보려고 추가
-        print(f"💥 크롤링 요청 처리 중 에러: {traceback.format_exc()}")
-        return {"status": "ERROR", "message": str(e)}
+    # 재시작 후 복구한 작업은 authToken이 저장되지 않아 None (SQLiteJobStore) → 크롤링 전에 실패 처리
+    if data_dict["callback"].get("enabled") and not data_dict["callback"].get("authToken"):
+        raise RuntimeError("콜백 인증 토큰이 없습니다 (재시작 전에 접수된 작업이면 다시 요청해 주세요)")
+
+    LOG.info("📡 크롤링 프로세스 시작 (UserId: %s, URL %d개)", event["userId"], len(event["targetUrls"]))
+
+    # run_async 내부에서 targetUrls를 동시에 크롤링함 (이벤트 루프를 막지 않음)
+    result = await run_async(event)
+
+    if not result or result.get("status") != "SUCCESS":
+        msg = result.get("message") if result else "결과 없음"
+        LOG.info("⚠️ 건너뜀: %s", msg)
+        return {"status": "SKIPPED", "message": msg}
+
+    # [데이터 전송] 
+    if data_dict["callback"].get("enabled"): 
+        actual_notices = result.get("data", [])            
+        if actual_notices:
+            # 여기서 은서님 서버로 데이터 쏨 (동기 POST는 전용 스레드에서)
+            await run_blocking(
+                send_to_callback_list,
+                data_dict["callback"]["callbackUrl"],
+                actual_notices,
+                data_dict["callback"]["authToken"],
+                data_dict["userId"] # userId 추가 전달
+            )
+        else:
+            LOG.info("⚠️ 적합한 공지가 없어 콜백을 생략합니다.")
+        
+    
+    return {"status": "SUCCESS", "count": len(result.get("data", []))}
 
 # --- 엔드포인트 2: 콜백 데이터 저장 ---
 @app.post("/callback/save")
 async def handle_crawler_result(payload: CallbackData):
-    print(f"📥 [SAVE] 콜백 수신 성공! 데이터 개수: {len(payload.data)}")
+    LOG.info("📥 [SAVE] 콜백 수신 성공! 데이터 개수: %d", len(payload.data))
     try:
-        user_id = payload.userId
-        data_list = payload.data
-
-        # 1. 현재 이 유저의 기존 공지 URL들을 가져옴 (중복 체크용)
-        existing_res = supabase.table("notifications") \
-            .select("original_url") \
-            .eq("user_id", int(user_id)) \
-            .execute()
-        
-        # 이미 DB에 있는 URL들을 set으로 만듦 (검색 속도 향상)
-        existing_urls = {item['original_url'] for item in existing_res.data}
-
-        insert_data = []
-        for item in data_list:
-            target_url = item.get("originalUrl")
-            
-            # 🔥 [핵심] 이미 DB에 있는 URL이라면 스킵!
-            if target_url in existing_urls:
-                continue
-
-            insert_data.append({
-                "user_id": int(user_id),
-                "title": item.get("title"),
-                "summary": item.get("summary"),
-                "source_name": item.get("sourceName"),
-                "original_url": target_url,
-                "category": item.get("category"),
-                "is_liked": True,
-                "created_at": item.get("timestamp") ,
-                "notice_date": datetime.now(TIMEZONE).isoformat(), # 전송/수집일 (오늘)
-                "is_sent": False,
-            })
-
-        if insert_data:
-            supabase.table("notifications").insert(insert_data).execute()
-            print(f"✅ {user_id}번 유저 신규 데이터 {len(insert_data)}건 저장 완료")
-        else:
-            print(f"ℹ️ {user_id}번 유저: 새로 추가할 신규 공지가 없습니다.")
-
+        # Supabase 클라이언트는 동기라서 이벤트 루프 밖에서 실행
+        await run_blocking(save_notifications, payload.userId, payload.data)
         return {"status": "SUCCESS"}
-        
     except Exception as e:
-        print(f"💥 저장 실패: {str(e)}")
+        LOG.error("💥 저장 실패: %r", e)
         return {"status": "ERROR", "message": str(e)}
-        
-def send_to_callback_list(callback_url: str, notices: List[dict], auth_token: str, user_id: int):
+
+# 콜백으로 받은 공지 중 이 유저에게 아직 없는 것만 notifications에 저장하고, 저장한 건수를 반환합니다.
+# 중복 체크는 DB의 (user_id, original_url) 유니크 제약으로 처리하므로 유저의 기존 공지를 읽어오지 않습니다.
+def save_notifications(user_id: Any, data_list: List[dict]) -> int:
+    insert_data = []
+    for item in data_list:
+        insert_data.append({
+            "user_id": int(user_id),
+            "title": item.get("title"),
+            "summary": item.get("summary"),
+            "source_name": item.get("sourceName"),
+            "original_url": item.get("originalUrl"),
+            "category": item.get("category"),
+            "is_liked": True,
+            "created_at": item.get("timestamp") ,
+            "notice_date": datetime.now(TIMEZONE).isoformat(), # 전송/수집일 (오늘)
+            "is_sent": False,
+        })
+
+    saved = get_repository().insert_notifications(insert_data)
+    if saved:
+        LOG.info("✅ %s번 유저 신규 데이터 %d건 저장 완료", user_id, saved)
+    else:
+        LOG.info("ℹ️ %s번 유저: 새로 추가할 신규 공지가 없습니다.", user_id)
+    return saved
+
+# 콜백 대상이 이 서버 자신(BASE_URL + /callback/save 또는 None)인지
+def is_local_callback(callback_url: str | None) -> bool:
+    if not callback_url:
+        return True
+    target, base = urlsplit(callback_url), urlsplit(BASE_URL)
+    return bool(base.netloc) and target.netloc == base.netloc and target.path.rstrip("/") == CALLBACK_PATH
+
+def send_to_callback_list(callback_url: str | None, notices: List[dict], auth_token: str, user_id: int):
+    # 이 서버의 /callback/save로 가는 콜백은 직렬화·네트워크 왕복 없이 같은 저장 로직을 바로 호출
+    if is_local_callback(callback_url):
+        saved = save_notifications(user_id, notices)
+        LOG.info("📥 콜백 직접 저장: user=%s, 공지 %d건 중 신규 %d건", user_id, len(notices), saved)
+        return
+
     scores = [float(item.get("relevanceScore", 0.0)) for item in notices]
     top_score = round(max(scores), 2) if scores else 0.0
 
@@ -174,24 +270,25 @@ def send_to_callback_list(callback_url: str, notices: List[dict], auth_token: st
         "data": notices
     }
 
-    # (선택) 디버그 출력
-    print(json.dumps(payload, ensure_ascii=False, indent=2))
-    headers = {"Content-Type": "application/json", "X-AI-CALLBACK-TOKEN": auth_token}
-
+    # 페이로드 전체는 DEBUG 레벨일 때만 직렬화
+    LOG.info("📤 콜백 전송: user=%s, 공지 %d건", user_id, len(notices))
+    LOG.debug("콜백 페이로드: %s", lazy_json(payload))
     headers = {
         "Content-Type": "application/json",
         "X-AI-CALLBACK-TOKEN": auth_token
     }
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    if CALLBACK_GZIP:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
 
-    # 실제 콜백 전송
+    # 실제 콜백 전송 (5xx/429는 세션 어댑터가 백오프하며 재시도)
     try:
-        response = requests.post(callback_url, json=payload, headers=headers, timeout=60)
-        print(f"📡 콜백0 응답 코드: {response.status_code}")
-        # 타임아웃 넉넉히 설정
-        response = requests.post(callback_url, json=payload, headers=headers, timeout=30)
-        print(f"📡 콜백 전송 완료 (상태코드: {response.status_code})")
+        response = callback_session.post(callback_url, data=body, headers=headers, timeout=CALLBACK_TIMEOUT)
+        LOG.info("📡 콜백 전송 완료 (상태코드: %s, %d bytes)", response.status_code, len(body))
     except Exception as e:
-        print(f"❌ 콜백 전송 실패: {e}")
+        LOG.error("❌ 콜백 전송 실패: %r", e)
+
 @app.post("/scheduler/send-notifications")
 async def handle_notification_scheduler():
     now = datetime.now(TIMEZONE)
@@ -200,151 +297,124 @@ async def handle_notification_scheduler():
     LOG.info(f"⏰ 알림 발송 스케줄러 가동 중... (대상 시간대: {current_hour_start})")
     
     try:
-        user_res = supabase.table("users") \
-            .select("*") \
-            .eq("alarm_time", current_hour_start) \
-            .execute()
-        
-        target_users = user_res.data
+        # 1. 대상 유저와 미발송 공지 조회 (Supabase는 동기라 전용 스레드에서)
+        target_users, pending = await run_blocking(load_pending_notifications, current_hour_start)
         if not target_users:
             LOG.info(f"ℹ️ {current_hour_start} 시간대에 설정된 알람이 없습니다.")
             return {"status": "SUCCESS", "message": "No target users for this hour."}
 
-        total_sent_all_users = 0
-
-        for user in target_users:
-            # 1. 해당 유저의 미발송 공지 조회
-            noti_res = supabase.table("notifications") \
-                .select("*") \
-                .eq("user_id", user["user_id"]) \
-                .eq("is_sent", False).execute()
-            
-            notis = noti_res.data
-            if not notis: 
-                LOG.info(f"ℹ️ {user['username']}님: 보낼 새 공지가 없습니다.")
-                continue
-
-            # 2. 제목 묶기 (최대 5개)
-            titles = [f"• {n['title']}" for n in notis[:5]]
-            combined_titles = "\n".join(titles)
-            if len(notis) > 5:
-                combined_titles += f"\n외 {len(notis) - 5}건이 더 있습니다."
-
-            # 3. 알림톡 파라미터 구성
-            params = {
-                "korean-title": combined_titles,
-                "customer-name": user['username'],
-                "article-link": notis[0]['original_url'] # 가장 최근 공지 링크
-            }
-
-            # 4. 실제 카카오톡 발송
-            clean_phone = user['phone_number'].replace("-", "")
-            api_resp = send_kakao(clean_phone, "send-article", params)
-
-            # 5. 발송 성공 시 DB 업데이트
-            # API 응답에 에러가 없고, 응답 코드가 성공(일반적으로 "S" 또는 resultCode 0)인지 확인
-            if "error" not in api_resp:
-                noti_ids = [n["user_id"] for n in notis]
-                # Supabase 업데이트 실행
-                update_res = supabase.table("notifications") \
-                    .update({"is_sent": True}) \
-                    .in_("user_id", noti_ids).execute()
-                
-                total_sent_all_users += 1 
-                LOG.info(f"✅ {user['username']}님께 공지 {len(notis)}건 묶음 발송 완료")
-            else:
-                LOG.error(f"❌ {user['username']}님 발송 실패: {api_resp}")
+        # 2. 유저 한 명당 수신자 하나: 알림톡 요청 하나에 최대 1000명씩 묶어 병렬 발송
+        recipients = [
+            Recipient(str(user["user_id"]), user["phone_number"], notification_params(user, pending[user["user_id"]]))
+            for user in target_users
+            if pending.get(user["user_id"])
+        ]
+        results = await get_dispatcher().send("send-article", recipients)
+
+        # 3. 발송 성공한 유저에게 실제로 보낸 공지만 id로 골라 발송 완료 표시 (한 번의 벌크 업데이트)
+        sent_user_ids = [uid for uid in pending if str(uid) in results and results[str(uid)].ok]
+        sent_noti_ids = [n["id"] for uid in sent_user_ids for n in pending[uid]]
+        if sent_noti_ids:
+            await run_blocking(get_repository().mark_sent, sent_noti_ids)
+            LOG.info("✅ 유저 %d명에게 공지 %d건 묶음 발송 완료", len(sent_user_ids), len(sent_noti_ids))
+        for key, result in results.items():
+            if not result.ok:
+                LOG.error("❌ %s번 유저 발송 실패: %s %s", key, result.code, result.message)
 
         # 모든 유저 처리가 끝난 후 최종 결과 반환
-        return {"status": "SUCCESS", "total_sent_user_count": total_sent_all_users}
+        return {"status": "SUCCESS", "total_sent_user_count": len(sent_user_ids)}
 
     except Exception as e:
         # traceback을 통해 정확한 에러 위치 파악
         error_msg = traceback.format_exc()
         LOG.error(f"💥 스케줄러 실행 에러: {error_msg}")
         return {"status": "ERROR", "message": str(e)}
-def send_kakao(contact: str, template_code: str, template_param: dict[str, str]) -> dict[str, Any]:
-    # 🔴 주의: SENDER_KEY, SECRET_KEY, APP_KEY는 os.getenv 등으로 가져온 상태여야 함!
-    payload = {
-        "senderKey": SENDER_KEY,
-        "templateCode": template_code,
-        "recipientList": [{"recipientNo": contact, "templateParameter": template_param}],
-    }
-    
-    headers = {
-        "X-Secret-Key": SECRET_KEY, 
-        "Content-Type": "application/json;charset=UTF-8"
+
+# 이 시간대 알람 유저들과, 유저별 미발송 공지 목록 {user_id: [notification, ...]}
+# 유저별로 나눠 묻지 않고 유저 조회 1번 + 미발송 공지 조회 1번(유저 id 묶음)으로 가져와 메모리에서 묶음
+def load_pending_notifications(alarm_time: str) -> tuple[list[dict[str, Any]], dict[Any, list[dict[str, Any]]]]:
+    repo = get_repository()
+    target_users = repo.due_users(alarm_time)
+    pending = repo.unsent_notifications([user["user_id"] for user in target_users]) if target_users else {}
+    LOG.info("ℹ️ 알람 유저 %d명 중 %d명에게 보낼 새 공지가 있습니다.", len(target_users), len(pending))
+    return target_users, pending
+
+# 알림톡 템플릿 파라미터: 공지 제목 최대 5개 + 가장 최근 공지 링크
+def notification_params(user: dict[str, Any], notis: list[dict[str, Any]]) -> dict[str, str]:
+    titles = [f"• {n['title']}" for n in notis[:5]]
+    combined_titles = "\n".join(titles)
+    if len(notis) > 5:
+        combined_titles += f"\n외 {len(notis) - 5}건이 더 있습니다."
+    return {
+        "korean-title": combined_titles,
+        "customer-name": user['username'],
+        "article-link": notis[0]['original_url'] # 가장 최근 공지 링크
     }
-    
-    url = f"https://api-alimtalk.cloud.toast.com/alimtalk/v2.2/appkeys/{APP_KEY}/messages"
-    
-    try:
-        # POST 요청 전송
-        resp = session.post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
-        
-        # 로그 기록
-        result_json = resp.json()
-        LOG.info(f"📡 Kakao API Response Detail: {json.dumps(result_json, ensure_ascii=False)}")        
-        if resp.status_code != 200:
-            LOG.error(f"Kakao send failed ({resp.status_code}) {resp.text}")
-            return {"error": "API_STATUS_ERROR", "status": resp.status_code, "detail": resp.text}
-            
-        # 정상 응답 반환
-        return resp.json()
-        
-    except Exception as e:
-        LOG.error(f"Kakao connection error: {e}")
-        return {"error": "CONNECTION_ERROR", "message": str(e)}
-    pass
-    
+
+
 @app.post("/scheduler/dispatch-crawl")
-async def handle_crawl_dispatch(): # BackgroundTasks 제거
+async def handle_crawl_dispatch(debugBoards: Optional[str] = None, debugSampleRate: Optional[float] = None): # BackgroundTasks 제거
+    # ?debugBoards=URL1,URL2 (또는 *)로 재배포 없이 특정 게시판만 공지 단위로 추적
+    debug = {"boards": debugBoards} if debugBoards else {}
+    if debugSampleRate is not None:
+        debug["sampleRate"] = debugSampleRate
     try:
-        user_res = supabase.table("users").select("*").execute() 
-        target_users = user_res.data
-        LOG.info(f"🚀 디스패처 시작 - 대상 유저: {len(target_users)}명")
+        subscribers = await run_blocking(load_subscribers)
+        # 디스패치 결과는 이 서버의 /callback/save 대상이라 send_to_callback_list가 바로 저장함
+        callback_url = f"{BASE_URL.rstrip('/')}{CALLBACK_PATH}" if BASE_URL else None
+        LOG.info(f"🔗 [DISPATCH] Callback URL 확인: {callback_url or '(로컬 저장)'}")
+
+        # 이번 디스패치 동안 공유하는 URL 캐시
+        fetch_cache = FetchCache()
+
+        # 게시판 중심 파이프라인: 서로 다른 게시판을 한 번씩만 수집·파싱한 뒤 유저별로 채점
+        results = await run_dispatch_async(subscribers, fetch_cache=fetch_cache, debug=debug)
 
         processed_count = 0
-        for user in target_users:
-            url_res = supabase.table("target_urls").select("target_url").eq("user_id", user["user_id"]).execute()
-            urls = [item["target_url"] for item in url_res.data]
-            
-            if urls:
-                # handle_crawl_dispatch 함수 내부 루프 안쪽
-                crawl_event = {
-                    "userId": user["user_id"],
-                    "targetUrls": urls,
-                    "userProfile": {
-                        "username": user.get("username"),
-                        "major": user.get("major"),
-                        "school": user.get("school"),
-                        "intervalDays": user.get("interval_days", 7)
-                    },
-                    "callbackUrl": f"{os.getenv('BASE_URL').rstrip('/')}/callback/save"
-                }
-
-                # 보낼 주소 로그를 명확히 찍어
-                LOG.info(f"📡 [DISPATCH] {user.get('username')}님 크롤링 시작 요청")
-                LOG.info(f"🔗 [DISPATCH] Callback URL 확인: {crawl_event['callbackUrl']}")
-
-                result = run(crawl_event)
-                processed_count += 1
-                if result.get("status") == "SUCCESS" and result.get("data"):
-        # 아까 정의해둔 콜백 전송 함수를 여기서 써야 해!
-                    send_to_callback_list(
-                        callback_url=crawl_event["callbackUrl"],
-                        notices=result["data"],
-                        auth_token="X-AI-CALLBACK-TOKEN", # 필요한 경우
-                        user_id=user["user_id"]
-                    )
-                    LOG.info(f"✅ {user.get('username')}님 데이터를 저장소로 전송했습니다.")
-                LOG.info(f"✅ {user.get('username')}님 크롤링 및 저장 프로세스 완료")
+        for sub, result in results:
+            processed_count += 1
+            if result.get("status") == "SUCCESS" and result.get("data"):
+                # 저장(또는 외부 콜백 전송)은 동기라 루프를 막지 않도록 스레드에서
+                await run_blocking(
+                    send_to_callback_list,
+                    callback_url=callback_url,
+                    notices=result["data"],
+                    auth_token="X-AI-CALLBACK-TOKEN", # 필요한 경우
+                    user_id=sub["userId"]
+                )
+                LOG.info(f"✅ {sub['username']}님 데이터를 저장소로 전송했습니다.")
+            LOG.info(f"✅ {sub['username']}님 크롤링 및 저장 프로세스 완료")
 
+        LOG.info(f"📦 [DISPATCH] URL 캐시 통계: {fetch_cache.stats()}")
         return {"status": "SUCCESS", "message": f"{processed_count}명의 처리를 완료했습니다."}
 
     except Exception as e:
         LOG.error(f"💥 디스패처 에러: {traceback.format_exc()}")
         return {"status": "ERROR", "message": str(e)}
+
+# 디스패치 대상: 구독 URL이 하나 이상 있는 유저들 (users + target_urls)
+def load_subscribers() -> list[dict[str, Any]]:
+    # users와 target_urls(*)를 한 번의 쿼리로 조인 (batch_manager.run_batch와 같은 방식)
+    target_users = get_repository().subscribers()
+    LOG.info(f"🚀 디스패처 시작 - 대상 유저: {len(target_users)}명")
+
+    subscribers = []
+    for user in target_users:
+        urls = [t["target_url"] for t in user["target_urls"] if t.get("target_url")]
+        if not urls:
+            continue
+        subscribers.append({
+            "userId": user["user_id"],
+            "username": user.get("username"),
+            "targetUrls": urls,
+            "userProfile": {
+                "username": user.get("username"),
+                "major": user.get("major"),
+                "school": user.get("school"),
+                "intervalDays": user.get("interval_days", 7)
+            },
+        })
+    return subscribers
     
 
 @app.exception_handler(RequestValidationError)
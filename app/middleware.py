@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import logging
+import os
+import zlib
+from typing import Any
+
+from starlette.responses import PlainTextResponse
+
+LOG = logging.getLogger(__name__)
+
+# 압축을 푼 요청 본문의 최대 크기 (압축 폭탄 방지)
+MAX_DECODED_BODY = int(os.getenv("MAX_DECODED_BODY", str(20 * 1024 * 1024)))
+
+
+class GzipRequestMiddleware:
+    """Content-Encoding: gzip 요청 본문을 풀어서 엔드포인트에는 평범한 JSON 본문으로 넘긴다."""
+
+    def __init__(self, app: Any, max_size: int = MAX_DECODED_BODY) -> None:
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._is_gzip(scope):
+            await self.app(scope, receive, send)
+            return
+        try:
+            body = await self._read_decoded(receive)
+        except (zlib.error, ValueError) as exc:
+            LOG.warning("gzip 요청 본문 해제 실패 (%s): %r", scope.get("path"), exc)
+            status = 413 if isinstance(exc, ValueError) else 400
+            await PlainTextResponse("invalid gzip body", status_code=status)(scope, receive, send)
+            return
+
+        headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+        headers.append((b"content-length", str(len(body)).encode()))
+        sent = False
+
+        async def decoded_receive() -> dict[str, Any]:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app({**scope, "headers": headers}, decoded_receive, send)
+
+    @staticmethod
+    def _is_gzip(scope: dict[str, Any]) -> bool:
+        for key, value in scope["headers"]:
+            if key == b"content-encoding":
+                return value.strip().lower() == b"gzip"
+        return False
+
+    async def _read_decoded(self, receive: Any) -> bytes:
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        parts: list[bytes] = []
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            more = message.get("more_body", False)
+            chunk = decoder.decompress(message.get("body", b""), self.max_size - size + 1)
+            size += len(chunk)
+            if size > self.max_size or decoder.unconsumed_tail:
+                raise ValueError(f"decoded body exceeds {self.max_size} bytes")
+            parts.append(chunk)
+        parts.append(decoder.flush())
+        if not decoder.eof:
+            raise zlib.error("truncated gzip body")
+        return b"".join(parts)
@@ -2,33 +2,53 @@ import os
 import json
 import re
 from google import genai
+from app.database.llm_cache import cached_llm_call
+from app.engine.content_extractor import CONTENT_MAX_CHARS
+from app.engine.resilience import provider
 
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
+PARSE_MODEL = "gemini-2.0-flash"
+# 프롬프트를 고치면 버전을 올려서 이전 캐시를 무효화
+PARSE_PROMPT_VERSION = "parse-v1"
+# 수집 단계(content_extractor)에서 이미 이 예산 안으로 잘라서 넘어옴
+CONTENT_LIMIT = CONTENT_MAX_CHARS
+
 def parse_with_ai(content, base_url, user_profile):
     interests = ", ".join(user_profile.get("interestFields", []))
-    
+    body = content[:CONTENT_LIMIT]
+
     prompt = f"""
     당신은 웹페이지 분석 전문가입니다. 제공된 텍스트에서 공지사항 목록을 찾아 JSON 배열로 반환하세요.
     사용자 관심분야: {interests}
-    
+
     [응답 형식]
     [
       {{"title": "제목", "link": "전체URL", "score": 0.0~1.0, "summary": "관심분야 중심 1문장 요약"}}
     ]
-    
+
     내용:
-    {content[:15000]}
+    {body}
     """
-    
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
+
+    def call_model():
+        response = provider("gemini").call(
+            client.models.generate_content,
+            model=PARSE_MODEL,
             contents=prompt
         )
-        # JSON 배열 추출 로직
-        match = re.search(r"\[.*\]", response.text, re.DOTALL)
-        return json.loads(match.group(0)) if match else []
+        # JSON 배열 추출 로직. 배열이 없거나 비어 있으면 None → 캐시에 저장하지 않고 다음 실행에 다시 파싱
+        match = re.search(r"\[.*\]", response.text or "", re.DOTALL)
+        posts = json.loads(match.group(0)) if match else None
+        return posts or None
+
+    try:
+        # 내용이 바뀌지 않은 게시판은 캐시된 파싱 결과를 그대로 사용 (LLM 호출 0회)
+        return cached_llm_call(PARSE_MODEL, PARSE_PROMPT_VERSION, {"interests": interests, "content": body}, call_model) or []
     except Exception as e:
+        # 재시도 소진·서킷 열림은 "공지 없음"이 아니므로 올려서 그 게시판을 실패로 처리
+        # (CrawlEngine.crawl이 failed에 기록하고, 검증자·워터마크를 저장하지 않아 다음 실행에 다시 파싱)
+        if provider("gemini").unavailable(e):
+            raise
         print(f"AI 파싱 실패: {e}")
-        return []
\ No newline at end of file
+        return []
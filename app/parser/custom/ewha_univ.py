@@ -0,0 +1,38 @@
+from datetime import datetime
+from urllib.parse import urljoin
+import logging
+
+from app.parser.html_backend import SelectorSet, get_backend
+
+LOG = logging.getLogger(__name__)
+
+EWHA_NOTICE_URL = "https://www.ewha.ac.kr/ewha/news/notice.do"
+# 이화여대 공지 표 셀렉터 (백엔드별로 한 번만 컴파일)
+SELECTORS = SelectorSet(row="tbody tr", cell="td", link="a")
+
+def parse_ewha_list(html, page_url=EWHA_NOTICE_URL, backend=None):
+    """
+    이화여대 공지 목록 HTML → [{"title", "link", "date"(ISO)}]
+    표 구조: 3번째 칸 제목 링크, 5번째 칸 게시일(YYYY.MM.DD). 기간 필터는 호출하는 쪽에서.
+    """
+    backend = backend or get_backend()
+    sel = SELECTORS.compiled(backend)
+    posts = []
+    for row in backend.select(backend.parse(html), sel["row"]):
+        cols = backend.select(row, sel["cell"])
+        if len(cols) < 5:
+            continue
+        link_tag = backend.select_one(cols[2], sel["link"])
+        if link_tag is None:
+            continue
+        try:
+            row_date = datetime.strptime(backend.text(cols[4]), "%Y.%m.%d").date()
+        except ValueError:
+            continue
+        href = backend.attr(link_tag, "href")
+        posts.append({
+            "title": backend.text(link_tag),
+            "link": urljoin(page_url, href) if href else page_url,
+            "date": row_date.isoformat(),
+        })
+    return posts
@@ -2,44 +2,72 @@ from datetime import datetime, timedelta
 from urllib.parse import urljoin
 import logging
 
+from app.parser.html_backend import SelectorSet, get_backend
+
 LOG = logging.getLogger(__name__)
 
+# 고려대 게시판 셀렉터 (백엔드별로 한 번만 컴파일)
+SELECTORS = SelectorSet(row="tr", cell="td", title="a.article-title")
+
+def _parse_row(row, page_url, backend, sel):
+    """고려대 게시판 tr 한 줄 → (게시일, 제목, 링크). 공지 행이 아니면 None"""
+    cells = backend.select(row, sel["cell"])
+    if not cells:
+        return None
+
+    # 날짜 파싱 (고려대 형식: YYYY.MM.DD)
+    date_text = backend.text(cells[-1])
+    try:
+        row_date = datetime.strptime(date_text, "%Y.%m.%d").date()
+    except ValueError:
+        return None
+
+    link_tag = backend.select_one(row, sel["title"])
+    if link_tag is None:
+        return None
+
+    href = (backend.attr(link_tag, "href") or "").replace("amp;", "")
+    return row_date, backend.text(link_tag), urljoin(page_url, href)
+
 def parse_korea_univ_list(rows, page_url, interval_days, timezone):
     """
-    기존의 parse_posts 로직: 고려대 전용 tr 태그 분석
+    기존의 parse_posts 로직: 고려대 전용 tr 태그 분석 (rows는 BeautifulSoup 태그)
     """
+    backend = get_backend("bs4")
+    sel = SELECTORS.compiled(backend)
     today = datetime.now(timezone).date()
     cutoff = today - timedelta(days=interval_days - 1)
     
     posts = []
     for row in rows:
-        cells = row.find_all("td")
-        if not cells: continue
-        
-        # 날짜 파싱 (고려대 형식: YYYY.MM.DD)
-        date_text = cells[-1].get_text(strip=True)
-        try:
-            row_date = datetime.strptime(date_text, "%Y.%m.%d").date()
-        except ValueError:
+        parsed = _parse_row(row, page_url, backend, sel)
+        if not parsed or parsed[0] < cutoff:
             continue
-            
-        if row_date < cutoff: continue
-            
-        link_tag = row.select_one("a.article-title")
-        if not link_tag: continue
-            
-        href = (link_tag.get("href") or "").replace("amp;", "")
-        title = link_tag.get_text(strip=True)
-        
+        row_date, title, link = parsed
         posts.append({
             "title": title, 
-            "link": urljoin(page_url, href),
-            "date": date_text
+            "link": link,
+            "date": row_date.strftime("%Y.%m.%d")
         })
     return posts
 
+def parse_korea_univ(html, page_url, backend=None):
+    """
+    파서 레지스트리용: 게시판 목록 HTML 전체 → [{"title", "link", "date"(ISO)}]
+    기간 필터는 하지 않음 (유저별 intervalDays는 분배 단계에서 적용)
+    """
+    backend = backend or get_backend()
+    sel = SELECTORS.compiled(backend)
+    posts = []
+    for row in backend.select(backend.parse(html), sel["row"]):
+        parsed = _parse_row(row, page_url, backend, sel)
+        if parsed:
+            row_date, title, link = parsed
+            posts.append({"title": title, "link": link, "date": row_date.isoformat()})
+    return posts
+
 def get_korea_univ_content_area(soup):
     """
     기존 fetch_post_content의 본문 영역 탐색 로직
     """
-    return soup.select_one(".view-con") or soup.select_one(".fr-view")
\ No newline at end of file
+    return soup.select_one(".view-con") or soup.select_one(".fr-view")
@@ -0,0 +1,38 @@
+from datetime import datetime
+import json
+import logging
+
+LOG = logging.getLogger(__name__)
+
+# 서강대 공지 페이지는 SPA라서 목록은 아래 API(JSON)에서 가져온다
+SOGANG_API_URL = "https://www.sogang.ac.kr/api/api/v1/mainKo/BbsData/boardList?pageNum=1&pageSize=200&bbsConfigFk=2"
+SOGANG_POST_URL = "https://www.sogang.ac.kr/ko/academic-support/notices"
+
+def _entries(data):
+    if isinstance(data, dict):
+        if isinstance(data.get("data"), dict):
+            return data["data"].get("list") or []
+        if isinstance(data.get("list"), list):
+            return data["list"]
+    return []
+
+def parse_sogang_list(payload, page_url=SOGANG_API_URL):
+    """
+    서강대 게시판 API 응답(JSON 문자열 또는 dict) → [{"title", "link", "date"(ISO)}]
+    regDate 앞 8자리(YYYYMMDD)를 게시일로 사용. 기간 필터는 호출하는 쪽에서.
+    """
+    data = json.loads(payload) if isinstance(payload, (str, bytes)) else payload
+    posts = []
+    for row in _entries(data):
+        date_raw = str(row.get("regDate") or "")
+        try:
+            row_date = datetime.strptime(date_raw[:8], "%Y%m%d").date()
+        except ValueError:
+            continue
+        pk = row.get("pkId")
+        posts.append({
+            "title": row.get("title") or "제목 없음",
+            "link": f"{SOGANG_POST_URL}/{pk}" if pk else SOGANG_POST_URL,
+            "date": row_date.isoformat(),
+        })
+    return posts
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+LOG = logging.getLogger(__name__)
+
+# auto(기본: selectolax → lxml → bs4 순서로 설치된 것) | selectolax | lxml | bs4
+HTML_BACKEND = os.getenv("HTML_BACKEND", "auto").lower()
+
+
+class BS4Backend:
+    """기존 방식 (BeautifulSoup + html.parser). 비교 기준이자 최후의 대체 수단."""
+
+    name = "bs4"
+
+    def parse(self, html: str) -> Any:
+        return BeautifulSoup(html, "html.parser")
+
+    def compile(self, css: str) -> Any:
+        return soupsieve.compile(css)
+
+    def select(self, node: Any, selector: Any) -> list[Any]:
+        return selector.select(node)
+
+    def select_one(self, node: Any, selector: Any) -> Any | None:
+        return selector.select_one(node)
+
+    def text(self, node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node: Any, name: str) -> str | None:
+        return node.get(name)
+
+
+class LxmlBackend:
+    """lxml(libxml2) + cssselect로 미리 변환해 둔 XPath."""
+
+    name = "lxml"
+
+    def __init__(self) -> None:
+        from lxml import html as lxml_html
+        from lxml.cssselect import CSSSelector
+
+        self._html = lxml_html
+        self._selector = CSSSelector
+
+    def parse(self, html: str) -> Any:
+        return self._html.document_fromstring(html)
+
+    def compile(self, css: str) -> Any:
+        return self._selector(css)
+
+    def select(self, node: Any, selector: Any) -> list[Any]:
+        return selector(node)
+
+    def select_one(self, node: Any, selector: Any) -> Any | None:
+        found = selector(node)
+        return found[0] if found else None
+
+    def text(self, node: Any) -> str:
+        # bs4 get_text(strip=True)와 같은 규칙: 텍스트 조각마다 strip 후 구분자 없이 이어 붙임
+        return "".join(part.strip() for part in node.itertext() if part.strip())
+
+    def attr(self, node: Any, name: str) -> str | None:
+        return node.get(name)
+
+
+class SelectolaxBackend:
+    """selectolax(lexbor). 셀렉터는 lexbor가 C 레벨에서 해석하므로 문자열을 그대로 쓴다."""
+
+    name = "selectolax"
+
+    def __init__(self) -> None:
+        from selectolax.lexbor import LexborHTMLParser
+
+        self._parser = LexborHTMLParser
+
+    def parse(self, html: str) -> Any:
+        return self._parser(html)
+
+    def compile(self, css: str) -> Any:
+        return css
+
+    def select(self, node: Any, selector: Any) -> list[Any]:
+        return node.css(selector)
+
+    def select_one(self, node: Any, selector: Any) -> Any | None:
+        return node.css_first(selector)
+
+    def text(self, node: Any) -> str:
+        return node.text(deep=True, separator="", strip=True)
+
+    def attr(self, node: Any, name: str) -> str | None:
+        return node.attributes.get(name)
+
+
+BACKENDS = {"selectolax": SelectolaxBackend, "lxml": LxmlBackend, "bs4": BS4Backend}
+_instances: dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_backend(name: str | None = None) -> Any:
+    """이름으로 백엔드를 고른다. auto면 설치된 것 중 가장 빠른 것."""
+    name = (name or HTML_BACKEND).lower()
+    candidates = list(BACKENDS) if name == "auto" else [name, "bs4"]
+    with _lock:
+        for candidate in candidates:
+            if candidate in _instances:
+                return _instances[candidate]
+            try:
+                backend = BACKENDS[candidate]()
+            except (ImportError, KeyError) as exc:
+                if name != "auto":
+                    LOG.warning("HTML 백엔드 %s 사용 불가 (%r), bs4로 대체", candidate, exc)
+                continue
+            _instances[candidate] = backend
+            return backend
+    raise RuntimeError("사용 가능한 HTML 백엔드가 없습니다")
+
+
+class SelectorSet:
+    """사이트별 CSS 셀렉터 묶음. 백엔드마다 한 번만 컴파일해서 재사용한다."""
+
+    def __init__(self, **css: str) -> None:
+        self.css = css
+        self._compiled: dict[str, dict[str, Any]] = {}
+
+    def compiled(self, backend: Any) -> dict[str, Any]:
+        compiled = self._compiled.get(backend.name)
+        if compiled is None:
+            compiled = {key: backend.compile(css) for key, css in self.css.items()}
+            self._compiled[backend.name] = compiled
+        return compiled
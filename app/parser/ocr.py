@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import resource
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import io
+from typing import Any
+
+import cv2
+import numpy as np
+import pytesseract
+import requests
+from PIL import Image
+
+from app.parser.ocr_cache import OCRStats, content_hash, get_cache, phash
+
+LOG = logging.getLogger(__name__)
+
+pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+# 워커 프로세스 수 (기본: CPU 코어 수, 0이면 풀 없이 현재 프로세스에서 실행)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+# 동시에 풀에 들어가 있을 수 있는 작업 수 (초과 시 제출하는 쪽이 대기)
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", str(max(1, OCR_WORKERS) * 4)))
+# 최대 대기 시간(초): 워커에서는 Tesseract 1회 실행 상한(넘으면 프로세스를 죽임),
+# OCRRun.texts()에서는 한 번 호출에 걸린 이미지 전체를 기다리는 상한
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "60"))
+# OCR 전에 글자가 있을 법한 이미지인지 먼저 거르는 단계 (로고·사진·장식 배너 제외)
+OCR_PRESCREEN = os.getenv("OCR_PRESCREEN", "true").lower() in ("1", "true", "yes")
+# 글자 가능성 점수(0~1)가 이 값보다 낮으면 OCR 생략
+OCR_TEXT_THRESHOLD = float(os.getenv("OCR_TEXT_THRESHOLD", "0.3"))
+# Tesseract에 넘기는 이미지의 긴 변 최대 픽셀 (그보다 크면 축소)
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2000"))
+# 글자 가능성 추정용 축소본의 긴 변 픽셀
+PRESCREEN_SIDE = 800
+# 같은 줄에 놓인 글자 모양 연결 요소가 이 정도 보이면 글자 이미지로 확신
+PRESCREEN_MIN_GLYPHS = 30
+# 줄 판정에 쓰는 연결 요소 최대 개수 (쌍 비교 행렬 크기 제한)
+PRESCREEN_MAX_GLYPHS = 1500
+# 엣지 밀도가 이보다 높으면 글자보다는 질감이 많은 사진으로 보고 감점
+PRESCREEN_MAX_EDGE_DENSITY = 0.25
+# 이미지 1장 다운로드 상한(바이트). 넘으면 받다가 중단하고 OCR 생략
+OCR_MAX_BYTES = int(os.getenv("OCR_MAX_BYTES", str(10 * 1024 * 1024)))
+# 디코딩 전 헤더의 가로x세로가 이 값을 넘으면 OCR 생략 (압축 폭탄·초대형 스캔 방지)
+OCR_MAX_PIXELS = int(os.getenv("OCR_MAX_PIXELS", str(40_000_000)))
+DOWNLOAD_CHUNK = 64 * 1024
+
+session = requests.Session()
+session.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+})
+
+
+# 스레드마다 하나씩 두고 재사용하는 다운로드 버퍼 (이미지마다 새로 할당하지 않음).
+# OCR_WORKERS=0이면 여러 스레드가 같은 프로세스에서 OCR을 돌리므로 전역 하나로 두면 안 됨.
+# 처음 이미지를 받을 때 만들고, 그보다 큰 이미지가 오면 필요한 만큼만 키운다 (최대 OCR_MAX_BYTES)
+_local = threading.local()
+
+
+def _ensure_buffer(needed: int, keep: int = 0) -> bytearray:
+    """needed 바이트 이상인 스레드 버퍼. 키울 때는 앞의 keep 바이트를 옮겨 담는다."""
+    buffer = getattr(_local, "buffer", None)
+    if buffer is not None and len(buffer) >= needed:
+        return buffer
+    # 제자리에서 늘리면 아직 살아 있는 memoryview 때문에 BufferError가 나므로 새로 만든다
+    grown = bytearray(needed)
+    if keep:
+        grown[:keep] = memoryview(buffer)[:keep]
+    _local.buffer = grown
+    return grown
+
+
+class _ViewFile(io.RawIOBase):
+    """memoryview 위의 읽기 전용 파일 객체. BytesIO와 달리 내용을 복사하지 않는다."""
+
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        chunk = self._view[self._pos:self._pos + len(b)]
+        b[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def _download_image(img_url: str) -> memoryview | None:
+    """헤더를 먼저 보고, 이미지가 아니거나 OCR_MAX_BYTES를 넘으면 본문을 받지 않는다.
+
+    본문은 재사용 버퍼에 조각 단위로 읽어 들이며, Content-Length가 없는 응답도
+    읽는 도중 상한을 넘으면 중단한다. 돌려주는 memoryview는 같은 스레드의 다음 호출 전까지만 유효하다.
+    """
+    with session.get(img_url, timeout=HTTP_TIMEOUT, stream=True) as resp:
+        resp.raise_for_status()
+        if "image" not in resp.headers.get("Content-Type", "").lower():
+            return None
+        length = resp.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > OCR_MAX_BYTES:
+            LOG.info("🖼️ 이미지가 너무 커서 OCR 생략 (%s bytes): %s", length, img_url)
+            return None
+
+        # 위에서 확인한 Content-Length만큼만 확보 (없으면 조각 하나로 시작해서 키움)
+        expected = int(length) if length and length.isdigit() else DOWNLOAD_CHUNK
+        buffer = _ensure_buffer(max(1, expected))
+        resp.raw.decode_content = True
+        size = 0
+        while True:
+            if size == len(buffer):
+                # 버퍼가 찼으면 끝났는지 확인 (압축 해제로 Content-Length보다 길어질 수 있음)
+                extra = resp.raw.read(1)
+                if not extra:
+                    break
+                if size >= OCR_MAX_BYTES:
+                    LOG.info("🖼️ 이미지가 %d bytes를 넘어 OCR 생략: %s", OCR_MAX_BYTES, img_url)
+                    return None
+                buffer = _ensure_buffer(min(OCR_MAX_BYTES, size * 2), keep=size)
+                buffer[size] = extra[0]
+                size += 1
+                continue
+            read = resp.raw.readinto(memoryview(buffer)[size:size + DOWNLOAD_CHUNK])
+            if not read:
+                break
+            size += read
+        return memoryview(buffer)[:size]
+
+
+def _open_image(data: memoryview, img_url: str) -> Image.Image | None:
+    """픽셀 예산을 헤더로 먼저 확인하고, 디코딩할 때부터 OCR_MAX_SIDE 근처로 줄여서 연다."""
+    img = Image.open(_ViewFile(data))  # 여기까지는 헤더만 읽음 (버퍼를 복사하지 않음)
+    width, height = img.size
+    if width * height > OCR_MAX_PIXELS:
+        LOG.info("🖼️ 이미지 픽셀 수 초과 (%dx%d), OCR 생략: %s", width, height, img_url)
+        return None
+
+    scale = max(width, height) / OCR_MAX_SIDE
+    if scale > 1:
+        if img.format == "JPEG":
+            # JPEG는 DCT 단계에서 1/2~1/8로 줄여 디코딩 (원본 크기 비트맵을 만들지 않음)
+            img.draft("L", (int(width / scale), int(height / scale)))
+        else:
+            # reduce()는 팔레트(P)·1비트 이미지를 지원하지 않으므로 흑백으로 바꾼 뒤 줄임
+            if img.mode not in ("L", "LA", "RGB", "RGBA"):
+                img = img.convert("L")
+            img = img.reduce(int(scale))
+    img.load()
+    return img
+
+
+def _cpu_seconds() -> float:
+    # tesseract는 자식 프로세스로 돌기 때문에 자식 CPU 시간까지 합산
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + usage.ru_utime + usage.ru_stime
+
+
+def _fit(gray: np.ndarray, max_side: int) -> np.ndarray:
+    height, width = gray.shape
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return gray
+    return cv2.resize(gray, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+
+
+def text_likelihood(gray: np.ndarray) -> float:
+    """흑백 이미지에 글자가 있을 가능성(0~1).
+
+    이진화한 뒤 연결 요소 중 글자 크기·종횡비·채움 비율을 가진 것만 남기고,
+    그중 옆 글자와 같은 줄(밑변·높이가 비슷하고 간격이 좁음)에 놓인 요소 수로 점수를 매긴다.
+    로고·단색 배너는 이런 요소가 거의 없고, 엣지가 지나치게 빽빽한 사진(나뭇잎·군중 등)은 감점한다.
+    """
+    small = _fit(gray, PRESCREEN_SIDE)
+    edges = cv2.Canny(small, 100, 200)
+    edge_density = float(np.count_nonzero(edges)) / edges.size
+    if edge_density < 0.005:
+        return 0.0
+
+    binary = cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 25, 15)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    x, y, w, h, area = (stats[1:, i] for i in range(5))  # 0번은 배경
+    aspect = w / np.maximum(h, 1)
+    fill = area / np.maximum(w * h, 1)
+    glyphs = np.flatnonzero(
+        (area >= 8)
+        & (h >= 6) & (h <= small.shape[0] * 0.2)
+        & (aspect >= 0.1) & (aspect <= 10)
+        & (fill >= 0.1) & (fill <= 0.95)
+    )[:PRESCREEN_MAX_GLYPHS]
+    if glyphs.size < 2:
+        return 0.0
+
+    gx, gw, gh = x[glyphs], w[glyphs], h[glyphs]
+    bottom = y[glyphs] + gh
+    gap = gx[None, :] - (gx + gw)[:, None]
+    linked = (
+        (np.abs(bottom[:, None] - bottom[None, :]) <= np.maximum(2, 0.2 * gh)[:, None])
+        & (gh[None, :] >= 0.6 * gh[:, None]) & (gh[None, :] <= 1.6 * gh[:, None])
+        & (gap >= -1) & (gap <= 1.2 * gh[:, None])
+    )
+    np.fill_diagonal(linked, False)
+    line_glyphs = int(np.count_nonzero(linked.any(axis=0) | linked.any(axis=1)))
+
+    texture_penalty = min(1.0, PRESCREEN_MAX_EDGE_DENSITY / edge_density)
+    return round(min(1.0, line_glyphs / PRESCREEN_MIN_GLYPHS) * texture_penalty, 4)
+
+
+def preprocess_for_ocr(pil_img: Image.Image) -> tuple[Image.Image, float]:
+    """OCR 입력 준비: 흑백 변환 → 큰 이미지 축소 → Otsu 이진화. (이미지, 글자 가능성)을 돌려준다."""
+    gray = np.asarray(pil_img.convert("L"))
+    score = text_likelihood(gray)
+    gray = _fit(gray, OCR_MAX_SIDE)
+    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return Image.fromarray(thresh), score
+
+
+def _ocr_job(img_url: str) -> tuple[str, str, float]:
+    """워커에서 실행되는 OCR 작업. (텍스트, 결과 종류, CPU 초)를 돌려준다.
+
+    결과 종류: hit(바이트 동일) / near(가로세로 동일·pHash 근접) / miss(Tesseract 실행)
+    / filtered(글자 없는 이미지로 판정) / skip(이미지 아님·실패)
+    hit/near의 CPU 초는 캐시 덕분에 아낀 시간, miss는 실제로 쓴 시간이다.
+    """
+    try:
+        data = _download_image(img_url)
+        if data is None:
+            return "", "skip", 0.0
+
+        cache = get_cache()
+        sha256 = content_hash(data)
+        if cache is not None:
+            cached = cache.get(sha256)
+            if cached is not None:
+                return cached[0], "hit", cached[1]
+
+        img = _open_image(data, img_url)
+        if img is None:
+            return "", "skip", 0.0
+        image_phash = None
+        image_size = img.size
+        if cache is not None:
+            image_phash = phash(img)
+            cached = cache.get_similar(image_phash, image_size)
+            if cached is not None:
+                # 다시 인코딩된 같은 이미지: 이번 바이트 해시로도 바로 찾을 수 있게 등록
+                cache.set(sha256, image_phash, cached[0], cached[1], image_size)
+                return cached[0], "near", cached[1]
+
+        started = _cpu_seconds()
+        if OCR_PRESCREEN:
+            img, score = preprocess_for_ocr(img)
+            if score < OCR_TEXT_THRESHOLD:
+                LOG.debug("🖼️ 글자 없는 이미지로 판단해 OCR 생략 (%.3f): %s", score, img_url)
+                cpu_seconds = _cpu_seconds() - started
+                # 빈 텍스트로 저장해 두면 다음 실행에서는 받자마자 캐시 적중으로 끝남
+                if cache is not None:
+                    cache.set(sha256, image_phash, "", cpu_seconds, image_size)
+                return "", "filtered", cpu_seconds
+        # 멈춘 tesseract가 워커를 계속 붙잡지 않도록 시간 초과 시 자식 프로세스를 종료
+        text = pytesseract.image_to_string(img, lang="kor+eng", config="--oem 3 --psm 6", timeout=OCR_TIMEOUT).strip()
+        cpu_seconds = _cpu_seconds() - started
+        if cache is not None:
+            cache.set(sha256, image_phash, text, cpu_seconds, image_size)
+        return text, "miss", cpu_seconds
+    except Exception as e:
+        LOG.error("❌ OCR 실패: %r", e)
+        return "", "skip", 0.0
+
+
+def extract_text_from_image(img_url: str) -> str:
+    """이미지 URL에서 텍스트를 추출하는 OCR 함수 (OCR 캐시를 먼저 확인)"""
+    return _ocr_job(img_url)[0]
+
+
+class OCRPool:
+    """Tesseract를 코어 수만큼의 프로세스에서 병렬로 돌리는 풀 (작업 큐 크기 제한)."""
+
+    def __init__(self, workers: int = OCR_WORKERS, queue_size: int = OCR_QUEUE_SIZE) -> None:
+        self.workers = workers
+        self.stats = OCRStats()
+        self._slots = threading.BoundedSemaphore(max(1, queue_size))
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 브라우저 풀 등 스레드가 떠 있는 프로세스를 fork하지 않도록 spawn 사용
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """워커가 죽어(OOM 등) 깨진 풀을 버린다. 다음 제출 때 새 풀을 만든다."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        LOG.warning("♻️ OCR 프로세스 풀이 깨져 새로 만듭니다")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, img_url: str) -> Future:
+        """OCR 텍스트를 결과로 갖는 Future. 캐시 적중/CPU 시간은 이 프로세스의 stats에 모인다."""
+        result: Future = Future()
+        if self.workers <= 0:
+            self._finish(result, _ocr_job(img_url))
+            return result
+        self._slots.acquire()
+        try:
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    job = executor.submit(_ocr_job, img_url)
+                    break
+                except BrokenProcessPool:
+                    self._discard(executor)
+                    if attempt:
+                        raise
+        except Exception:
+            self._slots.release()
+            raise
+        job.add_done_callback(lambda done: self._on_done(done, result, executor))
+        return result
+
+    def _on_done(self, job: Future, result: Future, executor: ProcessPoolExecutor) -> None:
+        self._slots.release()
+        if not job.cancelled() and isinstance(job.exception(), BrokenProcessPool):
+            self._discard(executor)
+        if job.cancelled():
+            result.cancel()
+        elif job.exception() is not None:
+            result.set_exception(job.exception())
+        else:
+            self._finish(result, job.result())
+
+    def _finish(self, result: Future, outcome: tuple[str, str, float]) -> None:
+        text, kind, cpu_seconds = outcome
+        self.stats.record(kind, cpu_seconds)
+        result.set_result(text)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool: OCRPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> OCRPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OCRPool()
+        return _pool
+
+
+def ocr_stats() -> dict[str, Any]:
+    with _pool_lock:
+        pool = _pool
+    if pool is None:
+        return {"workers": OCR_WORKERS, "running": False}
+    return {"workers": pool.workers, "running": pool._executor is not None, **pool.stats.snapshot()}
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+class OCRRun:
+    """크롤링 1회 단위의 OCR 작업 묶음. 같은 이미지는 한 번만 OCR 하고 결과를 공유한다."""
+
+    def __init__(self, pool: OCRPool | None = None, timeout: float = OCR_TIMEOUT) -> None:
+        self.pool = pool or get_pool()
+        self.timeout = timeout
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, img_url: str) -> Future:
+        """제출 자체가 실패하면 예외를 담은 Future를 돌려준다 (캐시하지 않으므로 다음에 다시 제출됨)."""
+        with self._lock:
+            future = self._futures.get(img_url)
+            if future is None:
+                try:
+                    future = self.pool.submit(img_url)
+                except Exception as exc:
+                    future = Future()
+                    future.set_exception(exc)
+                    return future
+                self._futures[img_url] = future
+            return future
+
+    def texts(self, img_urls: list[str]) -> list[str]:
+        """img_urls 순서 그대로 OCR 결과를 돌려준다 (실패/시간 초과는 빈 문자열).
+
+        이미지 수와 무관하게 전체를 timeout 한 번만큼만 기다린다.
+        """
+        futures = [self.submit(url) for url in img_urls]  # 먼저 전부 제출해서 병렬로 돌림
+        wait(set(futures), timeout=self.timeout)
+        results: list[str] = []
+        for url, future in zip(img_urls, futures):
+            if not future.done():
+                LOG.warning("⏱️ OCR 시간 초과(%ss): %s", self.timeout, url)
+                results.append("")
+                continue
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                LOG.error("❌ OCR 작업 실패 %s: %r", url, exc)
+                results.append("")
+        return results
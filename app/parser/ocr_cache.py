@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import cv2
+import numpy as np
+from PIL import Image
+
+LOG = logging.getLogger(__name__)
+
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE", "true").lower() in ("1", "true", "yes")
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", "/tmp/ocr_cache.sqlite3")
+# 저장된 OCR 텍스트 총량 상한(바이트). 넘으면 오래 안 쓴 항목부터 제거
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# 가로세로가 같고 pHash 해밍 거리가 이 값 이하면 같은 이미지로 보고 OCR 결과를 재사용
+OCR_PHASH_DISTANCE = int(os.getenv("OCR_PHASH_DISTANCE", "2"))
+# 용량 계산 시 항목마다 더하는 고정 크기 (해시·숫자 컬럼). 빈 텍스트 항목도 제거 대상이 되도록
+ROW_OVERHEAD_BYTES = 128
+
+
+def content_hash(data: bytes | memoryview) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def phash(img: Image.Image, size: int = 8) -> int:
+    """perceptual hash: 32x32 흑백 축소본의 DCT 저주파 8x8 계수가 중앙값보다 큰지 64비트.
+
+    재인코딩·재압축(JPEG 품질 변경, 메타데이터 제거)에는 거의 변하지 않는다.
+    """
+    side = size * 4
+    small = np.asarray(img.convert("L").resize((side, side), Image.Resampling.LANCZOS), dtype=np.float32)
+    low = cv2.dct(small)[:size, :size].flatten()
+    median = np.median(low[1:])  # 0번(DC)은 전체 밝기라 기준에서 제외
+    bits = 0
+    for bit in low > median:
+        bits = (bits << 1) | int(bit)
+    return bits
+
+
+class OCRCache:
+    """이미지 OCR 결과 디스크 캐시.
+
+    1차 키는 이미지 바이트의 sha256, 못 찾으면 가로세로가 같은 이미지 중 pHash 해밍 거리가
+    OCR_PHASH_DISTANCE 이하인 것을 찾는다 (다시 인코딩·압축해서 올린 같은 포스터).
+    같은 템플릿에 글자만 다른 포스터까지 묶이지 않도록 거리는 작게 두고 가로세로도 같아야 한다.
+    글자 없는 이미지로 걸러진 결과도 빈 텍스트로 저장해서 다음 실행에 다시 받지 않게 한다.
+    항목마다 OCR에 든 CPU 시간을 같이 저장해서 적중 시 절약한 시간을 계산한다.
+    OCR 워커 프로세스마다 따로 연결을 열어 쓴다 (sqlite 파일 하나를 공유).
+    """
+
+    def __init__(
+        self,
+        path: str = OCR_CACHE_PATH,
+        max_bytes: int = OCR_CACHE_MAX_BYTES,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " sha256 TEXT PRIMARY KEY, phash TEXT, text TEXT NOT NULL,"
+            " cpu_seconds REAL NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL,"
+            " width INTEGER, height INTEGER)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(ocr_cache)")}
+        for column, kind in (("phash", "TEXT"), ("width", "INTEGER"), ("height", "INTEGER")):
+            if column not in columns:
+                # 이전 버전에서 만든 파일 (기존 항목은 sha256으로만 적중)
+                self._conn.execute(f"ALTER TABLE ocr_cache ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ocr_cache_lru ON ocr_cache(last_access)")
+        self._conn.execute("DROP INDEX IF EXISTS ocr_cache_near")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ocr_cache_dims ON ocr_cache(width, height)")
+        self._conn.commit()
+
+    def get(self, sha256: str) -> tuple[str, float] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT text, cpu_seconds FROM ocr_cache WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is not None:
+                self._touch(sha256)
+        return (row[0], row[1]) if row else None
+
+    def get_similar(self, image_phash: int, size: tuple[int, int]) -> tuple[str, float] | None:
+        """가로세로(size)가 같은 항목 중 pHash 해밍 거리가 가장 가까운 것 (OCR_PHASH_DISTANCE 이하)."""
+        best = None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sha256, phash, text, cpu_seconds FROM ocr_cache"
+                " WHERE width = ? AND height = ? AND phash IS NOT NULL",
+                size,
+            )
+            for sha256, other, text, cpu_seconds in rows:
+                distance = bin(image_phash ^ int(other, 16)).count("1")
+                if distance <= OCR_PHASH_DISTANCE and (best is None or distance < best[0]):
+                    best = (distance, sha256, text, cpu_seconds)
+                    if not distance:
+                        break
+            if best is not None:
+                self._touch(best[1])
+        return (best[2], best[3]) if best else None
+
+    def set(
+        self,
+        sha256: str,
+        image_phash: int | None,
+        text: str,
+        cpu_seconds: float,
+        image_size: tuple[int, int] | None = None,
+    ) -> None:
+        size = len(text.encode("utf-8")) + ROW_OVERHEAD_BYTES
+        width, height = image_size or (None, None)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache"
+                " (sha256, phash, text, cpu_seconds, size, last_access, width, height)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sha256, f"{image_phash:016x}" if image_phash is not None else None, text, cpu_seconds, size,
+                    time.time(), width, height,
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _touch(self, sha256: str) -> None:
+        self._conn.execute("UPDATE ocr_cache SET last_access = ? WHERE sha256 = ?", (time.time(), sha256))
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        stale = []
+        for sha256, size in self._conn.execute("SELECT sha256, size FROM ocr_cache ORDER BY last_access ASC"):
+            stale.append((sha256,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM ocr_cache WHERE sha256 = ?", stale)
+        LOG.info("🧹 OCR 캐시 %d건 제거 (%d bytes)", len(stale), freed)
+
+
+_cache: OCRCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> OCRCache | None:
+    """프로세스별 캐시 인스턴스. OCR_CACHE=false거나 열 수 없으면 None."""
+    global _cache
+    if not OCR_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = OCRCache()
+            except Exception as exc:
+                LOG.warning("OCR 캐시를 열 수 없어 캐시 없이 진행: %r", exc)
+                return None
+        return _cache
+
+
+def set_cache(cache: OCRCache | None) -> None:
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+class OCRStats:
+    """OCR 적중률 / CPU 시간 집계. 워커가 돌려준 결과를 부모 프로세스에서 모은다."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.filtered = 0
+        self.cpu_seconds_spent = 0.0
+        self.cpu_seconds_saved = 0.0
+
+    def record(self, outcome: str, cpu_seconds: float) -> None:
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+                self.cpu_seconds_saved += cpu_seconds
+            elif outcome == "near":
+                self.near_hits += 1
+                self.cpu_seconds_saved += cpu_seconds
+            elif outcome == "miss":
+                self.misses += 1
+                self.cpu_seconds_spent += cpu_seconds
+            elif outcome == "filtered":
+                self.filtered += 1
+                self.cpu_seconds_spent += cpu_seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses + self.filtered
+            return {
+                "hits": self.hits,
+                "nearHits": self.near_hits,
+                "misses": self.misses,
+                "filtered": self.filtered,
+                "hitRate": round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+                "cpuSecondsSpent": round(self.cpu_seconds_spent, 3),
+                "cpuSecondsSaved": round(self.cpu_seconds_saved, 3),
+            }
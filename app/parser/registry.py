@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any, Callable
+
+from app.parser.custom.ewha_univ import parse_ewha_list
+from app.parser.custom.korea_univ import parse_korea_univ
+from app.parser.custom.sogang_univ import SOGANG_API_URL, parse_sogang_list
+
+LOG = logging.getLogger(__name__)
+
+
+class ListParser:
+    """구조를 아는 게시판 목록 파서. 원본(HTML/JSON) → [{"title", "link", "date"}]."""
+
+    __slots__ = ("name", "pattern", "parse", "source")
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str,
+        parse: Callable[[str, str], list[dict[str, Any]]],
+        source: str | None = None,
+    ) -> None:
+        self.name = name
+        self.pattern = re.compile(pattern, re.I)
+        self.parse = parse
+        # 목록 데이터를 실제로 받아올 주소 (SPA 페이지 대신 API를 쓰는 경우)
+        self.source = source
+
+    def source_url(self, url: str) -> str:
+        return self.source or url
+
+    def __repr__(self) -> str:
+        return f"ListParser({self.name!r})"
+
+
+# URL 패턴 순서대로 첫 번째로 맞는 파서를 쓴다. 여기에 없는 사이트만 AI 파서로 간다
+PARSERS = [
+    ListParser("korea_univ", r"^https?://info\.korea\.ac\.kr/info/board/[^/?#]+\.do", parse_korea_univ),
+    ListParser("ewha", r"^https?://www\.ewha\.ac\.kr/ewha/news/notice\.do", parse_ewha_list),
+    # 서강대 공지 페이지는 SPA라서 그 게시판(bbsConfigFk=2)의 API로 대신 받고,
+    # API 주소를 직접 구독한 경우에는 다른 게시판일 수 있으므로 주어진 주소 그대로 받는다
+    ListParser(
+        "sogang",
+        r"^https?://www\.sogang\.ac\.kr/ko/academic-support/notices/?(\?|$)",
+        parse_sogang_list,
+        source=SOGANG_API_URL,
+    ),
+    ListParser("sogang", r"^https?://www\.sogang\.ac\.kr/api/api/v1/mainKo/BbsData/boardList", parse_sogang_list),
+]
+
+
+def find_parser(url: str) -> ListParser | None:
+    for parser in PARSERS:
+        if parser.pattern.match(url):
+            return parser
+    return None
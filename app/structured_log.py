@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import time
+from typing import Any
+
+from app.engine.fetch_cache import normalize_url
+
+# text(기본: 사람이 읽는 한 줄) | json (Cloud Run 구조화 로그: severity/message/필드)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# 행 단위 추적을 켤 게시판 URL/이름/카테고리 (쉼표 구분). 요청의 debug.boards로도 켤 수 있다
+DEBUG_BOARDS = os.getenv("DEBUG_BOARDS", "")
+# 추적이 켜진 게시판에서 행 로그를 남길 비율 (0.0~1.0)
+DEBUG_SAMPLE_RATE = float(os.getenv("DEBUG_SAMPLE_RATE", "1.0"))
+
+# logging 레벨 → Cloud Logging severity
+_SEVERITY = {"WARNING": "WARNING", "CRITICAL": "CRITICAL", "ERROR": "ERROR", "INFO": "INFO", "DEBUG": "DEBUG"}
+
+
+class JsonFormatter(logging.Formatter):
+    """한 레코드를 JSON 한 줄로. extra={"fields": {...}}는 최상위 키로 펼친다."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "severity": _SEVERITY.get(record.levelname, "DEFAULT"),
+            "message": record.getMessage(),
+            "logger": record.name,
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S%z"),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["stack_trace"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging() -> None:
+    """LOG_FORMAT=json이면 루트 핸들러의 포맷을 JSON으로 바꾼다 (핸들러가 없으면 하나 만든다)."""
+    if LOG_FORMAT != "json":
+        return
+    root = logging.getLogger()
+    if not root.handlers:
+        root.addHandler(logging.StreamHandler())
+    for handler in root.handlers:
+        handler.setFormatter(JsonFormatter())
+
+
+class lazy_json:
+    """로그 인자로 넘기면 실제로 출력될 때만 json.dumps 한다 (LOG.debug("%s", lazy_json(payload)))."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any) -> None:
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return json.dumps(self.obj, ensure_ascii=False, default=str)
+
+
+def _board_set(value: Any) -> set[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return {str(item).strip() for item in value or [] if str(item).strip()}
+
+
+class BoardTrace:
+    """게시판 하나의 처리 결과를 세고, 추적이 켜진 경우에만 행 로그를 (샘플링해서) 남긴다.
+
+    key는 정규화한 게시판 URL, name은 로그에 보여줄 이름 (없으면 key).
+    """
+
+    __slots__ = ("logger", "key", "name", "counts", "traced", "sample_rate", "started")
+
+    def __init__(self, logger: logging.Logger, key: str, name: str, traced: bool, sample_rate: float) -> None:
+        self.logger = logger
+        self.key = key
+        self.name = name
+        self.counts: dict[str, int] = {}
+        self.traced = traced
+        self.sample_rate = sample_rate
+        self.started = time.perf_counter()
+
+    def count(self, key: str, n: int = 1) -> None:
+        self.counts[key] = self.counts.get(key, 0) + n
+
+    def row(self, msg: str, *args: Any) -> None:
+        """행 단위 로그. 추적 대상이 아니거나 샘플에서 빠지면 포맷팅 없이 바로 반환한다."""
+        if self.traced:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return
+            self.logger.info("🔬 [%s] " + msg, self.name, *args, extra={"fields": {"board": self.key, "trace": True}})
+        elif self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("[%s] " + msg, self.name, *args)
+
+    def summary(self) -> dict[str, Any]:
+        return {"name": self.name, **self.counts, "elapsedMs": round((time.perf_counter() - self.started) * 1000)}
+
+
+class RunSummary:
+    """실행 한 번에 대한 요약 레코드. 게시판별 집계를 모아 끝에 한 줄로 남긴다.
+
+    게시판은 정규화한 URL로 구분한다 (이름이 같은 서로 다른 게시판이 합쳐지거나 덮어써지지 않도록).
+    debug는 요청 이벤트의 {"boards": [...], "sampleRate": 0.1} 형태로, 재배포 없이 특정 게시판만 추적할 때 쓴다.
+    """
+
+    def __init__(self, logger: logging.Logger, job: str, debug: dict[str, Any] | None = None, **fields: Any) -> None:
+        debug = debug or {}
+        self.logger = logger
+        self.job = job
+        self.fields = fields
+        self.boards: dict[str, BoardTrace] = {}
+        self.debug_boards = _board_set(DEBUG_BOARDS) | _board_set(debug.get("boards"))
+        # URL로 지정한 경우 정규화해서 비교 (쿼리 순서·대소문자 차이 무시)
+        self.debug_boards |= {normalize_url(board) for board in self.debug_boards if "://" in board}
+        self.sample_rate = float(debug.get("sampleRate", DEBUG_SAMPLE_RATE))
+        self.started = time.perf_counter()
+
+    def board(self, url: str, name: str | None = None, *aliases: str) -> BoardTrace:
+        """url(정규화해서 키로 씀)의 BoardTrace. 같은 게시판을 다시 요청하면 같은 객체를 돌려준다."""
+        key = normalize_url(url)
+        trace = self.boards.get(key)
+        if trace is None:
+            names = (key, url, *((name,) if name else ()), *aliases)
+            traced = "*" in self.debug_boards or any(item in self.debug_boards for item in names)
+            trace = self.boards[key] = BoardTrace(self.logger, key, name or key, traced, self.sample_rate)
+        return trace
+
+    def emit(self, **fields: Any) -> None:
+        totals: dict[str, int] = {}
+        for trace in self.boards.values():
+            for key, value in trace.counts.items():
+                totals[key] = totals.get(key, 0) + value
+        record = {
+            "job": self.job,
+            **self.fields,
+            **fields,
+            "totals": totals,
+            "boards": {key: trace.summary() for key, trace in self.boards.items()},
+            "elapsedMs": round((time.perf_counter() - self.started) * 1000),
+        }
+        # JSON 모드에서는 필드로만 남기고 메시지에 같은 내용을 한 번 더 싣지 않는다
+        detail = "" if LOG_FORMAT == "json" else lazy_json(record)
+        self.logger.info("📊 [%s] 실행 요약 %s", self.job, detail, extra={"fields": {"summary": record}})
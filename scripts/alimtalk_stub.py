@@ -0,0 +1,90 @@
+"""NHN 알림톡 발송 API(v2.2) 로컬 스텁. 실제 발송 없이 배치 발송 경로를 시험할 때 사용.
+
+    python -m scripts.alimtalk_stub --port 8090 --latency 0.3 --fail-rate 0.05
+    ALIMTALK_BASE_URL=http://localhost:8090 uvicorn app.main:app --port 8080
+
+요청당 수신자 1000명 상한, 초당 요청 수(--max-rps, 넘으면 429)를 흉내 내고,
+수신자별 결과를 recipientSeq/recipientGroupingKey와 함께 돌려준다.
+--fail-rate 비율의 수신자는 resultCode -1로 실패 처리한다 (번호 해시 기준이라 재시도해도 같은 결과).
+GET /stats로 받은 요청 수·수신자 수·최대 동시 요청 수를 확인할 수 있다.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+import zlib
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+MAX_RECIPIENTS = 1000
+
+
+def create_app(latency: float, fail_rate: float, max_rps: float) -> FastAPI:
+    app = FastAPI()
+    stats = {"requests": 0, "recipients": 0, "rejected": 0, "inFlight": 0, "maxInFlight": 0}
+    window: list[float] = []
+
+    def header(code: int, message: str, ok: bool) -> dict:
+        return {"resultCode": code, "resultMessage": message, "isSuccessful": ok}
+
+    @app.post("/alimtalk/v2.2/appkeys/{app_key}/messages")
+    async def send(app_key: str, request: Request):
+        now = time.monotonic()
+        window[:] = [t for t in window if now - t < 1.0]
+        if max_rps and len(window) >= max_rps:
+            stats["rejected"] += 1
+            return JSONResponse({"header": header(429, "Too Many Requests", False)}, status_code=429)
+        window.append(now)
+
+        body = await request.json()
+        recipients = body.get("recipientList") or []
+        if not recipients or len(recipients) > MAX_RECIPIENTS:
+            stats["rejected"] += 1
+            return {"header": header(-1000, f"recipientList size must be 1..{MAX_RECIPIENTS}", False)}
+
+        stats["requests"] += 1
+        stats["recipients"] += len(recipients)
+        stats["inFlight"] += 1
+        stats["maxInFlight"] = max(stats["maxInFlight"], stats["inFlight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            stats["inFlight"] -= 1
+
+        results = []
+        for seq, item in enumerate(recipients, start=1):
+            failed = (zlib.crc32(str(item.get("recipientNo")).encode()) % 10000) < fail_rate * 10000
+            result = {
+                "recipientSeq": seq,
+                "recipientNo": item.get("recipientNo"),
+                "resultCode": -1 if failed else 0,
+                "resultMessage": "FAIL" if failed else "SUCCESS",
+            }
+            if item.get("recipientGroupingKey") is not None:
+                result["recipientGroupingKey"] = item["recipientGroupingKey"]
+            results.append(result)
+        return {
+            "header": header(0, "success", True),
+            "message": {"requestId": uuid.uuid4().hex, "senderGroupingKey": None, "sendResults": results},
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.2, help="요청당 응답 지연(초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="실패 처리할 수신자 비율 (0.0~1.0)")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="초당 요청 상한 (0이면 제한 없음)")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.fail_rate, args.max_rps), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,83 @@
+"""목록 파싱 HTML 백엔드 마이크로 벤치마크 + 결과 동일성 검사.
+
+    python -m scripts.bench_html_backends                 # 합성 게시판 (고려대/이화여대 형식)
+    python -m scripts.bench_html_backends --rows 2000 --repeat 20
+    python -m scripts.bench_html_backends --ku-html saved_board.html
+
+모든 백엔드의 결과가 기존 BeautifulSoup(html.parser) 경로와 같아야 하며, 다르면 종료 코드 1.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from app.parser.custom.ewha_univ import EWHA_NOTICE_URL, parse_ewha_list
+from app.parser.custom.korea_univ import parse_korea_univ
+from app.parser.html_backend import BACKENDS, get_backend
+
+KU_URL = "https://info.korea.ac.kr/info/board/notice_under.do"
+
+
+def synthetic_ku(rows: int) -> str:
+    today = date.today()
+    body = "".join(
+        f"<tr><td>{i}</td><td class='left'><span class='icon'></span>"
+        f"<a class='article-title' href='?mode=view&amp;articleNo={100000 + i}&amp;article.offset=0'>"
+        f" [공지] 2026학년도 장학금 안내 <b>{i}</b> </a></td><td>관리자</td>"
+        f"<td>{(today - timedelta(days=i % 90)).strftime('%Y.%m.%d')}</td></tr>"
+        for i in range(rows)
+    )
+    nav = "".join(f"<li><a href='/m{i}'>메뉴 {i}</a></li>" for i in range(200))
+    return f"<html><head><script>var a = 1;</script></head><body><ul id='gnb'>{nav}</ul><table><thead><tr><th>번호</th></tr></thead><tbody>{body}</tbody></table></body></html>"
+
+
+def synthetic_ewha(rows: int) -> str:
+    today = date.today()
+    body = "".join(
+        f"<tr><td>{i}</td><td>학사</td><td class='title'><a href='notice.do?mode=view&amp;articleNo={i}'>이화 공지 {i}</a></td>"
+        f"<td>담당부서</td><td>{(today - timedelta(days=i % 60)).strftime('%Y.%m.%d')}</td></tr>"
+        for i in range(rows)
+    )
+    return f"<html><body><table><tbody>{body}</tbody></table></body></html>"
+
+
+def bench(label: str, parse, html: str, page_url: str, repeat: int) -> bool:
+    baseline = parse(html, page_url, get_backend("bs4"))
+    ok = True
+    print(f"\n[{label}] {len(html):,} bytes, {len(baseline)} rows")
+    for name in BACKENDS:
+        backend = get_backend(name)
+        if backend.name != name:
+            print(f"  {name:<11} (설치되지 않음, 건너뜀)")
+            continue
+        result = parse(html, page_url, backend)
+        same = result == baseline
+        ok &= same
+        started = time.perf_counter()
+        for _ in range(repeat):
+            parse(html, page_url, backend)
+        per_run = (time.perf_counter() - started) / repeat * 1000
+        print(f"  {name:<11} {per_run:8.2f} ms/run  parity={'OK' if same else 'MISMATCH'}")
+        if not same:
+            diff = next((a, b) for a, b in zip(result + [None] * len(baseline), baseline + [None] * len(result)) if a != b)
+            print(f"    first difference: {diff}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--ku-html", help="저장해 둔 고려대 게시판 HTML 파일")
+    args = parser.parse_args()
+
+    ku_html = open(args.ku_html, encoding="utf-8").read() if args.ku_html else synthetic_ku(args.rows)
+    ok = bench("korea_univ", parse_korea_univ, ku_html, KU_URL, args.repeat)
+    ok &= bench("ewha", parse_ewha_list, synthetic_ewha(args.rows), EWHA_NOTICE_URL, args.repeat)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
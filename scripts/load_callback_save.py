@@ -0,0 +1,135 @@
+"""디스패치가 도는 동안 /callback/save 응답 지연(p50/p95/p99)을 재는 부하 테스트.
+
+    python -m scripts.load_callback_save --base-url http://localhost:8080 --dispatch
+    python -m scripts.load_callback_save --requests 2000 --concurrency 50 --max-p99-ms 500
+
+--dispatch를 주면 /scheduler/dispatch-crawl을 먼저 띄워 두고, 그 응답이 오기 전까지의 요청만
+'디스패치 중' 구간으로 따로 집계한다. 기본 페이로드는 data가 빈 목록이라 DB에 쓰지 않는다
+(--items로 가짜 공지를 넣으면 --user-id 유저에게 실제로 저장되니 테스트 유저에만 쓸 것).
+--max-p99-ms를 넘으면 종료 코드 1.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def payload(user_id: int, items: int, seq: int) -> dict:
+    return {
+        "userId": user_id,
+        "data": [
+            {
+                "category": "공지사항",
+                "title": f"부하 테스트 공지 {seq}-{i}",
+                "summary": "load test",
+                "sourceName": "load-test",
+                "originalUrl": f"https://example.com/load-test/{seq}/{i}",
+                "timestamp": datetime.now().isoformat(),
+            }
+            for i in range(items)
+        ],
+    }
+
+
+async def fire(client: httpx.AsyncClient, args: argparse.Namespace, dispatch_done: asyncio.Event) -> tuple[list[float], list[float], int]:
+    during: list[float] = []
+    after: list[float] = []
+    errors = 0
+    next_seq = iter(range(args.requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for seq in next_seq:
+            in_dispatch = not dispatch_done.is_set()
+            started = time.perf_counter()
+            try:
+                resp = await client.post(args.path, json=payload(args.user_id, args.items, seq))
+                ok = resp.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            if not ok:
+                errors += 1
+            (during if in_dispatch else after).append(elapsed)
+            if args.interval:
+                await asyncio.sleep(args.interval)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return during, after, errors
+
+
+def report(label: str, values: list[float]) -> None:
+    if not values:
+        print(f"{label:>10}: (요청 없음)")
+        return
+    print(
+        f"{label:>10}: n={len(values):5d}  p50={percentile(values, 50):8.1f}ms  p95={percentile(values, 95):8.1f}ms"
+        f"  p99={percentile(values, 99):8.1f}ms  max={max(values):8.1f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> int:
+    dispatch_done = asyncio.Event()
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+        dispatch_task = None
+        if args.dispatch:
+            async def dispatch() -> None:
+                started = time.perf_counter()
+                try:
+                    resp = await client.post("/scheduler/dispatch-crawl", timeout=httpx.Timeout(args.dispatch_timeout))
+                    print(f"디스패치 응답 {resp.status_code} ({time.perf_counter() - started:.1f}s): {resp.text[:200]}")
+                except httpx.HTTPError as exc:
+                    print(f"디스패치 실패: {exc!r}")
+                finally:
+                    dispatch_done.set()
+
+            dispatch_task = asyncio.create_task(dispatch())
+            await asyncio.sleep(args.warmup)
+        else:
+            dispatch_done.set()
+
+        during, after, errors = await fire(client, args, dispatch_done)
+        if dispatch_task is not None:
+            await dispatch_task
+
+    print(f"{args.path} 요청 {args.requests}건, 동시성 {args.concurrency}, 오류 {errors}건")
+    if args.dispatch:
+        report("디스패치 중", during)
+        report("디스패치 후", after)
+    report("전체", during + after)
+    p99 = percentile(during + after, 99)
+    if args.max_p99_ms and p99 > args.max_p99_ms:
+        print(f"❌ p99 {p99:.1f}ms > 기준 {args.max_p99_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--path", default="/callback/save", help="측정할 엔드포인트 (/health로 루프 응답성만 볼 수도 있음)")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.0, help="워커별 요청 간격(초)")
+    parser.add_argument("--user-id", type=int, default=0)
+    parser.add_argument("--items", type=int, default=0, help="요청당 가짜 공지 수 (0이면 DB에 쓰지 않음)")
+    parser.add_argument("--dispatch", action="store_true", help="측정 중에 /scheduler/dispatch-crawl 실행")
+    parser.add_argument("--warmup", type=float, default=1.0, help="디스패치를 띄운 뒤 측정 시작까지 대기(초)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--dispatch-timeout", type=float, default=900.0)
+    parser.add_argument("--max-p99-ms", type=float, default=0.0)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,14 @@
+-- /callback/save 중복 제거를 DB로 옮기기 위한 유니크 제약.
+-- 앱은 upsert(on_conflict="user_id,original_url", ignore_duplicates=True)로 저장하며,
+-- 이 제약이 없으면 들어온 URL만 조회해서 거르는 방식으로 자동 대체된다.
+
+-- 1. 기존 중복 정리: (user_id, original_url)마다 가장 먼저 저장된 행만 남김
+delete from public.notifications n
+using public.notifications d
+where n.user_id = d.user_id
+  and n.original_url = d.original_url
+  and n.id > d.id;
+
+-- 2. 유니크 제약 (ON CONFLICT 대상). 인덱스가 생기므로 유저별 URL 조회도 이 인덱스를 탄다
+alter table public.notifications
+  add constraint notifications_user_id_original_url_key unique (user_id, original_url);